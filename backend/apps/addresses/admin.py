@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import Address
 
-# Register your models here.
+
+@admin.register(Address)
+class AddressAdmin(admin.ModelAdmin):
+    list_display = ['user', 'recipient_name', 'postal_code', 'road_address', 'is_default', 'created_at']
+    list_filter = ['is_default']
+    search_fields = ['recipient_name', 'postal_code', 'road_address']
+    list_select_related = ['user']
+    readonly_fields = ['created_at', 'updated_at']
@@ -5,3 +5,11 @@ class AddressesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.addresses'
     verbose_name = 'Addresses'
+
+    def ready(self):
+        from . import postal_index
+
+        # Map an already built index at startup; building is left to
+        # ``manage.py build_postal_index`` or the first lookup.
+        if not postal_index.is_stale():
+            postal_index.get_index()
@@ -0,0 +1,84 @@
+import random
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.addresses import postal_index
+
+
+def read_rss():
+    """Current RSS split into anonymous (private) and file-backed (shareable) kB."""
+    values = {}
+    try:
+        with open('/proc/self/status') as fp:
+            for line in fp:
+                key, _, rest = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        # Non-Linux: only the peak RSS is available.
+        values['VmRSS'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return values
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark postal index autocomplete / validation latency and per-process RSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # Drop the mapping made at app startup so the load is measured here.
+        postal_index.reset_index()
+        rss_before = read_rss()
+        started = time.perf_counter()
+        index = postal_index.get_index()
+        load_ms = (time.perf_counter() - started) * 1000
+        rss_after = read_rss()
+
+        rng = random.Random(options['seed'])
+        samples = [index._record(rng.randrange(index.record_count)) for _ in range(256)]
+        queries = []
+        for record in samples:
+            road = record['road_name']
+            queries.append(road[:rng.randint(1, len(road))])
+            queries.append(f"{record['sigungu']} {road}")
+        codes = [record['postal_code'] for record in samples] + ['00000', '99999']
+
+        self.stdout.write(
+            f'index: {index.path} records={index.record_count} keys={index.key_count} '
+            f'postcodes={index.postcode_count} load={load_ms:.2f}ms'
+        )
+        self._report('autocomplete', options['iterations'],
+                     lambda i: index.autocomplete(queries[i % len(queries)]))
+        self._report('validate', options['iterations'],
+                     lambda i: index.is_valid_postal_code(codes[i % len(codes)]))
+
+        rss_final = read_rss()
+        for label, rss in (('before load', rss_before), ('after load', rss_after), ('after bench', rss_final)):
+            parts = ' '.join(f'{key}={value}kB' for key, value in rss.items())
+            self.stdout.write(f'rss {label}: {parts}')
+
+    def _report(self, label, iterations, fn):
+        timings = []
+        for i in range(iterations):
+            t0 = time.perf_counter_ns()
+            fn(i)
+            timings.append(time.perf_counter_ns() - t0)
+        timings.sort()
+        self.stdout.write(
+            f'{label:<12} n={iterations} '
+            f'p50={percentile(timings, 50) / 1000:.1f}us '
+            f'p95={percentile(timings, 95) / 1000:.1f}us '
+            f'p99={percentile(timings, 99) / 1000:.1f}us '
+            f'max={timings[-1] / 1000:.1f}us'
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.addresses import postal_index
+
+
+class Command(BaseCommand):
+    help = 'Compile the postal code dataset into the memory-mapped index file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='TSV dataset (defaults to POSTAL_DATASET_PATH)')
+        parser.add_argument('--output', help='Index file (defaults to POSTAL_INDEX_PATH)')
+
+    def handle(self, *args, **options):
+        source = options['source'] or postal_index.dataset_path()
+        output = options['output'] or postal_index.index_path()
+
+        started = time.perf_counter()
+        records, keys = postal_index.build_index(source, output)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {output}: {records} records, {keys} keys in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Address',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient_name', models.CharField(max_length=50)),
+                ('phone_number', models.CharField(max_length=15)),
+                ('postal_code', models.CharField(max_length=5)),
+                ('road_address', models.CharField(max_length=200)),
+                ('detail_address', models.CharField(blank=True, max_length=200)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='addresses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Address',
+                'verbose_name_plural': 'Addresses',
+                'db_table': 'addresses_address',
+                'ordering': ['-is_default', '-created_at'],
+            },
+        ),
+    ]
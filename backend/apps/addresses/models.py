@@ -1,3 +1,37 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+User = get_user_model()
+
+
+class Address(models.Model):
+    """
+    Shipping address saved by a user
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='addresses')
+    recipient_name = models.CharField(max_length=50)
+    phone_number = models.CharField(max_length=15)
+    postal_code = models.CharField(max_length=5)
+    road_address = models.CharField(max_length=200)
+    detail_address = models.CharField(max_length=200, blank=True)
+    is_default = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'addresses_address'
+        verbose_name = 'Address'
+        verbose_name_plural = 'Addresses'
+        ordering = ['-is_default', '-created_at']
+
+    def __str__(self):
+        return f"({self.postal_code}) {self.road_address} {self.detail_address}".strip()
+
+    def save(self, *args, **kwargs):
+        # Only one default address per user
+        if self.is_default:
+            Address.objects.filter(
+                user_id=self.user_id,
+                is_default=True
+            ).exclude(id=self.id).update(is_default=False)
+        super().save(*args, **kwargs)
@@ -0,0 +1,279 @@
+"""
+Memory-mapped postal code / road name index.
+
+The bundled TSV (``data/postal_codes.tsv``) is compiled into a single binary
+file of sorted arrays.  Every worker process maps that file read-only, so the
+pages live once in the OS page cache and are shared by all workers instead of
+each process holding its own copy of the dataset.
+
+File layout (native byte order, all arrays are unsigned 32-bit ints)::
+
+    header      magic, version, n_records, n_keys, n_postcodes
+    postcodes   sorted unique postal codes                  [n_postcodes]
+    pc_start    first record of each postal code            [n_postcodes + 1]
+    rec_off     record offsets into the record blob         [n_records + 1]
+    key_off     key offsets into the key blob               [n_keys + 1]
+    key_rec     record id of each key                       [n_keys]
+    records     UTF-8 records, tab separated fields
+    keys        UTF-8 normalized search keys, sorted bytewise
+"""
+import csv
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+MAGIC = b'MKPI'
+VERSION = 1
+HEADER = struct.Struct('=4sIIII')
+
+DEFAULT_DATASET_PATH = Path(__file__).resolve().parent / 'data' / 'postal_codes.tsv'
+
+RECORD_FIELDS = ('postal_code', 'sido', 'sigungu', 'road_name', 'building_no', 'building_name')
+
+# '서울특별시' -> '서울' style aliases so users can type the short province name.
+SIDO_SUFFIXES = ('특별자치시', '특별자치도', '특별시', '광역시', '도')
+
+
+def normalize(text):
+    """Normalize user input / dataset text into a comparable search key."""
+    text = unicodedata.normalize('NFKC', text or '')
+    return ''.join(text.split()).casefold()
+
+
+def short_sido(sido):
+    for suffix in SIDO_SUFFIXES:
+        if sido.endswith(suffix) and len(sido) > len(suffix):
+            return sido[:-len(suffix)]
+    return sido
+
+
+def _read_rows(source_path):
+    with open(source_path, encoding='utf-8', newline='') as fp:
+        reader = csv.DictReader(fp, delimiter='\t')
+        for row in reader:
+            building_no = row['building_main'].strip()
+            sub = row.get('building_sub', '').strip()
+            if sub and sub != '0':
+                building_no = f'{building_no}-{sub}'
+            yield (
+                row['postal_code'].strip(),
+                row['sido'].strip(),
+                row['sigungu'].strip(),
+                row['road_name'].strip(),
+                building_no,
+                row.get('building_name', '').strip(),
+            )
+
+
+def _search_keys(record):
+    postal_code, sido, sigungu, road_name, building_no, building_name = record
+    road = road_name + building_no
+    keys = {
+        road,
+        sigungu + road,
+        sido + sigungu + road,
+        short_sido(sido) + sigungu + road,
+    }
+    if building_name:
+        keys.add(building_name)
+    return {normalize(key).encode('utf-8') for key in keys}
+
+
+def build_index(source_path, dest_path):
+    """Compile the TSV dataset at ``source_path`` into the binary index at ``dest_path``."""
+    records = sorted(set(_read_rows(source_path)))
+
+    postcodes = array('I')
+    pc_start = array('I')
+    rec_off = array('I', [0])
+    rec_blob = bytearray()
+    key_pairs = []
+
+    for rec_id, record in enumerate(records):
+        code = int(record[0])
+        if not postcodes or postcodes[-1] != code:
+            postcodes.append(code)
+            pc_start.append(rec_id)
+        rec_blob += '\t'.join(record).encode('utf-8')
+        rec_off.append(len(rec_blob))
+        key_pairs.extend((key, rec_id) for key in _search_keys(record))
+    pc_start.append(len(records))
+
+    key_pairs.sort()
+    key_off = array('I', [0])
+    key_rec = array('I')
+    key_blob = bytearray()
+    for key, rec_id in key_pairs:
+        key_blob += key
+        key_off.append(len(key_blob))
+        key_rec.append(rec_id)
+
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file and rename so running workers keep their old mapping.
+    fd, tmp_path = tempfile.mkstemp(dir=dest_path.parent, prefix=dest_path.name + '.')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(HEADER.pack(MAGIC, VERSION, len(records), len(key_pairs), len(postcodes)))
+            for arr in (postcodes, pc_start, rec_off, key_off, key_rec):
+                arr.tofile(fp)
+            fp.write(rec_blob)
+            fp.write(key_blob)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(records), len(key_pairs)
+
+
+class PostalIndex:
+    """
+    Read-only view over a compiled index file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_records, n_keys, n_postcodes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{self.path} is not a postal index (version {VERSION})')
+
+        view = memoryview(self._mm)
+        pos = HEADER.size
+
+        def take(count):
+            nonlocal pos
+            size = count * 4
+            arr = view[pos:pos + size].cast('I')
+            pos += size
+            return arr
+
+        self._postcodes = take(n_postcodes)
+        self._pc_start = take(n_postcodes + 1)
+        self._rec_off = take(n_records + 1)
+        self._key_off = take(n_keys + 1)
+        self._key_rec = take(n_keys)
+        self._records = view[pos:pos + self._rec_off[n_records]]
+        pos += self._rec_off[n_records]
+        self._keys = view[pos:pos + self._key_off[n_keys]]
+
+        self.record_count = n_records
+        self.key_count = n_keys
+        self.postcode_count = n_postcodes
+
+    def _key(self, i):
+        return bytes(self._keys[self._key_off[i]:self._key_off[i + 1]])
+
+    def _record(self, rec_id):
+        raw = bytes(self._records[self._rec_off[rec_id]:self._rec_off[rec_id + 1]])
+        values = raw.decode('utf-8').split('\t')
+        record = dict(zip(RECORD_FIELDS, values))
+        record['road_address'] = ' '.join(
+            part for part in (record['sido'], record['sigungu'],
+                              record['road_name'], record['building_no']) if part
+        )
+        return record
+
+    def _lower_bound(self, prefix):
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def autocomplete(self, query, limit=10):
+        """Records whose road / building keys start with ``query``."""
+        prefix = normalize(query).encode('utf-8')
+        if not prefix:
+            return []
+        seen = set()
+        results = []
+        i = self._lower_bound(prefix)
+        while i < self.key_count and len(results) < limit:
+            if not self._key(i).startswith(prefix):
+                break
+            rec_id = self._key_rec[i]
+            if rec_id not in seen:
+                seen.add(rec_id)
+                results.append(self._record(rec_id))
+            i += 1
+        return results
+
+    def _postcode_slot(self, postal_code):
+        if not (isinstance(postal_code, str) and len(postal_code) == 5 and postal_code.isdigit()):
+            return None
+        code = int(postal_code)
+        slot = bisect_left(self._postcodes, code)
+        if slot < self.postcode_count and self._postcodes[slot] == code:
+            return slot
+        return None
+
+    def is_valid_postal_code(self, postal_code):
+        return self._postcode_slot(postal_code) is not None
+
+    def lookup(self, postal_code):
+        """All records that belong to ``postal_code``."""
+        slot = self._postcode_slot(postal_code)
+        if slot is None:
+            return []
+        return [self._record(rec_id)
+                for rec_id in range(self._pc_start[slot], self._pc_start[slot + 1])]
+
+    def matches(self, postal_code, road_address):
+        """Whether ``road_address`` names a road that is served by ``postal_code``."""
+        address = normalize(road_address)
+        return any(normalize(record['road_name']) in address
+                   for record in self.lookup(postal_code))
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def dataset_path():
+    return Path(getattr(settings, 'POSTAL_DATASET_PATH', None) or DEFAULT_DATASET_PATH)
+
+
+def index_path():
+    return Path(settings.POSTAL_INDEX_PATH)
+
+
+def is_stale():
+    path = index_path()
+    return not path.exists() or path.stat().st_mtime < dataset_path().stat().st_mtime
+
+
+def get_index():
+    """
+    Process-wide index, compiled on first use if the index file is missing or
+    older than the dataset.  Deployments should run ``build_postal_index``
+    ahead of time so workers only ever map an existing file.
+    """
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                if is_stale():
+                    build_index(dataset_path(), index_path())
+                _index = PostalIndex(index_path())
+    return _index
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
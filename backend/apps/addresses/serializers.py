@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from .models import Address
+from .postal_index import get_index
+
+
+class AddressSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Address
+        fields = [
+            'id', 'recipient_name', 'phone_number', 'postal_code',
+            'road_address', 'detail_address', 'is_default', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate_postal_code(self, value):
+        if not get_index().is_valid_postal_code(value):
+            raise serializers.ValidationError('Unknown postal code.')
+        return value
+
+    def validate(self, attrs):
+        postal_code = attrs.get('postal_code', getattr(self.instance, 'postal_code', None))
+        road_address = attrs.get('road_address', getattr(self.instance, 'road_address', None))
+        if postal_code and road_address and not get_index().matches(postal_code, road_address):
+            raise serializers.ValidationError({
+                'road_address': 'Road address does not belong to the given postal code.'
+            })
+        return attrs
+
+
+class PostalRecordSerializer(serializers.Serializer):
+    postal_code = serializers.CharField()
+    road_address = serializers.CharField()
+    sido = serializers.CharField()
+    sigungu = serializers.CharField()
+    road_name = serializers.CharField()
+    building_no = serializers.CharField()
+    building_name = serializers.CharField()
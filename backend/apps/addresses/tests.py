@@ -1,3 +1,132 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Address
+from .postal_index import PostalIndex, build_index, dataset_path, reset_index
+
+User = get_user_model()
+
+
+class PostalIndexTestMixin:
+    """Compile the bundled dataset into a throwaway index for the test class"""
+
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.index_path = Path(tmp.name) / 'postal_index.bin'
+        settings = override_settings(POSTAL_INDEX_PATH=cls.index_path)
+        settings.enable()
+        cls.addClassCleanup(settings.disable)
+        reset_index()
+        cls.addClassCleanup(reset_index)
+        super().setUpClass()
+
+
+class PostalIndexTests(PostalIndexTestMixin, TestCase):
+    def test_build_and_read(self):
+        records, keys = build_index(dataset_path(), self.index_path)
+        index = PostalIndex(self.index_path)
+        self.assertEqual((index.record_count, index.key_count), (records, keys))
+
+        road_address, = [record['road_address'] for record in index.lookup('03171')]
+        self.assertEqual(road_address, '서울특별시 종로구 세종대로 209')
+        self.assertTrue(index.is_valid_postal_code('03171'))
+        for postal_code in ('00000', '3171', '0317a', None):
+            with self.subTest(postal_code=postal_code):
+                self.assertFalse(index.is_valid_postal_code(postal_code))
+                self.assertEqual(index.lookup(postal_code), [])
+
+    def test_matches_road_of_the_postal_code(self):
+        build_index(dataset_path(), self.index_path)
+        index = PostalIndex(self.index_path)
+        self.assertTrue(index.matches('03171', '서울 종로구 세종대로 209'))
+        self.assertFalse(index.matches('03171', '서울 종로구 사직로 161'))
+
+    def test_rejects_other_files(self):
+        self.index_path.write_bytes(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            PostalIndex(self.index_path)
+
+
+class PostalAutocompleteTests(PostalIndexTestMixin, TestCase):
+    client_class = APIClient
+
+    def autocomplete(self, **params):
+        response = self.client.get(reverse('addresses:postal_autocomplete'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_road_prefix(self):
+        data = self.autocomplete(q='세종대')
+        self.assertEqual(
+            sorted(row['road_address'] for row in data['results']),
+            ['서울특별시 종로구 세종대로 175', '서울특별시 종로구 세종대로 209', '서울특별시 중구 세종대로 110'],
+        )
+        self.assertEqual(data['count'], 3)
+
+    def test_short_sido_spaces_and_building_name(self):
+        codes = {row['postal_code'] for row in self.autocomplete(q='서울 종로구 세종대로 20')['results']}
+        self.assertEqual(codes, {'03171'})
+        row, = self.autocomplete(q='세종문화')['results']
+        self.assertEqual((row['postal_code'], row['building_name']), ('03172', '세종문화회관'))
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(self.autocomplete(q='서울', limit=1)['count'], 1)
+        self.assertEqual(self.autocomplete(q='서울', limit='x')['count'], 10)
+        self.assertEqual(self.autocomplete(q=' ')['results'], [])
+
+    def test_postal_code_lookup(self):
+        response = self.client.get(reverse('addresses:postal_code_lookup', args=['03154']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['building_name'] for row in response.json()['results']], ['교보생명빌딩'])
+        response = self.client.get(reverse('addresses:postal_code_lookup', args=['99999']))
+        self.assertEqual(response.status_code, 404)
+
+
+class AddressValidationTests(PostalIndexTestMixin, TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create(self, **fields):
+        data = {
+            'recipient_name': 'Buyer', 'phone_number': '010-0000-0000',
+            'postal_code': '03171', 'road_address': '서울특별시 종로구 세종대로 209', **fields,
+        }
+        return self.client.post(reverse('addresses:address_create'), data, format='json')
+
+    def test_valid_address_is_created(self):
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Address.objects.get().postal_code, '03171')
+
+    def test_unknown_postal_code(self):
+        response = self.create(postal_code='99999')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'postal_code': ['Unknown postal code.']})
+
+    def test_road_must_belong_to_the_postal_code(self):
+        response = self.create(road_address='서울특별시 종로구 사직로 161')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('road_address', response.json())
+        self.assertFalse(Address.objects.exists())
+
+    def test_partial_update_checks_the_stored_postal_code(self):
+        address = Address.objects.get(pk=self.create().json()['address']['id'])
+        url = reverse('addresses:address_detail', args=[address.pk])
+        response = self.client.patch(url, {'road_address': '서울 종로구 사직로 161'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {'postal_code': '03045', 'road_address': '서울 종로구 사직로 161'},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
@@ -7,4 +7,6 @@ urlpatterns = [
     path('', views.AddressListView.as_view(), name='address_list'),
     path('<int:pk>/', views.AddressDetailView.as_view(), name='address_detail'),
     path('create/', views.AddressCreateView.as_view(), name='address_create'),
+    path('autocomplete/', views.PostalAutocompleteView.as_view(), name='postal_autocomplete'),
+    path('postal-codes/<str:postal_code>/', views.PostalCodeLookupView.as_view(), name='postal_code_lookup'),
 ]
@@ -1,40 +1,94 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from .models import Address
+from .postal_index import get_index
+from .serializers import AddressSerializer, PostalRecordSerializer
 
 
 class AddressListView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request):
-        # Mock address list response
+        addresses = Address.objects.filter(user_id=request.user.pk)
+        serializer = AddressSerializer(addresses, many=True)
         return Response({
-            'message': 'Address list endpoint - Mock implementation',
-            'addresses': [
-                {'id': 1, 'street': 'Mock Street 1', 'city': 'Mock City'},
-                {'id': 2, 'street': 'Mock Street 2', 'city': 'Mock City'},
-            ]
+            'addresses': serializer.data,
+            'count': len(serializer.data)
         }, status=status.HTTP_200_OK)
 
 
 class AddressDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self, request, pk):
+        return get_object_or_404(Address, pk=pk, user_id=request.user.pk)
+
     def get(self, request, pk):
-        # Mock address detail response
-        return Response({
-            'message': f'Address detail endpoint - Mock implementation for address {pk}',
-            'address': {
-                'id': pk,
-                'street': f'Mock Street {pk}',
-                'city': 'Mock City',
-                'postal_code': f'1234{pk}'
-            }
-        }, status=status.HTTP_200_OK)
+        address = self.get_object(request, pk)
+        return Response({'address': AddressSerializer(address).data}, status=status.HTTP_200_OK)
+
+    def patch(self, request, pk):
+        address = self.get_object(request, pk)
+        serializer = AddressSerializer(address, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({'address': serializer.data}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        address = self.get_object(request, pk)
+        address.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class AddressCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        # Mock address creation response
+        serializer = AddressSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(user_id=request.user.pk)
+            return Response({
+                'message': 'Address created successfully',
+                'address': serializer.data
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PostalAutocompleteView(APIView):
+    """
+    Road name / building autocomplete served from the in-memory postal index
+    """
+    permission_classes = [AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        results = get_index().autocomplete(query, limit=max(limit, 1))
+        return Response({
+            'results': PostalRecordSerializer(results, many=True).data,
+            'count': len(results)
+        })
+
+
+class PostalCodeLookupView(APIView):
+    """
+    Addresses served by a postal code
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, postal_code):
+        results = get_index().lookup(postal_code)
+        if not results:
+            return Response({'error': 'Unknown postal code.'}, status=status.HTTP_404_NOT_FOUND)
         return Response({
-            'message': 'Address creation endpoint - Mock implementation',
-            'address_id': 999,
-            'street': 'New Mock Street',
-            'city': 'New Mock City'
-        }, status=status.HTTP_201_CREATED)
+            'postal_code': postal_code,
+            'results': PostalRecordSerializer(results, many=True).data
+        })
@@ -0,0 +1,362 @@
+"""
+Endpoint benchmark harness.
+
+Each ``Scenario`` drives one route through the Django test client against a
+dataset generated by ``seeding.seed``.  Per scenario it records latency
+percentiles, SQL queries per request and the peak memory allocated while
+handling a request (tracemalloc, measured in a separate pass so it does not
+skew the timings).  Writes run inside a savepoint that is rolled back after
+every request, so each iteration sees the same data.
+"""
+import io
+import math
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+
+from apps.addresses.models import Address
+from apps.addresses.postal_index import get_index
+from apps.carts.models import Cart, CartItem
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Product, ProductImage
+from apps.users.serializers import MarketonRefreshToken
+
+User = get_user_model()
+
+BENCH_PASSWORD = 'bench-password-1234'
+
+# Route names deliberately left out, with the reason
+SKIPPED_ROUTES = {
+    'products:api-root': 'shadowed by the product list route',
+}
+
+
+@dataclass
+class Fixtures:
+    user: Any
+    staff: Any
+    disposable: Any
+    product: Any
+    image_ids: list
+    address: Any
+    order: Any
+    cart_item: Any
+    other_product_id: int
+    postal_record: dict
+    tokens: dict = field(default_factory=dict)
+    refresh: str = ''
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[Fixtures], str]
+    data: Callable[[Fixtures], Any] = None
+    auth: str = 'user'  # user, staff, anon or disposable (fresh tokens every request)
+    multipart: bool = False
+    writes: bool = False
+
+
+def _png_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (200, 80, 40)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+_PNG = None
+
+
+def _image_upload(fx):
+    global _PNG
+    if _PNG is None:
+        _PNG = _png_bytes()
+    return {'image': SimpleUploadedFile('bench.png', _PNG, content_type='image/png')}
+
+
+def _r(name, *args):
+    return lambda fx: reverse(name, args=[arg(fx) if callable(arg) else arg for arg in args])
+
+
+SCENARIOS = [
+    # users
+    Scenario('auth-login', 'post', _r('users:login'), auth='anon',
+             data=lambda fx: {'username': fx.user.username, 'password': BENCH_PASSWORD}),
+    Scenario('auth-register', 'post', _r('users:register'), auth='anon', writes=True,
+             data=lambda fx: {'username': 'bench_new', 'email': 'bench_new@example.com',
+                              'password': BENCH_PASSWORD, 'password_confirm': BENCH_PASSWORD}),
+    Scenario('auth-profile', 'get', _r('users:profile')),
+    Scenario('auth-token-refresh', 'post', _r('users:token_refresh'), auth='disposable',
+             data=lambda fx: {'refresh': fx.refresh}),
+    Scenario('auth-logout', 'post', _r('users:logout'), auth='disposable',
+             data=lambda fx: {'refresh': fx.refresh}),
+    Scenario('auth-password-change', 'post', _r('users:password_change'), auth='disposable', writes=True,
+             data=lambda fx: {'old_password': BENCH_PASSWORD, 'new_password': 'bench-password-5678'}),
+    # products
+    Scenario('products-list', 'get', _r('products:product-list')),
+    Scenario('products-list-category', 'get',
+             lambda fx: reverse('products:product-list') + f'?category={fx.product.category}'),
+    Scenario('products-list-filtered', 'get',
+             lambda fx: reverse('products:product-list') + '?min_price=1000&in_stock=true&ordering=-price'),
+    Scenario('products-changes', 'get', lambda fx: reverse('products:product-list') + '?updated_since='),
+    Scenario('products-search', 'get', lambda fx: reverse('products:product-search') + '?search=프리미엄'),
+    Scenario('products-search-chosung', 'get', lambda fx: reverse('products:product-search') + '?search=ㅍㄹㅁㅇ'),
+    Scenario('products-suggest', 'get', lambda fx: reverse('products:product-suggest') + '?q=프리'),
+    Scenario('products-list-popular', 'get', lambda fx: reverse('products:product-list') + '?ordering=popular'),
+    Scenario('products-trending', 'get', _r('products:product-trending')),
+    Scenario('products-categories', 'get', _r('products:product-categories')),
+    Scenario('products-snapshots', 'get', _r('products:product-snapshots')),
+    Scenario('products-retrieve', 'get', _r('products:product-detail', lambda fx: fx.product.pk)),
+    Scenario('products-related', 'get', _r('products:product-related', lambda fx: fx.product.pk)),
+    Scenario('products-create', 'post', _r('products:product-list'), writes=True,
+             data=lambda fx: {'name': '벤치 상품', 'description': '벤치', 'price': '1000.00',
+                              'category': '도서', 'stock': 10}),
+    Scenario('products-update', 'patch', _r('products:product-detail', lambda fx: fx.product.pk), writes=True,
+             data=lambda fx: {'stock': 42}),
+    Scenario('products-destroy', 'delete', _r('products:product-detail', lambda fx: fx.product.pk), writes=True),
+    Scenario('products-reorder-images', 'post', _r('products:product-reorder-images', lambda fx: fx.product.pk),
+             writes=True,
+             data=lambda fx: [{'image_id': image_id, 'new_order': n}
+                              for n, image_id in enumerate(reversed(fx.image_ids))]),
+    Scenario('products-update-image', 'patch',
+             _r('products:product-update-image', lambda fx: fx.product.pk, lambda fx: fx.image_ids[0]),
+             writes=True, data=lambda fx: {'alt_text': '수정'}),
+    Scenario('products-delete-image', 'delete',
+             _r('products:product-delete-image', lambda fx: fx.product.pk, lambda fx: fx.image_ids[0]),
+             writes=True),
+    Scenario('products-set-main-image', 'post',
+             _r('products:product-set-main-image', lambda fx: fx.product.pk, lambda fx: fx.image_ids[-1]),
+             writes=True),
+    Scenario('products-bulk-sync', 'post', _r('products:product-bulk-sync'), auth='staff', writes=True,
+             data=lambda fx: [{'id': fx.product.pk, 'stock': 42, 'price': '1234.00'},
+                              {'id': fx.other_product_id, 'is_active': False}]),
+    # products, async read path
+    Scenario('products-async-list', 'get', _r('products_async:product_list')),
+    Scenario('products-async-search', 'get',
+             lambda fx: reverse('products_async:product_search') + '?search=프리미엄'),
+    Scenario('products-async-categories', 'get', _r('products_async:product_categories')),
+    Scenario('products-async-detail', 'get', _r('products_async:product_detail', lambda fx: fx.product.pk)),
+    # orders
+    Scenario('orders-list', 'get', _r('orders:order_list')),
+    Scenario('orders-detail', 'get', _r('orders:order_detail', lambda fx: fx.order.pk)),
+    Scenario('orders-create', 'post', _r('orders:order_create'), writes=True,
+             data=lambda fx: {'items': [{'product_id': fx.other_product_id, 'quantity': 1}]}),
+    # carts
+    Scenario('carts-get', 'get', _r('carts:cart')),
+    Scenario('carts-add', 'post', _r('carts:cart_add'), writes=True,
+             data=lambda fx: {'product_id': fx.other_product_id, 'quantity': 1}),
+    Scenario('carts-remove', 'delete', _r('carts:cart_remove', lambda fx: fx.cart_item.pk), writes=True),
+    # addresses
+    Scenario('addresses-list', 'get', _r('addresses:address_list')),
+    Scenario('addresses-detail', 'get', _r('addresses:address_detail', lambda fx: fx.address.pk)),
+    Scenario('addresses-create', 'post', _r('addresses:address_create'), writes=True,
+             data=lambda fx: {'recipient_name': '벤치', 'phone_number': '010-0000-0000',
+                              'postal_code': fx.postal_record.get('postal_code', ''),
+                              'road_address': fx.postal_record.get('road_address', '')}),
+    Scenario('addresses-autocomplete', 'get', lambda fx: reverse('addresses:postal_autocomplete') + '?q=세종',
+             auth='anon'),
+    Scenario('addresses-postal-lookup', 'get',
+             _r('addresses:postal_code_lookup', lambda fx: fx.postal_record.get('postal_code', '00000')),
+             auth='anon'),
+    # uploads
+    Scenario('upload-file', 'post', _r('upload:file_upload'), writes=True, multipart=True,
+             data=lambda fx: {'file': SimpleUploadedFile('bench.txt', b'x' * 4096, content_type='text/plain')}),
+    Scenario('upload-image', 'post', _r('upload:image_upload'), writes=True, multipart=True, data=_image_upload),
+    Scenario('upload-files', 'get', _r('upload:file_list'), auth='anon'),
+    Scenario('upload-images', 'get', _r('upload:image_list'), auth='anon'),
+    Scenario('upload-image-duplicates', 'get',
+             lambda fx: reverse('upload:image_duplicates') + '?hash=0f0f0f0f0f0f0f0f', auth='anon'),
+    Scenario('upload-info', 'get', _r('upload:media_info'), auth='anon'),
+    # dashboard
+    Scenario('dashboard-sales-daily', 'get', _r('dashboard:sales_daily'), auth='staff'),
+    Scenario('dashboard-sales-categories', 'get', _r('dashboard:sales_categories'), auth='staff'),
+    Scenario('dashboard-sales-sellers', 'get', _r('dashboard:sales_sellers'), auth='staff'),
+    Scenario('dashboard-sales-products', 'get', _r('dashboard:sales_products'), auth='staff'),
+    Scenario('dashboard-inventory', 'get', _r('dashboard:inventory'), auth='staff'),
+    # jobs
+    Scenario('jobs-stats', 'get', _r('jobs:stats'), auth='staff'),
+    # instrumentation
+    Scenario('metrics', 'get', _r('metrics'), auth='anon'),
+]
+
+
+def route_names(patterns=None, namespace=''):
+    """Every named route in the URLconf except the admin site."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == 'admin':
+                continue
+            child = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            names |= route_names(pattern.url_patterns, child)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(f'{namespace}{pattern.name}')
+    return names
+
+
+def uncovered_routes(fixtures, scenarios=SCENARIOS):
+    covered = {resolve(scenario.path(fixtures).split('?')[0]).view_name for scenario in scenarios}
+    return sorted(route_names() - covered - set(SKIPPED_ROUTES))
+
+
+def build_fixtures(product_ids):
+    """Users, a product with images, an order, a cart and an address owned by the bench user."""
+    user = User.objects.create_user('bench_user', 'bench_user@example.com', BENCH_PASSWORD)
+    staff = User.objects.create_user('bench_staff', 'bench_staff@example.com', BENCH_PASSWORD, is_staff=True)
+    disposable = User.objects.create_user('bench_disposable', 'bench_disposable@example.com', BENCH_PASSWORD)
+
+    product = Product.objects.create(
+        name='벤치 프리미엄 상품', description='벤치마크용', price=15000, category='도서',
+        stock=1_000_000, created_by_id=user.pk,
+    )
+    images = ProductImage.objects.bulk_create([
+        ProductImage(product=product, image=f'products/bench/{n}.jpg', order=n, is_main=n == 0)
+        for n in range(3)
+    ])
+    other = Product.objects.filter(pk__in=product_ids[:50], is_active=True).order_by('-stock').first() or product
+    Product.objects.filter(pk=other.pk).update(stock=1_000_000)
+
+    order = Order.objects.create(user_id=user.pk, status=Order.STATUS_PAID, total_amount=product.price)
+    OrderItem.objects.create(order=order, product=product, seller_id=user.pk, product_name=product.name,
+                             category=product.category, unit_price=product.price, quantity=1)
+    cart = Cart.objects.create(user_id=user.pk)
+    cart_item = CartItem.objects.create(cart=cart, product=product, quantity=1)
+
+    records = get_index().autocomplete('세종대로', 1)
+    postal_record = records[0] if records else {}
+    address = Address.objects.create(
+        user_id=user.pk, recipient_name='벤치', phone_number='010-0000-0000',
+        postal_code=postal_record.get('postal_code', '00000'),
+        road_address=postal_record.get('road_address', ''), is_default=True,
+    )
+
+    fx = Fixtures(user=user, staff=staff, disposable=disposable, product=product,
+                  image_ids=[image.pk for image in images], address=address, order=order,
+                  cart_item=cart_item, other_product_id=other.pk, postal_record=postal_record)
+    fx.tokens = {
+        'user': str(MarketonRefreshToken.for_user(user).access_token),
+        'staff': str(MarketonRefreshToken.for_user(staff).access_token),
+    }
+    return fx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Runner:
+    def __init__(self, fixtures, iterations=50, warmup=5, alloc_iterations=3):
+        self.fx = fixtures
+        self.iterations = iterations
+        self.warmup = warmup
+        self.alloc_iterations = alloc_iterations
+        self.client = Client()
+
+    def _headers(self, scenario):
+        if scenario.auth == 'anon':
+            return {}
+        if scenario.auth == 'disposable':
+            refresh = MarketonRefreshToken.for_user(self.fx.disposable)
+            self.fx.refresh = str(refresh)
+            return {'HTTP_AUTHORIZATION': f'Bearer {refresh.access_token}'}
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.fx.tokens[scenario.auth]}'}
+
+    def _request(self, scenario, path):
+        """One request; returns (seconds, status). Setup is not timed."""
+        headers = self._headers(scenario)
+        data = scenario.data(self.fx) if scenario.data else None
+        kwargs = {} if data is None else (
+            {'data': data} if scenario.multipart else {'data': data, 'content_type': 'application/json'}
+        )
+        send = getattr(self.client, scenario.method)
+        with ExitStack() as stack:
+            if scenario.writes:
+                stack.enter_context(transaction.atomic())
+            started = time.perf_counter()
+            response = send(path, **kwargs, **headers)
+            elapsed = time.perf_counter() - started
+            if scenario.writes:
+                transaction.set_rollback(True)
+        return elapsed, response.status_code
+
+    def run(self, scenario):
+        path = scenario.path(self.fx)
+        for _ in range(self.warmup):
+            self._request(scenario, path)
+
+        latencies = []
+        statuses = set()
+        for _ in range(self.iterations):
+            elapsed, status = self._request(scenario, path)
+            latencies.append(elapsed)
+            statuses.add(status)
+        latencies.sort()
+
+        with ExitStack() as stack:
+            contexts = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            self._request(scenario, path)
+        # The savepoint around writes is not part of the request
+        queries = sum(
+            1 for context in contexts for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        )
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(self.alloc_iterations):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                self._request(scenario, path)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'queries': queries,
+            'alloc_kib': round(max(peaks) / 1024, 1) if peaks else 0.0,
+        }
+
+
+def server_errors(result):
+    """5xx statuses of a scenario: a broken route, not a figure to baseline."""
+    return [code for code in result['status'] if code >= 500]
+
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=1.0):
+    """Regressions of ``results`` against ``baseline`` as (key, message) pairs."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        p95, base_p95 = current['p95_ms'], previous['p95_ms']
+        if p95 > base_p95 * (1 + tolerance) and p95 - base_p95 > min_delta_ms:
+            regressions.append((key, f'p95 {base_p95:.2f}ms -> {p95:.2f}ms'))
+        if current['queries'] > previous['queries']:
+            regressions.append((key, f"queries {previous['queries']} -> {current['queries']}"))
+        if current['alloc_kib'] > previous['alloc_kib'] * (1 + tolerance) + 16:
+            regressions.append((key, f"alloc {previous['alloc_kib']}KiB -> {current['alloc_kib']}KiB"))
+        if current['status'] != previous['status']:
+            regressions.append((key, f"status {previous['status']} -> {current['status']}"))
+    return regressions
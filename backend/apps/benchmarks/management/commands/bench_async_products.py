@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.benchmarks.harness import percentile
+from apps.benchmarks.seeding import seed
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput of the sync product list (/api/products/) against the async one '
+        '(/api/v2/products/) under concurrent clients. Seeded data is committed and deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0.0,
+            help='Sleep this long in every query to simulate a remote database',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['products'], options['requests'], options['concurrency']) < 1:
+            raise CommandError('--products, --requests and --concurrency must be positive')
+        latency = options['db_latency_ms'] / 1000
+
+        def slow_execute(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def install(connection, **kwargs):
+            connection.execute_wrappers.append(slow_execute)
+
+        rates = {scope: None for scope in settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})}
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        # Threads read through their own connections, so the data has to be committed
+        result = seed(users=2, products=options['products'], uploads=0, orders=0, rollups=False)
+        try:
+            if latency:
+                connection_created.connect(install, dispatch_uid='bench_async_products')
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                CONCURRENCY_LIMITS={},
+                REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+            ):
+                token = str(RefreshToken.for_user(User.objects.get(pk=result.users[0])).access_token)
+                headers = {'Authorization': f'Bearer {token}'}
+                self.report('sync (WSGI, threads)', self.run_sync(headers, options))
+                self.report('async (ASGI)', asyncio.run(self.run_async(headers, options)))
+        finally:
+            connection_created.disconnect(dispatch_uid='bench_async_products')
+            User.objects.filter(pk__in=result.users).delete()
+
+    def run_sync(self, headers, options):
+        def request(_):
+            started = time.perf_counter()
+            response = Client().get('/api/products/', headers=headers)
+            connections.close_all()
+            return time.perf_counter() - started, response.status_code
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            started = time.perf_counter()
+            samples = list(pool.map(request, range(options['requests'])))
+        return samples, time.perf_counter() - started
+
+    async def run_async(self, headers, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                # Like ASGIHandler: sync code of one request runs on its own thread
+                async with ThreadSensitiveContext():
+                    response = await client.get('/api/v2/products/', headers=headers)
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return samples, time.perf_counter() - started
+
+    def report(self, label, run):
+        samples, elapsed = run
+        latencies = sorted(seconds * 1000 for seconds, _ in samples)
+        errors = sum(1 for _, status in samples if status != 200)
+        self.stdout.write(
+            f'{label:<22} {len(samples) / elapsed:8.1f} req/s  '
+            f'p50 {percentile(latencies, 50):8.2f} ms  p95 {percentile(latencies, 95):8.2f} ms  '
+            f'non-200 {errors}'
+        )
@@ -0,0 +1,145 @@
+import json
+import logging
+import platform
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from apps.benchmarks.harness import (
+    SCENARIOS, SKIPPED_ROUTES, Runner, build_fixtures, compare, server_errors, uncovered_routes,
+)
+from apps.benchmarks.seeding import seed
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API route at several dataset sizes and compare against a baseline. '
+        'All data is created inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help='Comma separated product counts')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--only', action='append', default=[], help='Run scenarios whose name contains this')
+        parser.add_argument('--output', help='Write the results as JSON (usable as a baseline)')
+        parser.add_argument('--baseline', help='Compare against results written earlier with --output')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative p95 / allocation growth')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be comma separated integers')
+        if not sizes or min(sizes) < 1 or options['iterations'] < 1:
+            raise CommandError('--sizes and --iterations must be positive')
+
+        scenarios = [
+            scenario for scenario in SCENARIOS
+            if not options['only'] or any(part in scenario.name for part in options['only'])
+        ]
+        if not scenarios:
+            raise CommandError('No scenario matches --only')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())['results']
+            except (OSError, ValueError, KeyError) as exc:
+                raise CommandError(f'Cannot read baseline: {exc}')
+
+        # Rate limits and load shedding would turn repeated requests into 429/503s
+        rates = {scope: None for scope in settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})}
+        results = {}
+        failed = []
+        # Expected 4xx responses would otherwise be logged on every iteration
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CONCURRENCY_LIMITS={},
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+        ):
+            for number, size in enumerate(sizes):
+                results.update(self.run_size(size, scenarios, options, failed, report_routes=number == 0))
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps({
+                'meta': {
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'database': settings.DATABASES['default']['ENGINE'],
+                    'iterations': options['iterations'],
+                },
+                'results': results,
+            }, indent=2, ensure_ascii=False))
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare(results, baseline, tolerance=options['tolerance'])
+            for key, message in regressions:
+                self.stdout.write(self.style.WARNING(f'REGRESSION {key}: {message}'))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+            elif options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regression(s) against the baseline')
+
+        if failed:
+            raise CommandError(f"{len(failed)} scenario(s) answered 5xx: {', '.join(failed)}")
+
+    def run_size(self, size, scenarios, options, failed, report_routes=False):
+        """Results by ``size:scenario``; scenarios answering 5xx go to ``failed`` instead"""
+        results = {}
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                seeded = seed(
+                    users=max(10, size // 10), products=size, uploads=max(10, size // 5),
+                    orders=max(10, size // 2), batch_size=1000,
+                )
+                fixtures = build_fixtures(seeded.products)
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'\n{size} products (seeded in {time.perf_counter() - started:.1f}s)'
+                ))
+                if report_routes:
+                    for name in uncovered_routes(fixtures):
+                        self.stdout.write(self.style.WARNING(f'route without a scenario: {name}'))
+                    for name, reason in SKIPPED_ROUTES.items():
+                        self.stdout.write(f'skipped {name}: {reason}')
+
+                self.stdout.write(
+                    f"{'scenario':<28} {'status':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                    f"{'queries':>8} {'alloc KiB':>10}"
+                )
+                runner = Runner(fixtures, iterations=options['iterations'], warmup=options['warmup'])
+                for scenario in scenarios:
+                    result = runner.run(scenario)
+                    key = f'{size}:{scenario.name}'
+                    if server_errors(result):
+                        # Kept out of --output so a baseline never records a broken route
+                        failed.append(key)
+                    else:
+                        results[key] = result
+                    status = ','.join(str(code) for code in result['status'])
+                    line = (
+                        f"{scenario.name:<28} {status:>9} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                        f"{result['p99_ms']:9.2f} {result['queries']:8d} {result['alloc_kib']:10.1f}"
+                    )
+                    ok = all(code < 400 for code in result['status'])
+                    self.stdout.write(line if ok else self.style.ERROR(line))
+                raise Rollback
+        except Rollback:
+            pass
+        return results
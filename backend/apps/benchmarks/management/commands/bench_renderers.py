@@ -0,0 +1,62 @@
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from apps.benchmarks.seeding import seed
+from apps.products.models import Product
+from apps.products.serializers import ProductSerializer
+from marketon.renderers import MessagePackParser, MessagePackRenderer, ORJSONParser, ORJSONRenderer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare render / parse time and body size of DRF JSON, orjson and MessagePack on product pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='20,100,1000')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                seed(users=10, products=max(page_sizes), uploads=0, orders=0, rollups=False)
+                self.run(page_sizes, options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, page_sizes, iterations):
+        # Image URLs are built from the request
+        request = APIRequestFactory().get('/api/products/')
+        queryset = Product.objects.select_related('created_by').prefetch_related('images')
+        formats = (
+            ('drf json', JSONRenderer(), JSONParser()),
+            ('orjson', ORJSONRenderer(), ORJSONParser()),
+            ('msgpack', MessagePackRenderer(), MessagePackParser()),
+        )
+        for size in page_sizes:
+            data = ProductSerializer(queryset[:size], many=True, context={'request': request}).data
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{size} products per page'))
+            self.stdout.write(f"{'format':<10} {'render ms':>10} {'parse ms':>10} {'bytes':>10}")
+            for label, renderer, parser in formats:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    body = renderer.render(data, renderer.media_type, {})
+                render_ms = (time.perf_counter() - started) / iterations * 1000
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    parser.parse(io.BytesIO(body), parser.media_type, {})
+                parse_ms = (time.perf_counter() - started) / iterations * 1000
+                self.stdout.write(f'{label:<10} {render_ms:10.3f} {parse_ms:10.3f} {len(body):10d}')
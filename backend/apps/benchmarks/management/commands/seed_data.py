@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.seeding import SEED_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = 'Bulk insert synthetic users, products, images, uploads and orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--images-per-product', type=int, default=2)
+        parser.add_argument('--uploads', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=500)
+        parser.add_argument('--items-per-order', type=int, default=3)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated values')
+        parser.add_argument('--no-rollups', action='store_true', help='Skip rebuilding today\'s dashboard rollups')
+
+    def handle(self, *args, **options):
+        counts = ('users', 'products', 'images_per_product', 'uploads', 'orders', 'items_per_order')
+        if any(options[name] < 0 for name in counts) or options['batch_size'] < 1:
+            raise CommandError('Counts must not be negative and --batch-size must be positive')
+
+        started = time.perf_counter()
+        result = seed(
+            **{name: options[name] for name in counts},
+            batch_size=options['batch_size'],
+            random_seed=options['seed'],
+            rollups=not options['no_rollups'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for name, count in result.counts.items():
+            self.stdout.write(f'{name:<16} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded tag {result.tag} in {elapsed:.2f}s; users are seed_{result.tag}_<n> '
+            f'with password {SEED_PASSWORD!r}'
+        ))
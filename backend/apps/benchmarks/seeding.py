@@ -0,0 +1,174 @@
+"""
+Bulk data generation for benchmarks and local load testing.
+
+Everything is inserted with ``bulk_create`` and a single pre-hashed password,
+so signals (stock rollups, order_placed) do not fire; call
+``rebuild_range`` afterwards when the dashboard rollups are needed.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.dashboard.rollups import rebuild_range
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Product, ProductImage, ProductStats
+from apps.upload.models import UploadedFile, UploadedImage
+
+User = get_user_model()
+
+SEED_PASSWORD = 'seed-password-1234'
+
+CATEGORIES = [
+    '의류', '신발', '가방', '전자기기', '가전', '도서', '식품', '뷰티',
+    '스포츠', '완구', '가구', '주방', '반려동물', '문구', '자동차용품', '캠핑',
+]
+WORDS = [
+    '프리미엄', '베이직', '슬림', '클래식', '오가닉', '스마트', '미니', '빈티지',
+    '데일리', '울트라', '라이트', '소프트', '모던', '코튼', '레더', '에코',
+]
+
+
+@dataclass
+class SeedResult:
+    tag: str
+    users: list = field(default_factory=list)
+    products: list = field(default_factory=list)
+    orders: list = field(default_factory=list)
+    counts: dict = field(default_factory=dict)
+
+
+def _batched_create(model, objs, batch_size):
+    created = model.objects.bulk_create(objs, batch_size=batch_size)
+    return [obj.pk for obj in created]
+
+
+def seed(users=100, products=1000, images_per_product=2, uploads=200, orders=500,
+         items_per_order=3, batch_size=1000, random_seed=0, rollups=True):
+    """
+    Insert a synthetic dataset and return the new primary keys.
+
+    Names carry a random tag so repeated runs never collide on unique columns.
+    """
+    rng = random.Random(random_seed)
+    tag = uuid.uuid4().hex[:8]
+    result = SeedResult(tag=tag)
+    password = make_password(SEED_PASSWORD)
+
+    with transaction.atomic():
+        result.users = _batched_create(User, [
+            User(username=f'seed_{tag}_{i}', email=f'seed_{tag}_{i}@example.com', password=password)
+            for i in range(max(users, 1))
+        ], batch_size)
+
+        product_rows = [
+            Product(
+                name=f'{rng.choice(WORDS)} {rng.choice(WORDS)} 상품 {tag}-{i}',
+                description=' '.join(rng.choices(WORDS, k=12)),
+                price=Decimal(rng.randrange(1_000, 500_000, 100)),
+                category=rng.choice(CATEGORIES),
+                stock=rng.randrange(0, 500),
+                is_active=rng.random() > 0.1,
+                created_by_id=rng.choice(result.users),
+            )
+            for i in range(products)
+        ]
+        for product in product_rows:
+            product.update_search_keys()
+        result.products = _batched_create(Product, product_rows, batch_size)
+
+        _batched_create(ProductImage, [
+            ProductImage(
+                product_id=product_id,
+                image=f'products/seed/{tag}/{product_id}_{n}.jpg',
+                alt_text=f'이미지 {n}',
+                order=n,
+                is_main=n == 0,
+            )
+            for product_id in result.products
+            for n in range(images_per_product)
+        ], batch_size)
+
+        # Popularity counters for ?ordering=popular and trending (most products have some)
+        _batched_create(ProductStats, [
+            ProductStats(
+                product_id=product_id,
+                views=(views := rng.randrange(0, 5_000)),
+                cart_adds=(cart_adds := rng.randrange(0, views // 10 + 1)),
+                score=(views + 5 * cart_adds) * rng.random(),
+            )
+            for product_id in result.products
+            if rng.random() > 0.2
+        ], batch_size)
+
+        half = uploads // 2
+        _batched_create(UploadedFile, [
+            UploadedFile(
+                file=f'uploads/files/seed/{tag}/{i}.pdf',
+                original_name=f'document-{i}.pdf',
+                file_size=rng.randrange(10_000, 5_000_000),
+                file_type='application/pdf',
+                uploaded_by_id=rng.choice(result.users),
+            )
+            for i in range(uploads - half)
+        ], batch_size)
+        _batched_create(UploadedImage, [
+            UploadedImage(
+                image=f'uploads/images/seed/{tag}/{i}.jpg',
+                original_name=f'photo-{i}.jpg',
+                image_size=rng.randrange(10_000, 2_000_000),
+                width=rng.choice((640, 800, 1024, 1920)),
+                height=rng.choice((480, 600, 768, 1080)),
+                uploaded_by_id=rng.choice(result.users),
+            )
+            for i in range(half)
+        ], batch_size)
+
+        if result.products and orders:
+            by_id = {p.pk: p for p in product_rows}
+            order_lines = []
+            order_rows = []
+            for _ in range(orders):
+                lines = [
+                    (by_id[product_id], rng.randint(1, 3))
+                    for product_id in rng.sample(result.products, min(items_per_order, len(result.products)))
+                ]
+                order_lines.append(lines)
+                order_rows.append(Order(
+                    user_id=rng.choice(result.users),
+                    status=rng.choice((Order.STATUS_PAID, Order.STATUS_SHIPPED, Order.STATUS_COMPLETED)),
+                    total_amount=sum(product.price * quantity for product, quantity in lines),
+                ))
+            result.orders = _batched_create(Order, order_rows, batch_size)
+            _batched_create(OrderItem, [
+                OrderItem(
+                    order_id=order_id,
+                    product_id=product.pk,
+                    seller_id=product.created_by_id,
+                    product_name=product.name,
+                    category=product.category,
+                    unit_price=product.price,
+                    quantity=quantity,
+                )
+                for order_id, lines in zip(result.orders, order_lines)
+                for product, quantity in lines
+            ], batch_size)
+
+        if rollups and result.orders:
+            today = timezone.localdate()
+            rebuild_range(today, today, batch_size=batch_size)
+
+    result.counts = {
+        'users': len(result.users),
+        'products': len(result.products),
+        'product_images': len(result.products) * images_per_product,
+        'uploads': uploads,
+        'orders': len(result.orders),
+        'order_items': len(result.orders) * min(items_per_order, len(result.products)),
+    }
+    return result
@@ -1,3 +1,23 @@
 from django.contrib import admin
+from .models import Cart, CartItem, StockReservation
 
-# Register your models here.
+
+class CartItemInline(admin.TabularInline):
+    model = CartItem
+    extra = 0
+    raw_id_fields = ['product']
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    list_display = ['user', 'updated_at', 'expires_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    inlines = [CartItemInline]
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'product', 'quantity', 'expires_at']
+    list_select_related = ['user', 'product']
+    raw_id_fields = ['user', 'product']
@@ -0,0 +1,11 @@
+from datetime import timedelta
+
+from apps.jobs.registry import periodic
+from .sweeper import sweep
+
+
+@periodic(timedelta(minutes=5), max_attempts=1, concurrency=1)
+def sweep_expired_carts():
+    """Release expired reservations and delete abandoned carts."""
+    for _ in sweep():
+        pass
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.carts.sweeper import sweep
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock reservations and delete abandoned carts in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-batches', type=int, help='Per kind; default is until done')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        started = time.perf_counter()
+        totals = {}
+        for number, batch in enumerate(sweep(options['batch_size'], options['max_batches']), start=1):
+            totals[batch.kind] = totals.get(batch.kind, 0) + batch.rows
+            detail = f', {batch.products} products restocked' if batch.kind == 'reservations' else ''
+            self.stdout.write(
+                f'batch {number}: {batch.rows} {batch.kind}{detail} in {batch.elapsed * 1000:.1f}ms'
+            )
+
+        summary = ', '.join(f'{rows} {kind}' for kind, rows in totals.items()) or 'nothing expired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Swept {summary} in {time.perf_counter() - started:.2f}s'
+        ))
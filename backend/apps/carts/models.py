@@ -1,3 +1,86 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.products.models import Product
+
+User = get_user_model()
+
+
+def cart_expiry():
+    return timezone.now() + timedelta(seconds=settings.CART_TTL_SECONDS)
+
+
+def reservation_expiry():
+    return timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL_SECONDS)
+
+
+class Cart(models.Model):
+    """
+    Shopping cart; abandoned carts are deleted by the expiry sweeper
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(default=cart_expiry, db_index=True)
+
+    class Meta:
+        db_table = 'carts_cart'
+        verbose_name = 'Cart'
+        verbose_name_plural = 'Carts'
+
+    def __str__(self):
+        return f"Cart of {self.user_id}"
+
+    def touch(self):
+        self.expires_at = cart_expiry()
+        self.save(update_fields=['expires_at', 'updated_at'])
+
+
+class CartItem(models.Model):
+    """
+    Product line in a cart
+    """
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cart_items')
+    quantity = models.PositiveIntegerField(default=1)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'carts_cartitem'
+        verbose_name = 'Cart Item'
+        verbose_name_plural = 'Cart Items'
+        ordering = ['added_at']
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='carts_item_cart_product_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a user's cart. The held quantity is already subtracted from
+    Product.stock; it is added back when the hold expires or is removed, and
+    consumed when the user places an order.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=reservation_expiry, db_index=True)
+
+    class Meta:
+        db_table = 'carts_stockreservation'
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='carts_reservation_user_product_uniq'),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.quantity} of {self.product_id} for {self.user_id}"
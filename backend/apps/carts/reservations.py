@@ -0,0 +1,79 @@
+"""
+Stock holds for cart items.
+
+A hold subtracts its quantity from ``Product.stock`` up front with a
+conditional UPDATE, so checkout never oversells a product that is sitting in
+someone's cart.  Holds are returned to stock by ``release`` or, once expired,
+by the sweeper in ``apps.carts.sweeper``.  Every stock UPDATE also sets
+``updated_at`` (``update()`` skips ``auto_now``) so product ETags and the
+change feed see the new stock.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.products.models import Product
+from apps.products.signals import stock_changed
+from .models import StockReservation, reservation_expiry
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def reserve(user_id, product_id, quantity):
+    """Hold ``quantity`` more units of a product for the user and extend the hold."""
+    with transaction.atomic():
+        updated = Product.objects.filter(
+            pk=product_id,
+            is_active=True,
+            stock__gte=quantity
+        ).update(stock=F('stock') - quantity, updated_at=timezone.now())
+        if not updated:
+            raise InsufficientStock(product_id)
+        stock_changed.send(sender=Product, product_ids=[product_id])
+
+        expires_at = reservation_expiry()
+        held = StockReservation.objects.filter(user_id=user_id, product_id=product_id).update(
+            quantity=F('quantity') + quantity,
+            expires_at=expires_at
+        )
+        if not held:
+            StockReservation.objects.create(
+                user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at
+            )
+
+
+def release(user_id, product_id):
+    """Return the user's hold on a product to stock. Returns the released quantity."""
+    with transaction.atomic():
+        reservation = (
+            StockReservation.objects.select_for_update()
+            .filter(user_id=user_id, product_id=product_id)
+            .first()
+        )
+        if reservation is None:
+            return 0
+        reservation.delete()
+        Product.objects.filter(pk=product_id).update(
+            stock=F('stock') + reservation.quantity, updated_at=timezone.now()
+        )
+        stock_changed.send(sender=Product, product_ids=[product_id])
+        return reservation.quantity
+
+
+def consume(user_id, product_ids):
+    """
+    Remove the user's holds on ``product_ids`` for checkout and return
+    ``{product_id: held quantity}``. Must run inside the order transaction.
+    Holds already released by the sweeper are simply absent from the result.
+    """
+    reservations = list(
+        StockReservation.objects.select_for_update()
+        .filter(user_id=user_id, product_id__in=product_ids)
+        .values_list('id', 'product_id', 'quantity')
+    )
+    if not reservations:
+        return {}
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in reservations]).delete()
+    return {product_id: quantity for _, product_id, quantity in reservations}
@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from .models import CartItem
+
+
+class CartItemSerializer(serializers.ModelSerializer):
+    name = serializers.ReadOnlyField(source='product.name')
+    price = serializers.DecimalField(source='product.price', max_digits=10, decimal_places=2, read_only=True)
+    reserved_quantity = serializers.SerializerMethodField()
+    reserved_until = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CartItem
+        fields = ['id', 'product', 'name', 'price', 'quantity', 'reserved_quantity', 'reserved_until', 'added_at']
+        read_only_fields = fields
+
+    def _reservation(self, obj):
+        return self.context.get('reservations', {}).get(obj.product_id)
+
+    def get_reserved_quantity(self, obj):
+        reservation = self._reservation(obj)
+        return reservation.quantity if reservation else 0
+
+    def get_reserved_until(self, obj):
+        reservation = self._reservation(obj)
+        return reservation.expires_at if reservation else None
+
+
+class CartAddSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
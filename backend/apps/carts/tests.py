@@ -1,3 +1,138 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.products.models import Product
+from .models import Cart, StockReservation
+from .reservations import InsufficientStock, release, reserve
+from .sweeper import sweep
+
+User = get_user_model()
+
+
+class ReservationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'other-password')
+        cls.product = Product.objects.create(
+            name='Product', description='', price=1000, stock=5, category='books', created_by=cls.user,
+        )
+
+    def stock(self, product=None):
+        return Product.objects.values_list('stock', flat=True).get(pk=(product or self.product).pk)
+
+    def expire_holds(self):
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+
+class ReservationTests(ReservationTestCase):
+    def test_reserve_subtracts_stock_and_merges_holds(self):
+        reserve(self.user.pk, self.product.pk, 2)
+        reserve(self.user.pk, self.product.pk, 1)
+        self.assertEqual(self.stock(), 2)
+        self.assertEqual(StockReservation.objects.get().quantity, 3)
+
+    def test_reserve_never_oversells(self):
+        reserve(self.user.pk, self.product.pk, 4)
+        with self.assertRaises(InsufficientStock):
+            reserve(self.other.pk, self.product.pk, 2)
+        self.assertEqual(self.stock(), 1)
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+    def test_release_returns_stock_once(self):
+        reserve(self.user.pk, self.product.pk, 2)
+        self.assertEqual(release(self.user.pk, self.product.pk), 2)
+        self.assertEqual(release(self.user.pk, self.product.pk), 0)
+        self.assertEqual(self.stock(), 5)
+
+
+class SweeperTests(ReservationTestCase):
+    def test_expired_hold_returns_stock_exactly_once(self):
+        reserve(self.user.pk, self.product.pk, 2)
+        reserve(self.other.pk, self.product.pk, 1)
+        self.expire_holds()
+        results = list(sweep())
+        self.assertEqual([(r.kind, r.rows, r.products) for r in results], [('reservations', 2, 1)])
+        self.assertEqual(list(sweep()), [])
+        self.assertEqual(self.stock(), 5)
+        # Releasing a swept hold is a no-op
+        self.assertEqual(release(self.user.pk, self.product.pk), 0)
+        self.assertEqual(self.stock(), 5)
+
+    def test_unexpired_holds_are_kept(self):
+        reserve(self.user.pk, self.product.pk, 2)
+        self.assertEqual(list(sweep()), [])
+        self.assertEqual(self.stock(), 3)
+
+    def test_batches(self):
+        second = Product.objects.create(
+            name='Second', description='', price=1000, stock=5, category='books', created_by=self.user,
+        )
+        for user in (self.user, self.other):
+            for product in (self.product, second):
+                reserve(user.pk, product.pk, 1)
+        self.expire_holds()
+        self.assertEqual(len(list(sweep(batch_size=3, max_batches=1))), 1)
+        self.assertEqual(self.stock() + self.stock(second), 9)
+        self.assertEqual([r.rows for r in sweep(batch_size=3)], [1])
+        self.assertEqual((self.stock(), self.stock(second)), (5, 5))
+
+    def test_expired_carts_are_deleted(self):
+        Cart.objects.create(user=self.user, expires_at=timezone.now() - timedelta(seconds=1))
+        Cart.objects.create(user=self.other)
+        self.assertEqual([(r.kind, r.rows) for r in sweep()], [('carts', 1)])
+        self.assertEqual(list(Cart.objects.values_list('user', flat=True)), [self.other.pk])
+
+
+class CheckoutReservationTests(ReservationTestCase):
+    """Placing an order consumes the user's holds instead of subtracting the stock again"""
+    client_class = APIClient
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def add_to_cart(self, quantity):
+        response = self.client.post(
+            reverse('carts:cart_add'), {'product_id': self.product.pk, 'quantity': quantity}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def order(self, quantity):
+        return self.client.post(
+            reverse('orders:order_create'), {'items': [{'product_id': self.product.pk, 'quantity': quantity}]},
+            format='json',
+        )
+
+    def test_order_consumes_hold(self):
+        self.add_to_cart(2)
+        self.assertEqual(self.stock(), 3)
+        self.assertEqual(self.order(2).status_code, 201)
+        self.assertEqual(self.stock(), 3)
+        self.assertFalse(StockReservation.objects.exists())
+        # Nothing is left for the sweeper to return
+        self.expire_holds()
+        list(sweep(now=timezone.now() + timedelta(days=1)))
+        self.assertEqual(self.stock(), 3)
+
+    def test_order_more_than_held(self):
+        self.add_to_cart(2)
+        self.assertEqual(self.order(3).status_code, 201)
+        self.assertEqual(self.stock(), 2)
+
+    def test_order_less_than_held_returns_the_rest(self):
+        self.add_to_cart(2)
+        self.assertEqual(self.order(1).status_code, 201)
+        self.assertEqual(self.stock(), 4)
 
-# Create your tests here.
+    def test_order_after_hold_expired(self):
+        self.add_to_cart(2)
+        self.expire_holds()
+        list(sweep())
+        self.assertEqual(self.stock(), 5)
+        self.assertEqual(self.order(2).status_code, 201)
+        self.assertEqual(self.stock(), 3)
@@ -1,45 +1,89 @@
-from django.shortcuts import render
+from django.db import transaction
+from django.db.models import F
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from apps.products import counters
+from .models import Cart, CartItem, StockReservation, cart_expiry
+from .reservations import InsufficientStock, release, reserve
+from .serializers import CartItemSerializer, CartAddSerializer
 
 
-# Create your views here.
+def get_cart(user_id):
+    cart, created = Cart.objects.get_or_create(user_id=user_id)
+    if not created:
+        cart.touch()
+    return cart
 
 
 class CartView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request):
-        # Mock cart view response
+        items = list(CartItem.objects.filter(cart__user_id=request.user.pk).select_related('product'))
+        reservations = {
+            reservation.product_id: reservation
+            for reservation in StockReservation.objects.filter(user_id=request.user.pk)
+        }
+        serializer = CartItemSerializer(items, many=True, context={'reservations': reservations})
         return Response({
-            'message': 'Cart view endpoint - Mock implementation',
             'cart': {
-                'items': [
-                    {'id': 1, 'name': 'Mock Cart Item 1', 'quantity': 2, 'price': 10000},
-                    {'id': 2, 'name': 'Mock Cart Item 2', 'quantity': 1, 'price': 20000},
-                ],
-                'total': 40000
+                'items': serializer.data,
+                'total': sum(item.product.price * item.quantity for item in items)
             }
         }, status=status.HTTP_200_OK)
 
 
 class CartAddView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        # Mock cart add response
+        serializer = CartAddSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        product_id = serializer.validated_data['product_id']
+        quantity = serializer.validated_data['quantity']
+
+        try:
+            with transaction.atomic():
+                reserve(request.user.pk, product_id, quantity)
+                cart = get_cart(request.user.pk)
+                item, created = CartItem.objects.get_or_create(
+                    cart=cart, product_id=product_id, defaults={'quantity': quantity}
+                )
+                if not created:
+                    CartItem.objects.filter(pk=item.pk).update(quantity=F('quantity') + quantity)
+                    item.refresh_from_db()
+        except InsufficientStock:
+            return Response(
+                {'error': f'Product {product_id} is unavailable or out of stock'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Popularity signal, written behind in batches
+        counters.record(product_id, counters.CART_ADDS, quantity)
+        reservations = {r.product_id: r for r in StockReservation.objects.filter(
+            user_id=request.user.pk, product_id=product_id
+        )}
         return Response({
-            'message': 'Cart add endpoint - Mock implementation',
-            'added_item': {
-                'id': 3,
-                'name': 'New Mock Item',
-                'quantity': 1,
-                'price': 15000
-            }
+            'message': 'Item added to cart',
+            'added_item': CartItemSerializer(item, context={'reservations': reservations}).data
         }, status=status.HTTP_200_OK)
 
 
 class CartRemoveView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def delete(self, request, pk):
-        # Mock cart remove response
+        item = get_object_or_404(CartItem, pk=pk, cart__user_id=request.user.pk)
+        with transaction.atomic():
+            item.delete()
+            released = release(request.user.pk, item.product_id)
+        Cart.objects.filter(user_id=request.user.pk).update(expires_at=cart_expiry())
         return Response({
-            'message': f'Cart remove endpoint - Mock implementation for item {pk}',
-            'removed_item_id': pk
+            'message': 'Item removed from cart',
+            'removed_item_id': pk,
+            'released_quantity': released
         }, status=status.HTTP_200_OK)
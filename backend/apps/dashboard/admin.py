@@ -0,0 +1,36 @@
+from django.contrib import admin
+from .models import (
+    DailySales, DailyProductSales, DailyCategorySales, DailySellerSales, DailyInventory
+)
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'orders_count', 'units_sold', 'revenue']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'product_id', 'orders_count', 'units_sold', 'revenue']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'category', 'orders_count', 'units_sold', 'revenue']
+    list_filter = ['category']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailySellerSales)
+class DailySellerSalesAdmin(admin.ModelAdmin):
+    list_display = ['date', 'seller', 'orders_count', 'units_sold', 'revenue']
+    list_select_related = ['seller']
+    date_hierarchy = 'date'
+
+
+@admin.register(DailyInventory)
+class DailyInventoryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'product_id', 'units_in', 'units_out', 'units_removed']
+    date_hierarchy = 'date'
@@ -0,0 +1,19 @@
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from apps.jobs.registry import job, periodic
+from . import rollups
+
+
+@job(concurrency=1)
+def rebuild_rollups(start, end):
+    """Recompute the rollups for ``[start, end]`` (ISO dates)."""
+    rollups.rebuild_range(date.fromisoformat(start), date.fromisoformat(end))
+
+
+@periodic(timedelta(days=1), max_attempts=1, concurrency=1)
+def rebuild_recent_rollups():
+    """Repair any drift in yesterday's and today's rollups."""
+    today = timezone.localdate()
+    rollups.rebuild_range(today - timedelta(days=1), today)
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Min
+from django.utils import timezone
+
+from apps.dashboard import rollups
+from apps.orders.models import Order
+
+
+def date_chunks(start, end, days):
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        yield start, chunk_end
+        start = chunk_end + timedelta(days=1)
+
+
+def rebuild_chunk(start, end):
+    started = time.perf_counter()
+    try:
+        rollups.rebuild_range(start, end)
+    finally:
+        # Each worker thread has its own connection
+        connections.close_all()
+    return start, end, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard rollup tables from order lines in parallel date chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (default: first order)')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (default: today)')
+        parser.add_argument('--chunk-days', type=int, default=7)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        end = options['end'] or timezone.localdate()
+        start = options['start']
+        if start is None:
+            first = Order.objects.aggregate(first=Min('created_at'))['first']
+            if first is None:
+                self.stdout.write('No orders; nothing to rebuild.')
+                return
+            start = timezone.localdate(first)
+        if start > end:
+            raise CommandError('--start must not be after --end')
+        if options['chunk_days'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-days and --workers must be positive')
+
+        chunks = list(date_chunks(start, end, options['chunk_days']))
+        self.stdout.write(f'Rebuilding {start}..{end} in {len(chunks)} chunks with {options["workers"]} workers')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [pool.submit(rebuild_chunk, s, e) for s, e in chunks]
+            for future in as_completed(futures):
+                chunk_start, chunk_end, elapsed = future.result()
+                self.stdout.write(f'  {chunk_start}..{chunk_end} done in {elapsed:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(chunks)} chunks in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.CharField(max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Daily Category Sales',
+                'verbose_name_plural': 'Daily Category Sales',
+                'db_table': 'dashboard_daily_category_sales',
+                'constraints': [models.UniqueConstraint(fields=('date', 'category'), name='dashboard_daily_category_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales',
+                'verbose_name_plural': 'Daily Sales',
+                'db_table': 'dashboard_daily_sales',
+                'constraints': [models.UniqueConstraint(fields=('date',), name='dashboard_daily_sales_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units_in', models.PositiveIntegerField(default=0)),
+                ('units_out', models.PositiveIntegerField(default=0)),
+                ('units_removed', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Daily Inventory',
+                'verbose_name_plural': 'Daily Inventory',
+                'db_table': 'dashboard_daily_inventory',
+                'indexes': [models.Index(fields=['product', 'date'], name='dashboard_inventory_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='dashboard_daily_inventory_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Daily Product Sales',
+                'verbose_name_plural': 'Daily Product Sales',
+                'db_table': 'dashboard_daily_product_sales',
+                'indexes': [models.Index(fields=['product', 'date'], name='dashboard_product_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='dashboard_daily_product_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySellerSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('units_sold', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Seller Sales',
+                'verbose_name_plural': 'Daily Seller Sales',
+                'db_table': 'dashboard_daily_seller_sales',
+                'indexes': [models.Index(fields=['seller', 'date'], name='dashboard_seller_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'seller'), name='dashboard_daily_seller_uniq')],
+            },
+        ),
+    ]
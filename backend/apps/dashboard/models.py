@@ -0,0 +1,116 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+from apps.products.models import Product
+
+User = get_user_model()
+
+
+class RollupFields(models.Model):
+    """
+    Counters shared by the daily sales rollups
+    """
+    date = models.DateField()
+    orders_count = models.PositiveIntegerField(default=0)
+    units_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySales(RollupFields):
+    """
+    Store-wide sales per day
+    """
+    class Meta:
+        db_table = 'dashboard_daily_sales'
+        verbose_name = 'Daily Sales'
+        verbose_name_plural = 'Daily Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date'], name='dashboard_daily_sales_uniq'),
+        ]
+
+
+class DailyProductSales(RollupFields):
+    """
+    Sales per product per day
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+
+    class Meta:
+        db_table = 'dashboard_daily_product_sales'
+        verbose_name = 'Daily Product Sales'
+        verbose_name_plural = 'Daily Product Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='dashboard_daily_product_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'date'], name='dashboard_product_date_idx'),
+        ]
+
+
+class DailyCategorySales(RollupFields):
+    """
+    Sales per category per day
+    """
+    category = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'dashboard_daily_category_sales'
+        verbose_name = 'Daily Category Sales'
+        verbose_name_plural = 'Daily Category Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='dashboard_daily_category_uniq'),
+        ]
+
+
+class DailySellerSales(RollupFields):
+    """
+    Sales per seller (Product.created_by) per day
+    """
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        db_table = 'dashboard_daily_seller_sales'
+        verbose_name = 'Daily Seller Sales'
+        verbose_name_plural = 'Daily Seller Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'seller'], name='dashboard_daily_seller_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['seller', 'date'], name='dashboard_seller_date_idx'),
+        ]
+
+
+class DailyInventory(models.Model):
+    """
+    Stock movement per product per day
+    """
+    date = models.DateField()
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    # 판매 외 재고 증감(입고/수동 조정)은 units_in / units_removed
+    units_in = models.PositiveIntegerField(default=0)
+    units_out = models.PositiveIntegerField(default=0)
+    units_removed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'dashboard_daily_inventory'
+        verbose_name = 'Daily Inventory'
+        verbose_name_plural = 'Daily Inventory'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='dashboard_daily_inventory_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'date'], name='dashboard_inventory_date_idx'),
+        ]
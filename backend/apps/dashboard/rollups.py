@@ -0,0 +1,174 @@
+"""
+Incremental maintenance and chunked rebuild of the dashboard rollup tables.
+
+Order placement and stock changes add their deltas to the affected rollup
+rows inside the writing transaction, so dashboard reads never touch order
+lines.  Cancelling an order subtracts what placing it added.
+
+``rebuild_range`` recomputes a date range from the order lines, leaving
+cancelled orders out, and is used by the ``rebuild_rollups`` backfill
+command.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem
+from .models import (
+    DailySales, DailyProductSales, DailyCategorySales, DailySellerSales, DailyInventory
+)
+
+
+def increment(model, keys, deltas):
+    """UPDATE ... SET col = col + delta, inserting the row if it doesn't exist yet."""
+    expressions = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**keys).update(**expressions):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first
+        model.objects.filter(**keys).update(**expressions)
+
+
+def decrement(model, keys, deltas):
+    """UPDATE ... SET col = col - delta on an existing row (no row means nothing was added)."""
+    model.objects.filter(**keys).update(**{field: F(field) - value for field, value in deltas.items()})
+
+
+def _new_counters():
+    return {'orders_count': 0, 'units_sold': 0, 'revenue': Decimal('0')}
+
+
+def record_order(order, items, cancelled=False):
+    """Add a newly placed order to every sales rollup (or take a cancelled one back out)."""
+    apply = decrement if cancelled else increment
+    day = timezone.localdate(order.created_at)
+    by_product = defaultdict(_new_counters)
+    by_category = defaultdict(_new_counters)
+    by_seller = defaultdict(_new_counters)
+    total = _new_counters()
+
+    for item in items:
+        line_total = item.unit_price * item.quantity
+        groups = [by_product[item.product_id], by_category[item.category], total]
+        if item.seller_id:
+            groups.append(by_seller[item.seller_id])
+        for counters in groups:
+            counters['units_sold'] += item.quantity
+            counters['revenue'] += line_total
+
+    # orders_count counts the order once per product / category / seller
+    for counters in (*by_product.values(), *by_category.values(), *by_seller.values(), total):
+        counters['orders_count'] = 1
+
+    apply(DailySales, {'date': day}, total)
+    for product_id, counters in by_product.items():
+        apply(DailyProductSales, {'date': day, 'product_id': product_id}, counters)
+    for category, counters in by_category.items():
+        apply(DailyCategorySales, {'date': day, 'category': category}, counters)
+    for seller_id, counters in by_seller.items():
+        apply(DailySellerSales, {'date': day, 'seller_id': seller_id}, counters)
+    for product_id, counters in by_product.items():
+        apply(DailyInventory, {'date': day, 'product_id': product_id},
+                  {'units_out': counters['units_sold']})
+
+
+def record_stock_changes(deltas, day=None):
+    """Add manual stock edits (``{product_id: stock delta}``) to the inventory rollup."""
+    day = day or timezone.localdate()
+    if len(deltas) > 1:
+        return _record_stock_changes_many(deltas, day)
+    for product_id, delta in deltas.items():
+        if delta > 0:
+            increment(DailyInventory, {'date': day, 'product_id': product_id}, {'units_in': delta})
+        elif delta < 0:
+            increment(DailyInventory, {'date': day, 'product_id': product_id}, {'units_removed': -delta})
+
+
+def _record_stock_changes_many(deltas, day, batch_size=500):
+    """Bulk stock syncs: a few statements per batch instead of one or two per product."""
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    product_ids = list(deltas)
+    for start in range(0, len(product_ids), batch_size):
+        batch = product_ids[start:start + batch_size]
+        # Make sure every row exists (a concurrent insert is fine), then add to all of them
+        DailyInventory.objects.bulk_create(
+            [DailyInventory(date=day, product_id=product_id) for product_id in batch],
+            ignore_conflicts=True,
+        )
+        rows = list(DailyInventory.objects.filter(date=day, product_id__in=batch).only('pk', 'product_id'))
+        for row in rows:
+            delta = deltas[row.product_id]
+            row.units_in = F('units_in') + max(delta, 0)
+            row.units_removed = F('units_removed') + max(-delta, 0)
+        DailyInventory.objects.bulk_update(rows, ['units_in', 'units_removed'])
+
+
+def day_bounds(day_from, day_to):
+    """Aware datetimes covering ``[day_from, day_to]`` so filters can use the created_at index."""
+    start = timezone.make_aware(datetime.combine(day_from, time.min))
+    end = timezone.make_aware(datetime.combine(day_to + timedelta(days=1), time.min))
+    return start, end
+
+
+def _sales_rows(day_from, day_to, *group_by):
+    start, end = day_bounds(day_from, day_to)
+    items = OrderItem.objects.filter(
+        order__created_at__gte=start,
+        order__created_at__lt=end,
+    ).exclude(order__status=Order.STATUS_CANCELLED)
+    return (
+        items.annotate(day=TruncDate('order__created_at'))
+        .values('day', *group_by)
+        .annotate(
+            orders=Count('order', distinct=True),
+            units=Sum('quantity'),
+            amount=Sum(F('unit_price') * F('quantity')),
+        )
+        .order_by()
+    )
+
+
+def rebuild_range(day_from, day_to, batch_size=1000):
+    """
+    Recompute the sales rollups for ``[day_from, day_to]`` from order lines.
+
+    Inventory ``units_out`` is recomputed from sales; ``units_in`` and
+    ``units_removed`` come from stock edits that have no other record, so they
+    are preserved.
+    """
+    specs = [
+        (DailySales, (), lambda row: {}),
+        (DailyProductSales, ('product_id',), lambda row: {'product_id': row['product_id']}),
+        (DailyCategorySales, ('category',), lambda row: {'category': row['category']}),
+        (DailySellerSales, ('seller_id',), lambda row: {'seller_id': row['seller_id']}),
+    ]
+    with transaction.atomic():
+        for model, group_by, keys in specs:
+            model.objects.filter(date__gte=day_from, date__lte=day_to).delete()
+            rows = _sales_rows(day_from, day_to, *group_by)
+            if 'seller_id' in group_by:
+                rows = rows.filter(seller__isnull=False)
+            model.objects.bulk_create(
+                [
+                    model(date=row['day'], orders_count=row['orders'], units_sold=row['units'],
+                          revenue=row['amount'], **keys(row))
+                    for row in rows
+                ],
+                batch_size=batch_size,
+            )
+
+        DailyInventory.objects.filter(date__gte=day_from, date__lte=day_to).update(units_out=0)
+        for row in _sales_rows(day_from, day_to, 'product_id'):
+            increment(
+                DailyInventory,
+                {'date': row['day'], 'product_id': row['product_id']},
+                {'units_out': row['units']},
+            )
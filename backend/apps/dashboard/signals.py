@@ -0,0 +1,51 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.orders.models import Order
+from apps.orders.signals import order_placed
+from apps.products.models import Product
+from apps.products.signals import products_bulk_updated
+from . import rollups
+
+
+@receiver(order_placed)
+def rollup_order(sender, order, items, **kwargs):
+    rollups.record_order(order, items)
+
+
+@receiver(post_save, sender=Order)
+def rollup_order_status(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    previous = instance.loaded_value('status')
+    if previous is None or previous == instance.status:
+        return
+    if instance.status == Order.STATUS_CANCELLED:
+        rollups.record_order(instance, instance.items.all(), cancelled=True)
+    elif previous == Order.STATUS_CANCELLED:
+        # Reinstated: count it again
+        rollups.record_order(instance, instance.items.all())
+
+
+@receiver(post_save, sender=Product)
+def rollup_stock_edit(sender, instance, created, **kwargs):
+    if created:
+        delta = instance.stock
+    else:
+        previous = instance.loaded_value('stock')
+        if previous is None:
+            return
+        delta = instance.stock - previous
+    if delta:
+        rollups.record_stock_changes({instance.pk: delta})
+
+
+@receiver(products_bulk_updated)
+def rollup_bulk_stock_sync(sender, changes, **kwargs):
+    deltas = {}
+    for product_id, fields in changes.items():
+        if 'stock' in fields:
+            old, new = fields['stock']
+            deltas[product_id] = new - old
+    if deltas:
+        rollups.record_stock_changes(deltas)
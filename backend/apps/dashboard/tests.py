@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.products.models import Product
+from .models import DailyCategorySales, DailyInventory, DailyProductSales, DailySales, DailySellerSales
+from .rollups import rebuild_range
+
+User = get_user_model()
+
+SALES_MODELS = (DailySales, DailyProductSales, DailyCategorySales, DailySellerSales)
+
+
+class OrderRollupTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        cls.product = Product.objects.create(
+            name='Product', description='', price=1000, stock=10, category='books', created_by=cls.user,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def place_order(self, quantity):
+        response = self.client.post(
+            reverse('orders:order_create'),
+            {'items': [{'product_id': self.product.pk, 'quantity': quantity}]}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return Order.objects.latest('pk')
+
+    def snapshot(self):
+        rows = {
+            model.__name__: sorted(
+                model.objects.filter(orders_count__gt=0).values_list('orders_count', 'units_sold', 'revenue')
+            )
+            for model in SALES_MODELS
+        }
+        rows['units_out'] = sorted(DailyInventory.objects.values_list('product_id', 'units_out'))
+        return rows
+
+    def assert_matches_rebuild(self):
+        live = self.snapshot()
+        today = timezone.localdate()
+        rebuild_range(today, today)
+        self.assertEqual(live, self.snapshot())
+
+    def test_cancelling_subtracts_the_order(self):
+        self.place_order(2)
+        order = self.place_order(3)
+        today = DailySales.objects.get(date=timezone.localdate())
+        self.assertEqual((today.orders_count, today.units_sold, today.revenue), (2, 5, 5000))
+
+        order.status = Order.STATUS_CANCELLED
+        order.save()
+        today.refresh_from_db()
+        self.assertEqual((today.orders_count, today.units_sold, today.revenue), (1, 2, 2000))
+        self.assertEqual(DailyInventory.objects.get(product=self.product).units_out, 2)
+        self.assert_matches_rebuild()
+
+    def test_cancelled_order_is_subtracted_once(self):
+        order = self.place_order(2)
+        order = Order.objects.get(pk=order.pk)
+        order.status = Order.STATUS_CANCELLED
+        order.save(update_fields=['status'])
+        order.save()
+        Order.objects.get(pk=order.pk).save()
+        self.assertEqual(DailySales.objects.get().orders_count, 0)
+        self.assert_matches_rebuild()
+
+    def test_reinstated_order_is_counted_again(self):
+        order = self.place_order(2)
+        order.status = Order.STATUS_CANCELLED
+        order.save()
+        order.status = Order.STATUS_PAID
+        order.save()
+        self.assertEqual(DailySales.objects.get().units_sold, 2)
+        self.assert_matches_rebuild()
+
+    def test_other_status_changes_keep_the_order(self):
+        order = self.place_order(2)
+        order.status = Order.STATUS_PAID
+        order.save()
+        self.assertEqual(DailySales.objects.get().units_sold, 2)
+        self.assert_matches_rebuild()
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'dashboard'
+
+urlpatterns = [
+    path('sales/daily/', views.DailySalesView.as_view(), name='sales_daily'),
+    path('sales/categories/', views.CategorySalesView.as_view(), name='sales_categories'),
+    path('sales/sellers/', views.SellerSalesView.as_view(), name='sales_sellers'),
+    path('sales/products/', views.ProductSalesView.as_view(), name='sales_products'),
+    path('inventory/', views.InventoryView.as_view(), name='inventory'),
+]
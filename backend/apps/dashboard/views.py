@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import (
+    DailySales, DailyProductSales, DailyCategorySales, DailySellerSales, DailyInventory
+)
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+class DateRangeMixin:
+    """
+    ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` (defaults to the last 30 days)
+    """
+
+    def get_date_range(self, request):
+        today = timezone.localdate()
+        try:
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else today
+            start = (date.fromisoformat(request.query_params['start'])
+                     if 'start' in request.query_params
+                     else end - timedelta(days=DEFAULT_RANGE_DAYS - 1))
+        except ValueError:
+            return None
+        if start > end or (end - start).days >= MAX_RANGE_DAYS:
+            return None
+        return start, end
+
+    def invalid_range(self):
+        return Response(
+            {'error': f'start/end must be ISO dates, start <= end, at most {MAX_RANGE_DAYS} days apart'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def _totals(queryset, *group_by):
+    return list(
+        queryset.values(*group_by)
+        .annotate(
+            orders_count=Sum('orders_count'),
+            units_sold=Sum('units_sold'),
+            revenue=Sum('revenue'),
+        )
+        .order_by(*group_by)
+    )
+
+
+class DailySalesView(DateRangeMixin, APIView):
+    """
+    Store-wide sales per day
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return self.invalid_range()
+        start, end = date_range
+        rows = DailySales.objects.filter(date__range=(start, end)).order_by('date').values(
+            'date', 'orders_count', 'units_sold', 'revenue'
+        )
+        return Response({'start': start, 'end': end, 'days': list(rows)})
+
+
+class CategorySalesView(DateRangeMixin, APIView):
+    """
+    Sales per category over the date range
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return self.invalid_range()
+        start, end = date_range
+        queryset = DailyCategorySales.objects.filter(date__range=(start, end))
+        if request.query_params.get('daily') == 'true':
+            rows = _totals(queryset, 'date', 'category')
+        else:
+            rows = _totals(queryset, 'category')
+        return Response({'start': start, 'end': end, 'categories': rows})
+
+
+class SellerSalesView(DateRangeMixin, APIView):
+    """
+    Sales per seller; non-staff users only see their own numbers
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return self.invalid_range()
+        start, end = date_range
+        queryset = DailySellerSales.objects.filter(date__range=(start, end))
+        if not request.user.is_staff:
+            queryset = queryset.filter(seller_id=request.user.pk)
+        if request.query_params.get('daily') == 'true':
+            rows = _totals(queryset, 'date', 'seller_id')
+        else:
+            rows = _totals(queryset, 'seller_id')
+        return Response({'start': start, 'end': end, 'sellers': rows})
+
+
+class ProductSalesView(DateRangeMixin, APIView):
+    """
+    Top products by revenue over the date range
+    """
+    permission_classes = [IsAdminUser]
+    max_limit = 100
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return self.invalid_range()
+        start, end = date_range
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+        rows = (
+            DailyProductSales.objects.filter(date__range=(start, end))
+            .values('product_id')
+            .annotate(
+                orders_count=Sum('orders_count'),
+                units_sold=Sum('units_sold'),
+                revenue=Sum('revenue'),
+            )
+            .order_by('-revenue')[:limit]
+        )
+        return Response({'start': start, 'end': end, 'products': list(rows)})
+
+
+class InventoryView(DateRangeMixin, APIView):
+    """
+    Stock movement per day, optionally for one product (``?product=<id>``)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        date_range = self.get_date_range(request)
+        if date_range is None:
+            return self.invalid_range()
+        start, end = date_range
+        queryset = DailyInventory.objects.filter(date__range=(start, end))
+        product = request.query_params.get('product')
+        if product:
+            if not product.isdigit():
+                return Response({'error': 'product must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(product_id=int(product))
+        rows = (
+            queryset.values('date')
+            .annotate(
+                units_in=Sum('units_in'),
+                units_out=Sum('units_out'),
+                units_removed=Sum('units_removed'),
+            )
+            .order_by('date')
+        )
+        return Response({'start': start, 'end': end, 'days': list(rows)})
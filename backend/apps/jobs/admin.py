@@ -0,0 +1,19 @@
+from django.contrib import admin
+from marketon.admin import EstimatedCountPaginator
+from .models import Job, PeriodicSchedule
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_at', 'started_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['name']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'locked_by', 'locked_until']
+    # The table grows quickly; don't count it on every changelist page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PeriodicSchedule)
+class PeriodicScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run_at']
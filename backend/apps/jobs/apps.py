@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+    verbose_name = 'Background Jobs'
+
+    def ready(self):
+        from marketon.instrumentation import register_collector
+        from .views import metrics_lines
+
+        # Registers every app's jobs in the web and worker processes alike
+        autodiscover_modules('jobs')
+        register_collector(metrics_lines)
@@ -0,0 +1,410 @@
+"""
+Job queue storage.
+
+``DatabaseBackend`` (the default) keeps jobs in the ``Job`` table.  Workers
+claim due rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several workers
+never pick the same job, and a job enqueued inside a transaction only
+becomes visible when that transaction commits.  Backends without SKIP LOCKED
+(SQLite) claim through a conditional UPDATE instead.
+
+``RedisBackend`` (``JOBS_BACKEND = 'redis'``, needs ``REDIS_URL``) keeps job
+hashes plus ``queued`` / ``running`` sorted sets scored by run time and lease
+expiry.  Enqueues wait for the surrounding transaction to commit; claims are
+one Lua script.  It trades the job history of the table for fewer database
+writes on busy queues.
+
+Running jobs hold a lease that the worker renews.  When a worker dies, its
+jobs are requeued (or failed once out of attempts) after the lease expires.
+"""
+import json
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from marketon.redis import get_redis
+from .models import Job, PeriodicSchedule
+
+# Latency / runtime percentiles are computed over this many recent jobs
+STATS_SAMPLE_SIZE = 1000
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    name: str
+    args: list
+    kwargs: dict
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+
+
+def _summary(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0, 'p50': None, 'p95': None, 'max': None}
+
+    def pct(p):
+        return values[max(1, math.ceil(p / 100 * len(values))) - 1]
+    return {'count': len(values), 'p50': pct(50), 'p95': pct(95), 'max': values[-1]}
+
+
+class DatabaseBackend:
+    name = 'database'
+
+    def enqueue(self, name, args, kwargs, run_at, max_attempts):
+        return Job.objects.create(
+            name=name, args=args, kwargs=kwargs, run_at=run_at, max_attempts=max_attempts,
+        ).pk
+
+    def claim(self, worker_id, limit, lease, exclude=()):
+        now = timezone.now()
+        queryset = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at')
+        if exclude:
+            queryset = queryset.exclude(name__in=list(exclude))
+        claim = dict(
+            status=Job.RUNNING, attempts=F('attempts') + 1, started_at=now,
+            locked_by=worker_id, locked_until=now + lease,
+        )
+        fields = ('id', 'name', 'args', 'kwargs', 'attempts', 'max_attempts', 'run_at')
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                rows = list(queryset.select_for_update(skip_locked=True).values(*fields)[:limit])
+                Job.objects.filter(pk__in=[row['id'] for row in rows]).update(**claim)
+            return [ClaimedJob(**{**row, 'attempts': row['attempts'] + 1}) for row in rows]
+
+        # SQLite: a read followed by a write in one transaction fails as soon
+        # as another worker writes, so claim with a guarded UPDATE and read
+        # back the rows that this worker actually won
+        ids = list(queryset.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(**claim)
+        rows = Job.objects.filter(pk__in=ids, status=Job.RUNNING, locked_by=worker_id, started_at=now)
+        return [ClaimedJob(**row) for row in rows.order_by('run_at').values(*fields)]
+
+    def heartbeat(self, worker_id, ids, lease):
+        if ids:
+            Job.objects.filter(pk__in=list(ids), status=Job.RUNNING, locked_by=worker_id).update(
+                locked_until=timezone.now() + lease,
+            )
+
+    def _finish(self, job, **fields):
+        Job.objects.filter(pk=job.id).update(locked_by='', locked_until=None, **fields)
+
+    def complete(self, job, runtime):
+        self._finish(job, status=Job.SUCCEEDED, finished_at=timezone.now(), last_error='')
+
+    def retry(self, job, error, run_at):
+        self._finish(job, status=Job.QUEUED, run_at=run_at, last_error=error)
+
+    def release(self, job):
+        """Hand a claimed job back without counting the attempt."""
+        self._finish(job, status=Job.QUEUED, attempts=F('attempts') - 1)
+
+    def fail(self, job, error):
+        self._finish(job, status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+
+    def recover_expired(self):
+        """Requeue running jobs whose lease ran out; returns how many were touched."""
+        now = timezone.now()
+        expired = Job.objects.filter(status=Job.RUNNING, locked_until__lt=now)
+        failed = expired.filter(attempts__gte=F('max_attempts')).update(
+            status=Job.FAILED, finished_at=now, locked_by='', locked_until=None,
+            last_error='Worker lease expired',
+        )
+        requeued = expired.update(
+            status=Job.QUEUED, run_at=now, locked_by='', locked_until=None, last_error='Worker lease expired',
+        )
+        return failed + requeued
+
+    def claim_periodic(self, name, every, now):
+        """True for exactly one caller per due run of a periodic job."""
+        schedule = PeriodicSchedule.objects.filter(name=name).first()
+        if schedule is None:
+            try:
+                with transaction.atomic():
+                    PeriodicSchedule.objects.create(name=name, next_run_at=now + every)
+            except IntegrityError:
+                return False
+            return True
+        if schedule.next_run_at > now:
+            return False
+        # Compare-and-swap on the old value: another worker may have moved it
+        return PeriodicSchedule.objects.filter(name=name, next_run_at=schedule.next_run_at).update(
+            next_run_at=now + every,
+        ) == 1
+
+    def prune(self, before):
+        return Job.objects.filter(status=Job.SUCCEEDED, finished_at__lt=before).delete()[0]
+
+    def stats(self):
+        now = timezone.now()
+        jobs = {}
+        counts = (
+            Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING, Job.FAILED])
+            .values('name', 'status').annotate(n=Count('id')).order_by()
+        )
+        for row in counts:
+            jobs.setdefault(row['name'], {'queued': 0, 'running': 0, 'failed': 0})[row['status']] = row['n']
+        due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        oldest = due.order_by('run_at').values_list('run_at', flat=True).first()
+        recent = list(
+            Job.objects.filter(started_at__isnull=False).order_by('-started_at')
+            .values_list('run_at', 'started_at', 'finished_at', 'status')[:STATS_SAMPLE_SIZE]
+        )
+        return {
+            'backend': self.name,
+            'jobs': jobs,
+            'due': due.count(),
+            'oldest_due_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+            'latency_seconds': _summary(
+                max((started - run_at).total_seconds(), 0.0) for run_at, started, _, _ in recent
+            ),
+            'runtime_seconds': _summary(
+                (finished - started).total_seconds()
+                for _, started, finished, status in recent if status == Job.SUCCEEDED and finished
+            ),
+        }
+
+
+_CLAIM = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[4]))
+local excluded = {}
+for i = 5, #ARGV do excluded[ARGV[i]] = true end
+local claimed = {}
+for _, id in ipairs(ids) do
+    if #claimed >= tonumber(ARGV[2]) then break end
+    local key = KEYS[3] .. id
+    local name = redis.call('HGET', key, 'name')
+    if not name then
+        redis.call('ZREM', KEYS[1], id)
+    elseif not excluded[name] then
+        redis.call('ZREM', KEYS[1], id)
+        redis.call('ZADD', KEYS[2], ARGV[3], id)
+        redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('HSET', key, 'started_at', ARGV[1])
+        redis.call('HINCRBY', KEYS[4], name, -1)
+        redis.call('HINCRBY', KEYS[5], name, 1)
+        table.insert(claimed, id)
+    end
+end
+return claimed
+"""
+
+
+def _timestamp(value):
+    return value.timestamp()
+
+
+def _datetime(value):
+    return datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+
+
+class RedisBackend:
+    name = 'redis'
+    prefix = 'jobs:'
+
+    def __init__(self, client):
+        self.client = client
+        self._claim = client.register_script(_CLAIM)
+
+    def key(self, *parts):
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    def enqueue(self, name, args, kwargs, run_at, max_attempts):
+        job_id = self.client.incr(self.key('ids'))
+        fields = {
+            'name': name, 'args': json.dumps(args), 'kwargs': json.dumps(kwargs),
+            'attempts': 0, 'max_attempts': max_attempts, 'run_at': _timestamp(run_at),
+        }
+
+        def push():
+            pipe = self.client.pipeline()
+            pipe.hset(self.key('job', job_id), mapping=fields)
+            pipe.zadd(self.key('queued'), {job_id: fields['run_at']})
+            pipe.hincrby(self.key('count', 'queued'), name, 1)
+            pipe.execute()
+        # Like a row insert, the job must not run before the caller's writes commit
+        transaction.on_commit(push)
+        return job_id
+
+    def claim(self, worker_id, limit, lease, exclude=()):
+        now = timezone.now()
+        ids = self._claim(
+            keys=[self.key('queued'), self.key('running'), self.key('job', ''),
+                  self.key('count', 'queued'), self.key('count', 'running')],
+            args=[_timestamp(now), limit, _timestamp(now + lease), limit * 4, *exclude],
+        )
+        if not ids:
+            return []
+        pipe = self.client.pipeline()
+        for job_id in ids:
+            pipe.hgetall(self.key('job', int(job_id)))
+        claimed = []
+        for job_id, data in zip(ids, pipe.execute()):
+            data = {key.decode(): value.decode() for key, value in data.items()}
+            claimed.append(ClaimedJob(
+                id=int(job_id), name=data['name'], args=json.loads(data['args']), kwargs=json.loads(data['kwargs']),
+                attempts=int(data['attempts']), max_attempts=int(data['max_attempts']),
+                run_at=_datetime(data['run_at']),
+            ))
+        return claimed
+
+    def heartbeat(self, worker_id, ids, lease):
+        if ids:
+            until = _timestamp(timezone.now() + lease)
+            self.client.zadd(self.key('running'), {job_id: until for job_id in ids}, xx=True)
+
+    def _release(self, job):
+        """Take the job out of the running set; False if someone else already did."""
+        if not self.client.zrem(self.key('running'), job.id):
+            return False
+        self.client.hincrby(self.key('count', 'running'), job.name, -1)
+        return True
+
+    def _sample(self, pipe, kind, value):
+        pipe.lpush(self.key('samples', kind), value)
+        pipe.ltrim(self.key('samples', kind), 0, STATS_SAMPLE_SIZE - 1)
+
+    def complete(self, job, runtime):
+        if not self._release(job):
+            return
+        started = self.client.hget(self.key('job', job.id), 'started_at')
+        pipe = self.client.pipeline()
+        pipe.delete(self.key('job', job.id))
+        if started is not None:
+            self._sample(pipe, 'latency', max(float(started) - _timestamp(job.run_at), 0.0))
+        self._sample(pipe, 'runtime', runtime)
+        pipe.execute()
+
+    def retry(self, job, error, run_at):
+        if not self._release(job):
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(self.key('job', job.id), mapping={'run_at': _timestamp(run_at), 'last_error': error})
+        pipe.zadd(self.key('queued'), {job.id: _timestamp(run_at)})
+        pipe.hincrby(self.key('count', 'queued'), job.name, 1)
+        pipe.execute()
+
+    def release(self, job):
+        if not self._release(job):
+            return
+        pipe = self.client.pipeline()
+        pipe.hincrby(self.key('job', job.id), 'attempts', -1)
+        pipe.zadd(self.key('queued'), {job.id: _timestamp(job.run_at)})
+        pipe.hincrby(self.key('count', 'queued'), job.name, 1)
+        pipe.execute()
+
+    def fail(self, job, error):
+        if not self._release(job):
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(self.key('job', job.id), 'last_error', error)
+        pipe.zadd(self.key('failed'), {job.id: _timestamp(timezone.now())})
+        pipe.hincrby(self.key('count', 'failed'), job.name, 1)
+        pipe.execute()
+
+    def recover_expired(self):
+        now = timezone.now()
+        touched = 0
+        for job_id in self.client.zrangebyscore(self.key('running'), '-inf', _timestamp(now)):
+            data = self.client.hmget(self.key('job', int(job_id)), 'name', 'attempts', 'max_attempts', 'run_at')
+            if data[0] is None:
+                self.client.zrem(self.key('running'), job_id)
+                continue
+            job = ClaimedJob(
+                id=int(job_id), name=data[0].decode(), args=[], kwargs={},
+                attempts=int(data[1]), max_attempts=int(data[2]), run_at=_datetime(data[3]),
+            )
+            if job.attempts >= job.max_attempts:
+                self.fail(job, 'Worker lease expired')
+            else:
+                self.retry(job, 'Worker lease expired', now)
+            touched += 1
+        return touched
+
+    def claim_periodic(self, name, every, now):
+        # One key per interval slot; runs line up with multiples of ``every``
+        seconds = every.total_seconds()
+        slot = int(_timestamp(now) // seconds)
+        return bool(self.client.set(self.key('periodic', name, slot), 1, nx=True, ex=max(int(seconds * 2), 1)))
+
+    def prune(self, before):
+        # Succeeded jobs are deleted as they finish; failed ones are kept until here
+        old = self.client.zrangebyscore(self.key('failed'), '-inf', _timestamp(before))
+        if not old:
+            return 0
+        pipe = self.client.pipeline()
+        for job_id in old:
+            pipe.hget(self.key('job', int(job_id)), 'name')
+        names = pipe.execute()
+        pipe = self.client.pipeline()
+        for job_id, name in zip(old, names):
+            pipe.delete(self.key('job', int(job_id)))
+            pipe.zrem(self.key('failed'), job_id)
+            if name is not None:
+                pipe.hincrby(self.key('count', 'failed'), name, -1)
+        pipe.execute()
+        return len(old)
+
+    def stats(self):
+        now = _timestamp(timezone.now())
+        pipe = self.client.pipeline()
+        for status in ('queued', 'running', 'failed'):
+            pipe.hgetall(self.key('count', status))
+        pipe.zcount(self.key('queued'), '-inf', now)
+        pipe.zrangebyscore(self.key('queued'), '-inf', now, start=0, num=1, withscores=True)
+        pipe.lrange(self.key('samples', 'latency'), 0, -1)
+        pipe.lrange(self.key('samples', 'runtime'), 0, -1)
+        queued, running, failed, due, oldest, latency, runtime = pipe.execute()
+
+        jobs = {}
+        for status, counts in (('queued', queued), ('running', running), ('failed', failed)):
+            for name, count in counts.items():
+                if not int(count):
+                    continue
+                jobs.setdefault(name.decode(), {'queued': 0, 'running': 0, 'failed': 0})[status] = int(count)
+        return {
+            'backend': self.name,
+            'jobs': jobs,
+            'due': due,
+            'oldest_due_seconds': now - oldest[0][1] if oldest else 0.0,
+            'latency_seconds': _summary(float(value) for value in latency),
+            'runtime_seconds': _summary(float(value) for value in runtime),
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = getattr(settings, 'JOBS_BACKEND', 'database')
+                if kind == 'redis':
+                    client = get_redis()
+                    if client is None:
+                        raise ImproperlyConfigured("JOBS_BACKEND = 'redis' needs REDIS_URL")
+                    _backend = RedisBackend(client)
+                elif kind == 'database':
+                    _backend = DatabaseBackend()
+                else:
+                    raise ImproperlyConfigured(f"Unknown JOBS_BACKEND {kind!r}; use 'database' or 'redis'")
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    with _backend_lock:
+        _backend = None
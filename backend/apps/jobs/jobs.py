@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .backends import get_backend
+from .registry import periodic
+
+
+@periodic(timedelta(hours=1), max_attempts=1)
+def prune_jobs():
+    """Drop finished jobs older than ``JOBS_KEEP_SECONDS``."""
+    keep = timedelta(seconds=getattr(settings, 'JOBS_KEEP_SECONDS', 7 * 24 * 60 * 60))
+    get_backend().prune(timezone.now() - keep)
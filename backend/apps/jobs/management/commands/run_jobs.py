@@ -0,0 +1,54 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs.backends import get_backend
+from apps.jobs.registry import registry
+from apps.jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs in a process pool until stopped (SIGINT / SIGTERM)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'JOBS_CONCURRENCY', 4),
+                            help='Pool processes, i.e. jobs running at once')
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'JOBS_POLL_SECONDS', 1.0))
+        parser.add_argument('--lease-seconds', type=int, default=getattr(settings, 'JOBS_LEASE_SECONDS', 600),
+                            help='Jobs of a worker silent for this long are handed to another worker')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--stats', action='store_true', help='Print queue stats as JSON and exit')
+        parser.add_argument('--list', action='store_true', help='List registered jobs and exit')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name, spec in sorted(registry.items()):
+                every = f', every {spec.every}' if spec.every else ''
+                limit = f', concurrency {spec.concurrency}' if spec.concurrency else ''
+                self.stdout.write(f'{name} (max attempts {spec.max_attempts}{limit}{every})')
+            return
+        if options['stats']:
+            self.stdout.write(json.dumps(get_backend().stats(), indent=2))
+            return
+        if options['concurrency'] < 1 or options['poll_interval'] <= 0 or options['lease_seconds'] < 1:
+            raise CommandError('--concurrency, --poll-interval and --lease-seconds must be positive')
+
+        if options['verbosity'] > 1:
+            logging.getLogger('apps.jobs').setLevel(logging.INFO)
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            lease_seconds=options['lease_seconds'],
+            burst=options['burst'],
+        )
+        self.stdout.write(
+            f'Worker {worker.worker_id}: {options["concurrency"]} processes, '
+            f'{get_backend().name} backend, {len(registry)} registered jobs'
+        )
+        started = time.perf_counter()
+        outcomes = worker.run()
+        summary = ', '.join(f'{count} {outcome}' for outcome, count in sorted(outcomes.items())) or 'no jobs run'
+        self.stdout.write(self.style.SUCCESS(f'{summary} in {time.perf_counter() - started:.2f}s'))
@@ -0,0 +1,64 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    One queued call of a registered job (database backend)
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs_job'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Workers poll for due jobs; finished rows stay out of the index
+            models.Index(fields=['run_at'], condition=Q(status='queued'), name='jobs_job_due_idx'),
+            models.Index(fields=['locked_until'], condition=Q(status='running'), name='jobs_job_lease_idx'),
+            models.Index(fields=['status', 'finished_at'], name='jobs_job_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class PeriodicSchedule(models.Model):
+    """
+    Next run of a periodic job, shared by all workers so each run is
+    enqueued once
+    """
+    name = models.CharField(max_length=200, primary_key=True)
+    next_run_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'jobs_periodic_schedule'
+        verbose_name = 'Periodic Schedule'
+        verbose_name_plural = 'Periodic Schedules'
+
+    def __str__(self):
+        return f"{self.name} @ {self.next_run_at}"
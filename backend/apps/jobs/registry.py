@@ -0,0 +1,78 @@
+"""
+Job registration.
+
+``@job`` registers a function under ``module.qualname`` and gives it
+``delay(*args, **kwargs)`` / ``schedule(when, *args, **kwargs)`` to enqueue a
+call.  Arguments are stored as JSON, so pass ids rather than model
+instances.  ``@periodic(every)`` additionally runs the function, without
+arguments, once per interval across all workers.
+
+Each app keeps its jobs in a ``jobs`` module, imported by ``JobsConfig.ready``.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+registry = {}
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: object
+    max_attempts: int = 3
+    # Retry n waits retry_backoff * 2 ** (n - 1) seconds
+    retry_backoff: float = 30.0
+    # Most calls of this job running at once across one worker's pool
+    concurrency: int = None
+    every: timedelta = None
+
+    def retry_delay(self, attempts):
+        return timedelta(seconds=self.retry_backoff * 2 ** max(attempts - 1, 0))
+
+
+def enqueue(name, args=(), kwargs=None, run_at=None):
+    """Queue a call of the job registered as ``name``; returns the job id."""
+    from .backends import get_backend
+
+    try:
+        spec = registry[name]
+    except KeyError:
+        raise LookupError(f'No job registered as {name!r}')
+    return get_backend().enqueue(
+        name, list(args), kwargs or {}, run_at or timezone.now(), spec.max_attempts,
+    )
+
+
+def job(func=None, *, name=None, max_attempts=3, retry_backoff=30.0, concurrency=None, every=None):
+    def register(func):
+        spec = JobSpec(
+            name=name or f'{func.__module__}.{func.__qualname__}',
+            func=func,
+            max_attempts=max_attempts,
+            retry_backoff=retry_backoff,
+            concurrency=concurrency,
+            every=every,
+        )
+        registry[spec.name] = spec
+
+        def schedule(when, *args, **kwargs):
+            run_at = when if isinstance(when, datetime) else timezone.now() + when
+            return enqueue(spec.name, args, kwargs, run_at)
+
+        func.job = spec
+        func.delay = lambda *args, **kwargs: enqueue(spec.name, args, kwargs)
+        func.schedule = schedule
+        return func
+
+    return register(func) if func is not None else register
+
+
+def periodic(every, **options):
+    """Register a job that runs once every ``every`` (a timedelta)."""
+    return job(every=every, **options)
+
+
+def periodic_jobs():
+    return [spec for spec in registry.values() if spec.every is not None]
@@ -0,0 +1,149 @@
+import signal
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .backends import DatabaseBackend, reset_backend
+from .models import Job, PeriodicSchedule
+from .registry import job, periodic_jobs
+from .worker import Worker
+
+LEASE = timedelta(minutes=10)
+
+
+@job(name='tests.noop')
+def noop(*args, **kwargs):
+    pass
+
+
+@job(name='tests.broken', max_attempts=2, retry_backoff=60)
+def broken():
+    raise RuntimeError('broken job')
+
+
+class JobsTestMixin:
+    def setUp(self):
+        super().setUp()
+        reset_backend()
+        self.addCleanup(reset_backend)
+        self.backend = DatabaseBackend()
+
+    def add_job(self, name='tests.noop', run_at=None, **fields):
+        return Job.objects.create(name=name, run_at=run_at or timezone.now(), **fields)
+
+
+@override_settings(JOBS_BACKEND='database')
+class DatabaseBackendTests(JobsTestMixin, TestCase):
+    def test_claim_takes_due_jobs_once(self):
+        now = timezone.now()
+        later = self.add_job(run_at=now - timedelta(seconds=1))
+        first = self.add_job(run_at=now - timedelta(seconds=2))
+        self.add_job(run_at=now + timedelta(hours=1))
+
+        claimed = self.backend.claim('w1', 5, LEASE)
+        self.assertEqual([job.id for job in claimed], [first.pk, later.pk])
+        self.assertEqual([job.attempts for job in claimed], [1, 1])
+        self.assertEqual(self.backend.claim('w2', 5, LEASE), [])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by, first.attempts), (Job.RUNNING, 'w1', 1))
+        self.assertGreater(first.locked_until, timezone.now())
+
+    def test_claim_respects_limit_and_exclude(self):
+        self.add_job(name='tests.broken')
+        self.add_job()
+        self.add_job()
+        claimed = self.backend.claim('w1', 1, LEASE, exclude={'tests.broken'})
+        self.assertEqual([job.name for job in claimed], ['tests.noop'])
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 2)
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        self.add_job(name='tests.broken', max_attempts=2)
+        worker = Worker(backend=self.backend)
+
+        claimed, = self.backend.claim(worker.worker_id, 1, LEASE)
+        with self.assertLogs('apps.jobs.worker', 'WARNING'):
+            worker.record(claimed, 'boom', 0.0)
+        row = Job.objects.get()
+        self.assertEqual((row.status, row.attempts, row.last_error, row.locked_by), (Job.QUEUED, 1, 'boom', ''))
+        # First retry waits retry_backoff seconds
+        self.assertGreater(row.run_at, timezone.now() + timedelta(seconds=55))
+        self.assertEqual(self.backend.claim(worker.worker_id, 1, LEASE), [])
+
+        Job.objects.update(run_at=timezone.now())
+        claimed, = self.backend.claim(worker.worker_id, 1, LEASE)
+        self.assertEqual(claimed.attempts, 2)
+        with self.assertLogs('apps.jobs.worker', 'ERROR'):
+            worker.record(claimed, 'boom again', 0.0)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.last_error), (Job.FAILED, 2, 'boom again'))
+        self.assertEqual(worker.outcomes, {'retried': 1, 'failed': 1})
+
+    def test_release_does_not_count_the_attempt(self):
+        self.add_job()
+        claimed, = self.backend.claim('w1', 1, LEASE)
+        self.backend.release(claimed)
+        row = Job.objects.get()
+        self.assertEqual((row.status, row.attempts, row.locked_by), (Job.QUEUED, 0, ''))
+
+    def test_expired_leases_are_recovered(self):
+        self.add_job(max_attempts=3)
+        self.add_job(max_attempts=1)
+        self.add_job(max_attempts=1)
+        claimed = self.backend.claim('dead', 3, LEASE)
+        alive = claimed[2]
+        # The worker holding the first two stopped renewing its lease
+        Job.objects.exclude(pk=alive.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.backend.heartbeat('dead', [alive.id], LEASE)
+
+        self.assertEqual(self.backend.recover_expired(), 2)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[job.id] for job in claimed],
+            [Job.QUEUED, Job.FAILED, Job.RUNNING],
+        )
+        self.assertEqual(Job.objects.get(pk=claimed[0].id).last_error, 'Worker lease expired')
+        self.assertEqual(self.backend.recover_expired(), 0)
+
+    def test_periodic_run_is_claimed_once_per_interval(self):
+        every = timedelta(minutes=5)
+        now = timezone.now()
+        self.assertTrue(self.backend.claim_periodic('tests.noop', every, now))
+        self.assertFalse(self.backend.claim_periodic('tests.noop', every, now))
+        self.assertFalse(self.backend.claim_periodic('tests.noop', every, now + timedelta(minutes=4)))
+        self.assertTrue(self.backend.claim_periodic('tests.noop', every, now + every))
+        self.assertFalse(self.backend.claim_periodic('tests.noop', every, now + every))
+
+
+@override_settings(JOBS_BACKEND='database')
+class RunJobsCommandTests(JobsTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        # The worker installs its own handlers; give the test runner its own back
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        # Periodic jobs are not due in this test
+        PeriodicSchedule.objects.bulk_create([
+            PeriodicSchedule(name=spec.name, next_run_at=timezone.now() + timedelta(days=1))
+            for spec in periodic_jobs()
+        ])
+
+    def test_burst_runs_due_jobs_and_exits(self):
+        noop.delay(1, key='value')
+        noop.delay(2)
+        broken.delay()
+        noop.schedule(timedelta(hours=1))
+
+        out = StringIO()
+        with self.assertLogs('apps.jobs.worker', 'WARNING') as logs:
+            call_command('run_jobs', '--burst', '--concurrency', '2', '--poll-interval', '0.05', stdout=out)
+        self.assertIn('tests.broken', logs.output[0])
+        self.assertIn('1 retried, 2 succeeded', out.getvalue())
+        self.assertEqual(Job.objects.filter(name='tests.noop', status=Job.SUCCEEDED).count(), 2)
+        # Not due yet: left queued
+        self.assertEqual(Job.objects.filter(name='tests.noop', status=Job.QUEUED).count(), 1)
+        failed = Job.objects.get(name='tests.broken')
+        self.assertEqual((failed.status, failed.attempts), (Job.QUEUED, 1))
+        self.assertIn('RuntimeError: broken job', failed.last_error)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('stats/', views.JobStatsView.as_view(), name='stats'),
+]
@@ -0,0 +1,44 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from marketon.instrumentation import escape_label
+from .backends import get_backend
+
+
+class JobStatsView(APIView):
+    """
+    Queue depth per job, due backlog and recent pickup latency / runtime
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_backend().stats())
+
+
+def _gauge(lines, name, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} gauge')
+    for labels, value in samples:
+        lines.append(f'{name}{{{labels}}} {value}' if labels else f'{name} {value}')
+
+
+def metrics_lines():
+    """Queue gauges for ``/metrics``"""
+    stats = get_backend().stats()
+    lines = []
+    for status in ('queued', 'running', 'failed'):
+        _gauge(lines, f'marketon_jobs_{status}', f'Jobs {status}, by job', [
+            (f'job="{escape_label(name)}"', counts[status]) for name, counts in sorted(stats['jobs'].items())
+        ])
+    _gauge(lines, 'marketon_jobs_due', 'Queued jobs whose run time has passed', [('', stats['due'])])
+    _gauge(lines, 'marketon_jobs_oldest_due_seconds', 'Age of the oldest due job', [
+        ('', stats['oldest_due_seconds']),
+    ])
+    for kind, help_text in (('latency', 'Delay between run time and pickup'), ('runtime', 'Job run time')):
+        summary = stats[f'{kind}_seconds']
+        _gauge(lines, f'marketon_jobs_{kind}_seconds', f'{help_text} over recent jobs', [
+            (f'quantile="{quantile}"', summary[key])
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('1', 'max')) if summary[key] is not None
+        ])
+    return lines
@@ -0,0 +1,203 @@
+"""
+Job worker: claims due jobs and runs them in a process pool.
+
+The parent process owns the queue.  It claims at most ``concurrency`` jobs at
+a time, renews their leases, enqueues periodic jobs when they are due and
+records each outcome.  A failed call is retried with exponential backoff
+until ``max_attempts`` is reached.  A job with ``concurrency=n`` never has
+more than ``n`` calls running in one worker; further claimed calls of it
+wait in the parent for a free slot.
+
+Children only execute job functions.  They are separate processes, so CPU
+bound work (image processing, imports) runs in parallel, and a crash in one
+job does not take the worker down.
+"""
+import logging
+import os
+import signal
+import socket
+import time
+import traceback
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .backends import get_backend
+from .registry import enqueue, periodic_jobs, registry
+
+logger = logging.getLogger(__name__)
+
+
+def _init_process():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        # Spawned rather than forked children start from scratch
+        django.setup()
+    # Ctrl+C reaches the whole process group; only the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Forked children must not share the parent's database sockets
+    for conn in connections.all(initialized_only=True):
+        conn.inc_thread_sharing()
+        conn.close()
+        conn.dec_thread_sharing()
+
+
+def execute(name, args, kwargs):
+    """Run one job call in a pool process; returns ``(error, runtime)``."""
+    close_old_connections()
+    started = time.perf_counter()
+    try:
+        registry[name].func(*args, **kwargs)
+    except Exception:
+        return traceback.format_exc(), time.perf_counter() - started
+    finally:
+        close_old_connections()
+    return None, time.perf_counter() - started
+
+
+class Worker:
+    def __init__(self, concurrency=4, poll_interval=1.0, lease_seconds=600, burst=False, backend=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.burst = burst
+        self.backend = backend or get_backend()
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.running = {}
+        self.pending = deque()
+        self.outcomes = Counter()
+        self.stopping = False
+        self._next_heartbeat = 0.0
+        self._next_periodic = 0.0
+
+    def stop(self, *args):
+        if not self.stopping:
+            logger.info('Stopping after %d running job(s) finish', len(self.running))
+        self.stopping = True
+
+    def run(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.stop)
+        # Children are forked: nothing open should leak into them
+        connections.close_all()
+        pool = self._new_pool()
+        try:
+            while True:
+                if not self.stopping:
+                    self.maintain()
+                    claimed = self.fill()
+                    self.start_pending(pool)
+                    if self.burst and not claimed and not self.running and not self.pending:
+                        break
+                elif not self.running:
+                    break
+                if self.running:
+                    # Returns as soon as a job finishes, so its slot is refilled right away
+                    pool = self.collect(pool, timeout=self.poll_interval)
+                else:
+                    time.sleep(self.poll_interval)
+            # Claimed but never started: hand them back for other workers
+            while self.pending:
+                job = self.pending.popleft()
+                self.backend.release(job)
+        finally:
+            pool.shutdown(wait=True)
+        return self.outcomes
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_process)
+
+    def _running_by_name(self):
+        return Counter(job.name for job in self.running.values())
+
+    def _saturated(self):
+        running = self._running_by_name()
+        pending = Counter(job.name for job in self.pending)
+        return {
+            name for name, spec in registry.items()
+            if spec.concurrency and running[name] + pending[name] >= spec.concurrency
+        }
+
+    def maintain(self):
+        """Renew leases, recover jobs of dead workers and enqueue due periodic jobs."""
+        now = time.monotonic()
+        if now >= self._next_heartbeat:
+            ids = [job.id for job in self.running.values()] + [job.id for job in self.pending]
+            self.backend.heartbeat(self.worker_id, ids, self.lease)
+            recovered = self.backend.recover_expired()
+            if recovered:
+                logger.warning('Recovered %d job(s) with an expired lease', recovered)
+            self._next_heartbeat = now + self.lease.total_seconds() / 4
+        if now < self._next_periodic:
+            return
+        self._next_periodic = now + self.poll_interval
+        current = timezone.now()
+        for spec in periodic_jobs():
+            if self.backend.claim_periodic(spec.name, spec.every, current):
+                enqueue(spec.name)
+
+    def fill(self):
+        """Claim jobs for free slots; returns how many were claimed."""
+        free = self.concurrency - len(self.running) - len(self.pending)
+        claimed = []
+        if free > 0:
+            claimed = self.backend.claim(self.worker_id, free, self.lease, exclude=self._saturated())
+            self.pending.extend(claimed)
+        return len(claimed)
+
+    def start_pending(self, pool):
+        running = self._running_by_name()
+        waiting = deque()
+        while self.pending:
+            job = self.pending.popleft()
+            spec = registry.get(job.name)
+            if spec is not None and spec.concurrency and running[job.name] >= spec.concurrency:
+                waiting.append(job)
+                continue
+            self.running[pool.submit(execute, job.name, job.args, job.kwargs)] = job
+            running[job.name] += 1
+        self.pending = waiting
+
+    def collect(self, pool, timeout):
+        done, _ = wait(list(self.running), timeout=timeout, return_when=FIRST_COMPLETED)
+        broken = False
+        for future in done:
+            job = self.running.pop(future)
+            try:
+                error, runtime = future.result()
+            except BrokenProcessPool:
+                broken = True
+                error, runtime = 'Worker process died', 0.0
+            self.record(job, error, runtime)
+        if broken:
+            # Every other job in the pool failed with it
+            for future, job in list(self.running.items()):
+                self.running.pop(future)
+                self.record(job, 'Worker process died', 0.0)
+            pool.shutdown(wait=False)
+            pool = self._new_pool()
+        return pool
+
+    def record(self, job, error, runtime):
+        if error is None:
+            self.backend.complete(job, runtime)
+            self.outcomes['succeeded'] += 1
+            logger.info('%s #%s succeeded in %.2fs', job.name, job.id, runtime)
+            return
+        spec = registry.get(job.name)
+        if spec is not None and job.attempts < job.max_attempts:
+            run_at = timezone.now() + spec.retry_delay(job.attempts)
+            self.backend.retry(job, error, run_at)
+            self.outcomes['retried'] += 1
+            logger.warning('%s #%s failed (attempt %d/%d), retrying at %s\n%s',
+                           job.name, job.id, job.attempts, job.max_attempts, run_at, error)
+        else:
+            self.backend.fail(job, error)
+            self.outcomes['failed'] += 1
+            logger.error('%s #%s failed permanently\n%s', job.name, job.id, error)
@@ -1,3 +1,24 @@
 from django.contrib import admin
+from marketon.admin import EstimatedCountPaginator
+from .models import Order, OrderItem
 
-# Register your models here.
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    fields = ['product', 'product_name', 'category', 'unit_price', 'quantity']
+    readonly_fields = fields
+    raw_id_fields = ['product']
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'status', 'total_amount', 'created_at']
+    list_filter = ['status', 'created_at']
+    list_select_related = ['user']
+    search_fields = ['user__username']
+    readonly_fields = ['total_amount', 'created_at', 'updated_at']
+    autocomplete_fields = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [OrderItemInline]
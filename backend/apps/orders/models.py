@@ -1,3 +1,81 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+from apps.products.models import Product
+from marketon.loaded_values import LoadedValuesMixin
+
+User = get_user_model()
+
+
+class Order(LoadedValuesMixin, models.Model):
+    """
+    Order placed by a user
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PAID = 'paid'
+    STATUS_SHIPPED = 'shipped'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PAID, 'Paid'),
+        (STATUS_SHIPPED, 'Shipped'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='orders')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'orders_order'
+        verbose_name = 'Order'
+        verbose_name_plural = 'Orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='orders_user_created_idx'),
+            models.Index(fields=['created_at'], name='orders_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.pk} ({self.status})"
+
+
+class OrderItem(models.Model):
+    """
+    Order line. Product name, category, seller and price are copied at order
+    time so order history and sales rollups don't depend on the live product row.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='order_items'
+    )
+    seller = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sold_items'
+    )
+    product_name = models.CharField(max_length=200)
+    category = models.CharField(max_length=100)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = 'orders_orderitem'
+        verbose_name = 'Order Item'
+        verbose_name_plural = 'Order Items'
+
+    def __str__(self):
+        return f"{self.product_name} x {self.quantity}"
+
+    @property
+    def line_total(self):
+        return self.unit_price * self.quantity
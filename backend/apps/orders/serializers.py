@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.carts.models import CartItem
+from apps.carts.reservations import consume as consume_reservations
+from apps.products.models import Product
+from .models import Order, OrderItem
+from .signals import order_placed
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'product_name', 'category', 'unit_price', 'quantity']
+        read_only_fields = fields
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'status', 'total_amount', 'created_at', 'updated_at', 'items']
+        read_only_fields = fields
+
+
+class OrderItemCreateSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class OrderCreateSerializer(serializers.Serializer):
+    items = OrderItemCreateSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        # Merge duplicate lines for the same product
+        merged = {}
+        for item in items:
+            merged[item['product_id']] = merged.get(item['product_id'], 0) + item['quantity']
+        return [{'product_id': pid, 'quantity': qty} for pid, qty in sorted(merged.items())]
+
+    def create(self, validated_data):
+        items_data = validated_data['items']
+        user_id = self.context['request'].user.pk
+        product_ids = [item['product_id'] for item in items_data]
+
+        with transaction.atomic():
+            products = Product.objects.filter(is_active=True).in_bulk(product_ids)
+            missing = [pid for pid in product_ids if pid not in products]
+            if missing:
+                raise serializers.ValidationError({'items': f'Unknown or inactive products: {missing}'})
+
+            # Stock held by the user's cart is already subtracted from Product.stock
+            held = consume_reservations(user_id, product_ids)
+            # queryset.update() skips auto_now; bump updated_at so ETags and the
+            # change feed see the new stock
+            now = timezone.now()
+
+            # Conditional decrement: no row lock is held between check and update.
+            # Lines are processed in product id order to keep lock order stable.
+            for item in items_data:
+                needed = item['quantity'] - held.get(item['product_id'], 0)
+                if needed > 0:
+                    updated = Product.objects.filter(
+                        pk=item['product_id'],
+                        stock__gte=needed
+                    ).update(stock=F('stock') - needed, updated_at=now)
+                    if not updated:
+                        raise serializers.ValidationError({
+                            'items': f"Insufficient stock for product {item['product_id']}"
+                        })
+                elif needed < 0:
+                    # Held more than ordered: return the rest
+                    Product.objects.filter(pk=item['product_id']).update(stock=F('stock') - needed, updated_at=now)
+            CartItem.objects.filter(cart__user_id=user_id, product_id__in=product_ids).delete()
+
+            order = Order.objects.create(user_id=user_id)
+            items = [
+                OrderItem(
+                    order=order,
+                    product_id=product.pk,
+                    seller_id=product.created_by_id,
+                    product_name=product.name,
+                    category=product.category,
+                    unit_price=product.price,
+                    quantity=item['quantity'],
+                )
+                for item in items_data
+                for product in (products[item['product_id']],)
+            ]
+            OrderItem.objects.bulk_create(items)
+
+            order.total_amount = sum(item.line_total for item in items)
+            order.save(update_fields=['total_amount'])
+            order_placed.send(sender=Order, order=order, items=items)
+
+        return order
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent inside the order transaction once the order and its items are saved.
+# kwargs: order, items
+order_placed = Signal()
@@ -1,43 +1,46 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from marketon.db_router import ReplicaReadMixin
+from .models import Order
+from .serializers import OrderSerializer, OrderCreateSerializer
 
 
-# Create your views here.
+class OrderListView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    replica_actions = ('get',)
 
-
-class OrderListView(APIView):
     def get(self, request):
-        # Mock order list response
+        orders = Order.objects.filter(user_id=request.user.pk).prefetch_related('items')
+        serializer = OrderSerializer(orders, many=True)
         return Response({
-            'message': 'Order list endpoint - Mock implementation',
-            'orders': [
-                {'id': 1, 'status': 'pending', 'total': 30000},
-                {'id': 2, 'status': 'completed', 'total': 45000},
-            ]
+            'orders': serializer.data,
+            'count': len(serializer.data)
         }, status=status.HTTP_200_OK)
 
 
-class OrderDetailView(APIView):
+class OrderDetailView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    replica_actions = ('get',)
+
     def get(self, request, pk):
-        # Mock order detail response
-        return Response({
-            'message': f'Order detail endpoint - Mock implementation for order {pk}',
-            'order': {
-                'id': pk,
-                'status': 'pending',
-                'total': pk * 15000,
-                'items': [f'Mock item {pk}']
-            }
-        }, status=status.HTTP_200_OK)
+        order = get_object_or_404(
+            Order.objects.prefetch_related('items'), pk=pk, user_id=request.user.pk
+        )
+        return Response({'order': OrderSerializer(order).data}, status=status.HTTP_200_OK)
 
 
 class OrderCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        # Mock order creation response
-        return Response({
-            'message': 'Order creation endpoint - Mock implementation',
-            'order_id': 999,
-            'status': 'created'
-        }, status=status.HTTP_201_CREATED)
+        serializer = OrderCreateSerializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            order = serializer.save()
+            return Response({
+                'message': 'Order created successfully',
+                'order': OrderSerializer(order).data
+            }, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
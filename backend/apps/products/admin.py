@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Product, ProductImage
+from marketon.admin import EstimatedCountPaginator
+from .archive import restore
+from .models import ArchivedProduct, Product, ProductImage
 
 
 class ProductImageInline(admin.TabularInline):
@@ -12,10 +14,16 @@ class ProductImageInline(admin.TabularInline):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'price', 'stock', 'is_active', 'created_by', 'created_at']
     list_filter = ['category', 'is_active', 'created_at']
-    search_fields = ['name', 'description']
+    list_select_related = ['created_by']
+    # 설명(긴 텍스트)은 인덱스를 탈 수 없어 제외, PostgreSQL 에서는 상품명 trigram 인덱스 사용
+    search_fields = ['name']
     list_editable = ['is_active', 'stock']
     readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['created_by']
     inlines = [ProductImageInline]
+    # 대용량 테이블: 예상 건수로 페이지 계산, 전체 건수 COUNT 생략
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('기본 정보', {
@@ -39,5 +47,34 @@ class ProductImageAdmin(admin.ModelAdmin):
     list_display = ['product', 'image', 'order', 'is_main', 'created_at']
     list_filter = ['is_main', 'created_at']
     list_editable = ['order', 'is_main']
-    search_fields = ['product__name', 'alt_text']
+    list_select_related = ['product']
+    search_fields = ['product__name']
     readonly_fields = ['created_at']
+    autocomplete_fields = ['product']
+    # 모델 기본 정렬(order, created_at)은 전체 정렬이 필요해 기본키 순으로
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedProduct)
+class ArchivedProductAdmin(admin.ModelAdmin):
+    """보관된 상품은 읽기 전용, 되돌리기만 가능"""
+    list_display = ['id', 'name', 'category', 'price', 'created_by', 'updated_at', 'archived_at']
+    list_select_related = ['created_by']
+    search_fields = ['name']
+    ordering = ['-archived_at']
+    actions = ['restore_products']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='선택한 상품 되돌리기', permissions=['delete'])
+    def restore_products(self, request, queryset):
+        restored = restore(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f'{restored}개 상품을 되돌렸습니다.')
@@ -0,0 +1,104 @@
+"""
+오래 비활성인 상품을 보관 테이블로 옮기기 / 되돌리기
+
+상품과 이미지 행을 배치 단위로 복사한 뒤 원래 행을 지운다.  배치마다 한
+트랜잭션이라 중간에 멈춰도 반쯤 옮겨진 상품은 없고, 다시 실행하면 남은
+상품부터 이어서 옮긴다.  이미지 파일은 그대로 두며 주문/집계 행은 상품을
+DB 제약 없이 참조하므로 영향이 없다.  장바구니 항목과 재고 예약은 함께
+삭제된다 (비활성 상품은 구매할 수 없다).
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.upload.signals import keep_stored_files
+from .models import ArchivedProduct, ArchivedProductImage, Product, ProductImage
+
+PRODUCT_FIELDS = [
+    'id', 'name', 'description', 'price', 'category', 'stock', 'is_active',
+    'created_by_id', 'created_at', 'updated_at', 'search_jamo', 'search_chosung',
+]
+IMAGE_FIELDS = [
+    'id', 'product_id', 'image', 'alt_text', 'order', 'is_main', 'ahash', 'dhash', 'created_at', 'updated_at',
+]
+
+
+@dataclass
+class ArchiveBatch:
+    products: int
+    images: int
+    last_id: int
+    elapsed: float
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, 'PRODUCT_ARCHIVE_AFTER_DAYS', 365)
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable(cutoff):
+    """cutoff 이전부터 비활성인 상품"""
+    return Product.objects.filter(is_active=False, updated_at__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size, after_id=0):
+    """id 가 after_id 보다 큰 대상 상품을 최대 batch_size 개 옮긴다. 없으면 None"""
+    started = time.perf_counter()
+    with transaction.atomic():
+        queryset = archivable(cutoff).filter(pk__gt=after_id).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            # 다른 요청이 수정 중인 상품은 건너뛰고 다음 실행에서 처리
+            queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return None
+        ArchivedProduct.objects.bulk_create(
+            ArchivedProduct(**row) for row in Product.objects.filter(pk__in=ids).values(*PRODUCT_FIELDS)
+        )
+        images = [
+            ArchivedProductImage(**row)
+            for row in ProductImage.objects.filter(product_id__in=ids).values(*IMAGE_FIELDS)
+        ]
+        ArchivedProductImage.objects.bulk_create(images, batch_size=1000)
+        with keep_stored_files():
+            Product.objects.filter(pk__in=ids).delete()
+    return ArchiveBatch(len(ids), len(images), ids[-1], time.perf_counter() - started)
+
+
+def archive(cutoff, batch_size=500, max_batches=None):
+    """배치마다 ArchiveBatch 를 돌려주며 대상이 없을 때까지 옮긴다"""
+    after_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        batch = archive_batch(cutoff, batch_size, after_id)
+        if batch is None:
+            return
+        after_id = batch.last_id
+        batches += 1
+        yield batch
+
+
+def restore(ids):
+    """보관된 상품을 같은 id 로 되돌린다 (다시 판매하려면 is_active 를 켜야 한다)"""
+    with transaction.atomic():
+        rows = list(ArchivedProduct.objects.select_for_update().filter(pk__in=ids).values(*PRODUCT_FIELDS))
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+        # auto_now(_add) 가 원래 시각을 덮어쓰지 않도록 update 로 되돌려 놓는다
+        Product.objects.bulk_create(Product(**row) for row in rows)
+        for row in rows:
+            Product.objects.filter(pk=row['id']).update(created_at=row['created_at'], updated_at=row['updated_at'])
+        images = list(ArchivedProductImage.objects.filter(product_id__in=ids).values(*IMAGE_FIELDS))
+        ProductImage.objects.bulk_create((ProductImage(**row) for row in images), batch_size=1000)
+        for row in images:
+            ProductImage.objects.filter(pk=row['id']).update(
+                created_at=row['created_at'], updated_at=row['updated_at'],
+            )
+        ArchivedProduct.objects.filter(pk__in=ids).delete()
+    return len(rows)
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import async_views
+
+app_name = 'products_async'
+
+urlpatterns = [
+    path('', async_views.product_list, name='product_list'),
+    path('search/', async_views.product_search, name='product_search'),
+    path('categories/', async_views.product_categories, name='product_categories'),
+    path('<int:pk>/', async_views.product_detail, name='product_detail'),
+]
@@ -0,0 +1,181 @@
+"""
+상품 조회 API 비동기 구현 (ASGI 전용, /api/v2/products/)
+
+DRF 뷰는 동기라서 DB 왕복 동안 스레드를 점유한다.  여기서는 Django 비동기
+ORM 으로 조회하고 ``values()`` 결과를 ProductSerializer 와 같은 모양의 dict 로
+직접 만든다.  인증, 응답 형식(JSON / MessagePack), 읽기 복제본, 조건부 GET 은
+동기 ProductViewSet 과 같은 규칙을 따른다.  상세 조회는 보관된 상품도 찾는다.
+"""
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, ValidationError
+
+from apps.users.authentication import RevocableJWTAuthentication
+from marketon.db_router import ais_pinned, replica_aliases, replica_reads
+from marketon.renderers import MessagePackRenderer, ORJSONRenderer
+
+from . import counters
+from .conditional import aconditional_response, adetail_validators, alist_validators
+from .models import ArchivedProduct, ArchivedProductImage, Product, ProductImage
+from .queries import category_names, filter_products
+
+PRODUCT_FIELDS = (
+    'id', 'name', 'description', 'price', 'category', 'stock', 'is_active',
+    'created_by__username', 'created_at', 'updated_at',
+)
+IMAGE_FIELDS = ('id', 'product_id', 'image', 'alt_text', 'order', 'is_main', 'created_at')
+
+_price_places = Product._meta.get_field('price').decimal_places
+_image_storage = ProductImage._meta.get_field('image').storage
+_renderers = (MessagePackRenderer(), ORJSONRenderer())
+_authentication = RevocableJWTAuthentication()
+
+
+def _datetime(value):
+    """DRF DateTimeField 와 같은 표현"""
+    if value is None:
+        return None
+    if settings.USE_TZ:
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _image_dict(request, row):
+    url = request.build_absolute_uri(_image_storage.url(row['image'])) if row['image'] else None
+    return {
+        'id': row['id'],
+        'image': url,
+        'image_url': url,
+        'thumbnail_url': url,
+        'alt_text': row['alt_text'],
+        'order': row['order'],
+        'is_main': row['is_main'],
+        'created_at': _datetime(row['created_at']),
+    }
+
+
+def _product_dict(row, images):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'description': row['description'],
+        'price': f"{row['price']:.{_price_places}f}",
+        'category': row['category'],
+        'stock': row['stock'],
+        'is_active': row['is_active'],
+        'created_by': row['created_by__username'],
+        'created_at': _datetime(row['created_at']),
+        'updated_at': _datetime(row['updated_at']),
+        'images': images,
+        'main_image': images[0] if images else None,
+        'image_count': len(images),
+    }
+
+
+async def serialize_products(request, queryset, image_model=ProductImage):
+    """상품 + 이미지를 쿼리 2회로 직렬화"""
+    rows = [row async for row in queryset.values(*PRODUCT_FIELDS)]
+    images = defaultdict(list)
+    if rows:
+        image_rows = image_model.objects.filter(product_id__in=[row['id'] for row in rows])
+        async for image in image_rows.values(*IMAGE_FIELDS):
+            images[image['product_id']].append(_image_dict(request, image))
+    return [_product_dict(row, images[row['id']]) for row in rows]
+
+
+def _select_renderer(request):
+    accept = request.headers.get('Accept', '')
+    for renderer in _renderers:
+        if renderer.media_type in accept or request.GET.get('format') == renderer.format:
+            return renderer
+    return _renderers[-1]
+
+
+def _response(request, data, status=200):
+    renderer = _select_renderer(request)
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+def async_api_view(view):
+    """JWT 인증, 응답 형식 결정, 복제본 읽기를 적용하는 비동기 뷰 데코레이터"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _response(request, {'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        try:
+            # 폐기 확인은 Bloom 필터 동기화나 필터 적중 시 Redis 왕복을 할 수 있으므로
+            # 이벤트 루프를 막지 않도록 스레드에서 실행
+            result = await sync_to_async(_authentication.authenticate, thread_sensitive=False)(request)
+            if result is None:
+                raise NotAuthenticated()
+        except (AuthenticationFailed, NotAuthenticated) as exc:
+            data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            response = _response(request, data, status=401)
+            response['WWW-Authenticate'] = _authentication.authenticate_header(request)
+            return response
+        request.user, request.auth = result
+        request.accepted_media_type = _select_renderer(request).media_type
+
+        try:
+            if replica_aliases() and not await ais_pinned(request):
+                with replica_reads():
+                    return await view(request, *args, **kwargs)
+            return await view(request, *args, **kwargs)
+        except ValidationError as exc:
+            # 잘못된 필터 값 (ProductFilter)
+            return _response(request, exc.detail, status=400)
+    return wrapper
+
+
+@async_api_view
+async def product_list(request):
+    """상품 목록 (search / category / is_active 와 ProductFilter 필터, 정렬)"""
+    queryset = filter_products(Product.objects.select_related('created_by'), request.GET)
+    validators = await alist_validators(request, queryset)
+
+    async def render():
+        return _response(request, await serialize_products(request, queryset))
+    return await aconditional_response(request, validators, render)
+
+
+@async_api_view
+async def product_detail(request, pk):
+    """상품 상세 (없으면 보관된 상품에서 찾는다)"""
+    image_model = ProductImage
+    queryset = filter_products(Product.objects.select_related('created_by'), request.GET, ordering=False)
+    validators = await adetail_validators(request, queryset, pk)
+    if validators is None:
+        image_model = ArchivedProductImage
+        queryset = filter_products(ArchivedProduct.objects.select_related('created_by'), request.GET, ordering=False)
+        validators = await adetail_validators(request, queryset, pk)
+    else:
+        counters.record(pk, counters.VIEWS)
+    if validators is None:
+        return _response(request, {'detail': 'No Product matches the given query.'}, status=404)
+
+    async def render():
+        products = await serialize_products(request, queryset.filter(pk=pk), image_model)
+        if not products:
+            return _response(request, {'detail': 'No Product matches the given query.'}, status=404)
+        return _response(request, products[0])
+    return await aconditional_response(request, validators, render)
+
+
+@async_api_view
+async def product_search(request):
+    """상품 검색 (동기 API 와 마찬가지로 목록과 같은 필터)"""
+    return await product_list.__wrapped__(request)
+
+
+@async_api_view
+async def product_categories(request):
+    """사용 가능한 카테고리 목록"""
+    return _response(request, [category async for category in category_names()])
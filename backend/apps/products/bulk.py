@@ -0,0 +1,153 @@
+"""
+재고 / 가격 / 판매 여부 일괄 동기화 (ERP 연동)
+
+행마다 시리얼라이저를 만들고 save() 로 모든 컬럼을 쓰는 대신:
+
+1. 필드 단위로 검증한다.  ProductUpdateSerializer 의 필드 객체를 한 번만 만들어
+   열(column)마다 전체 행에 적용하므로 PATCH 와 같은 규칙이다.
+2. 현재 값을 상품 id 묶음으로 한 번에 읽어 실제로 바뀐 필드만 고른다.
+3. 바뀐 필드 조합별로 묶어 bulk_update 로 그 컬럼과 updated_at 만 쓴다.
+   값이 같은 행은 쓰지 않으므로 updated_at 과 조건부 GET 의 ETag 도 그대로다.
+
+청크마다 products_bulk_updated 신호를 한 번 보낸다 (대시보드 재고 집계 등).
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Product
+from .serializers import ProductUpdateSerializer
+from .signals import products_bulk_updated
+
+SYNC_FIELDS = ('stock', 'price', 'is_active')
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid'
+
+
+def _sync_fields():
+    fields = ProductUpdateSerializer().fields
+    return {name: fields[name] for name in SYNC_FIELDS}
+
+
+def _id(value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def validate_rows(rows):
+    """
+    ``{id: {field: value}}`` 와 행별 오류를 돌려준다.
+
+    오류가 있는 행, 같은 id 가 다시 나온 행은 적용하지 않는다.
+    """
+    errors = {}
+    values = {}
+    ids = []
+    owners = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = {'non_field_errors': ['객체여야 합니다.']}
+            ids.append(None)
+            continue
+        product_id = _id(row.get('id'))
+        if product_id is None:
+            errors[index] = {'id': ['양의 정수여야 합니다.']}
+        elif product_id in values:
+            errors[index] = {'id': ['같은 요청에 중복된 상품입니다.']}
+        else:
+            values[product_id] = {}
+            owners[product_id] = index
+        ids.append(product_id)
+
+    for name, field in _sync_fields().items():
+        for index, row in enumerate(rows):
+            if index in errors or name not in row:
+                continue
+            try:
+                values[ids[index]][name] = field.run_validation(row[name])
+            except ValidationError as exc:
+                errors.setdefault(index, {})[name] = exc.detail
+
+    for index, row in enumerate(rows):
+        if index not in errors and not values[ids[index]]:
+            errors[index] = {'non_field_errors': [f'{", ".join(SYNC_FIELDS)} 중 하나 이상이 필요합니다.']}
+    for index in errors:
+        if owners.get(ids[index]) == index:
+            del values[ids[index]]
+    return ids, values, errors
+
+
+def _current(ids):
+    current = {}
+    chunk = settings.PRODUCT_BULK_SYNC_CHUNK
+    for start in range(0, len(ids), chunk):
+        # 잠가 두어야 재고 변화량(신호)이 동시 수정과 어긋나지 않는다
+        rows = (
+            Product.objects.select_for_update().filter(pk__in=ids[start:start + chunk])
+            .order_by('pk').values('pk', *SYNC_FIELDS)
+        )
+        current.update((row.pop('pk'), row) for row in rows)
+    return current
+
+
+def _apply(changes, now):
+    groups = defaultdict(list)
+    for product_id, fields in changes.items():
+        product = Product(pk=product_id, updated_at=now)
+        for name, (old, new) in fields.items():
+            setattr(product, name, new)
+        groups[tuple(sorted(fields))].append(product)
+
+    chunk = settings.PRODUCT_BULK_SYNC_CHUNK
+    for fields, products in groups.items():
+        for start in range(0, len(products), chunk):
+            batch = products[start:start + chunk]
+            Product.objects.bulk_update(batch, [*fields, 'updated_at'])
+            products_bulk_updated.send(
+                sender=Product,
+                changes={product.pk: changes[product.pk] for product in batch},
+                updated_at=now,
+            )
+
+
+def sync_products(rows):
+    """행 목록을 적용하고 입력 순서대로 행별 결과를 돌려준다"""
+    ids, values, errors = validate_rows(rows)
+    now = timezone.now()
+    with transaction.atomic():
+        current = _current(list(values))
+        changes = {}
+        for product_id, fields in values.items():
+            if product_id not in current:
+                continue
+            changed = {
+                name: (current[product_id][name], value)
+                for name, value in fields.items() if current[product_id][name] != value
+            }
+            if changed:
+                changes[product_id] = changed
+        _apply(changes, now)
+
+    results = []
+    for index, product_id in enumerate(ids):
+        if index in errors:
+            results.append({'index': index, 'id': product_id, 'status': INVALID, 'errors': errors[index]})
+        elif product_id not in current:
+            results.append({'index': index, 'id': product_id, 'status': NOT_FOUND})
+        elif product_id in changes:
+            results.append({'index': index, 'id': product_id, 'status': UPDATED,
+                            'fields': sorted(changes[product_id])})
+        else:
+            results.append({'index': index, 'id': product_id, 'status': UNCHANGED})
+    return results
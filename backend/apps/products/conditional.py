@@ -0,0 +1,132 @@
+"""
+상품 응답의 조건부 GET (ETag / Last-Modified)
+
+본문을 직렬화하지 않고 updated_at 과 이미지 타임스탬프 집계만으로 검증자를
+만든다.  이미지 개수도 ETag 에 넣어 이미지 삭제도 감지한다.  Last-Modified 는
+삭제를 반영하지 못하므로 If-None-Match 가 우선한다.
+
+동기 ViewSet 과 비동기 뷰(async_views)가 같은 쿼리와 ETag 규칙을 쓴다.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import ProductImage
+
+
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def make_etag(request, *parts):
+    """표현(응답 형식, 호스트, 쿼리스트링)별로 다른 강한 ETag"""
+    # 비동기 뷰는 DRF Request 가 아니므로 직접 정한 형식을 넘긴다
+    media_type = getattr(request, 'accepted_media_type', None)
+    key = '|'.join(str(part) for part in (
+        media_type, request.get_host(), request.get_full_path(), *parts,
+    ))
+    return '"%s"' % hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _detail_query(queryset, pk):
+    return (
+        queryset.prefetch_related(None).filter(pk=pk).order_by()
+        .values('pk', 'updated_at')
+        .annotate(images_updated=Max('images__updated_at'), images_count=Count('images'))
+    )
+
+
+def _detail_result(request, row):
+    if row is None:
+        return None
+    return (
+        make_etag(request, row['pk'], row['updated_at'], row['images_updated'], row['images_count']),
+        _latest(row['updated_at'], row['images_updated']),
+    )
+
+
+def _list_queries(queryset):
+    products = queryset.prefetch_related(None).order_by()
+    images = ProductImage.objects.filter(product__in=products.values('pk'))
+    return products, images
+
+
+_PRODUCT_SUMMARY = {'count': Count('pk'), 'updated': Max('updated_at'), 'last_id': Max('pk')}
+_IMAGE_SUMMARY = {'count': Count('pk'), 'updated': Max('updated_at')}
+# 인기순 목록은 상품이 그대로여도 ProductStats 가 바뀌면 순서가 바뀐다
+_POPULAR_SUMMARY = {**_PRODUCT_SUMMARY, 'stats_updated': Max('stats__updated_at')}
+
+
+def _product_summary(request):
+    return _POPULAR_SUMMARY if 'popular' in request.GET.get('ordering', '') else _PRODUCT_SUMMARY
+
+
+def _list_result(request, summary, images):
+    stats = [summary['stats_updated']] if 'stats_updated' in summary else []
+    return (
+        make_etag(request, summary['count'], summary['last_id'], summary['updated'],
+                  images['count'], images['updated'], *stats),
+        _latest(summary['updated'], images['updated'], *stats),
+    )
+
+
+def detail_validators(request, queryset, pk):
+    """상품 1건의 (etag, last_modified). 없는 상품이면 None"""
+    return _detail_result(request, _detail_query(queryset, pk).first())
+
+
+async def adetail_validators(request, queryset, pk):
+    return _detail_result(request, await _detail_query(queryset, pk).afirst())
+
+
+def list_validators(request, queryset):
+    """목록 전체의 (etag, last_modified): 상품/이미지 집계 쿼리 2회"""
+    products, images = _list_queries(queryset)
+    return _list_result(
+        request, products.aggregate(**_product_summary(request)), images.aggregate(**_IMAGE_SUMMARY),
+    )
+
+
+async def alist_validators(request, queryset):
+    products, images = _list_queries(queryset)
+    return _list_result(
+        request, await products.aaggregate(**_product_summary(request)), await images.aaggregate(**_IMAGE_SUMMARY),
+    )
+
+
+def _timestamp(validators):
+    last_modified = validators[1]
+    return timegm(last_modified.utctimetuple()) if last_modified else None
+
+
+def _not_modified(request, validators):
+    return get_conditional_response(request, etag=validators[0], last_modified=_timestamp(validators))
+
+
+def _add_validators(response, validators):
+    if response.status_code in (200, 304):
+        response['ETag'] = validators[0]
+        timestamp = _timestamp(validators)
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # 인증이 필요한 API 이므로 공유 캐시에는 두지 않고 매번 재검증
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def conditional_response(request, validators, render):
+    """일치하면 304, 아니면 render() 결과에 검증자 헤더를 붙여 반환"""
+    if validators is None:
+        return render()
+    return _add_validators(_not_modified(request, validators) or render(), validators)
+
+
+async def aconditional_response(request, validators, render):
+    if validators is None:
+        return await render()
+    return _add_validators(_not_modified(request, validators) or await render(), validators)
@@ -0,0 +1,172 @@
+"""
+상품 조회 / 장바구니 담기 카운터 (쓰기 지연)
+
+상세 조회마다 UPDATE 를 하면 가장 많은 읽기가 쓰기가 되므로, 프로세스 메모리에
+상품별로 모았다가 PRODUCT_COUNTERS_FLUSH_SECONDS 마다 ProductStats 에 upsert
+(INSERT ... ON CONFLICT DO UPDATE) 한 번으로 더한다.  record() 는 dict 를 고칠
+뿐이고 쓰기는 백그라운드 스레드가 한다.  프로세스가 죽으면 마지막 주기의 수는
+잃는다 (인기 정렬용이라 감수한다).
+
+인기 점수는 전방 감쇠(forward decay)다: 시각 t 의 사건은
+``가중치 * 2 ** ((t - LANDMARK) / 반감기)`` 를 더한다.  모든 점수가 같은 비율로
+커질 뿐이라 순서는 지수 감쇠한 점수와 같고, 주기적으로 전체 행을 깎는 작업이
+필요 없다.  반감기 7일이면 float 범위를 넘기까지 약 19년이므로 그 전에
+LANDMARK 를 옮기고 점수를 같은 비율로 줄인다.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, connections, models
+from django.utils import timezone
+
+from .models import ProductImage, ProductStats
+
+logger = logging.getLogger(__name__)
+
+VIEWS = 'views'
+CART_ADDS = 'cart_adds'
+FIELDS = (VIEWS, CART_ADDS)
+
+# 감쇠 기준 시각 (점수의 배율이 1 인 시각)
+LANDMARK = datetime(2026, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+# upsert 한 문장의 행 수 (행마다 파라미터 5개, SQLite 변수 제한 안쪽)
+BATCH_SIZE = 150
+
+
+def decay_weight(timestamp):
+    """``timestamp`` 에 일어난 사건 하나의 점수 배율"""
+    half_life = settings.PRODUCT_POPULARITY_HALF_LIFE_DAYS * 24 * 60 * 60
+    return 2 ** ((timestamp - LANDMARK) / half_life)
+
+
+def _upsert_sql(rows):
+    table = ProductStats._meta.db_table
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * rows)
+    # SQLite(3.24+) 와 PostgreSQL 이 같은 문법을 쓴다
+    return (
+        f'INSERT INTO {table} (product_id, views, cart_adds, score, updated_at) VALUES {values} '
+        f'ON CONFLICT (product_id) DO UPDATE SET '
+        f'views = {table}.views + excluded.views, '
+        f'cart_adds = {table}.cart_adds + excluded.cart_adds, '
+        f'score = {table}.score + excluded.score, '
+        f'updated_at = excluded.updated_at'
+    )
+
+
+def _new_row():
+    return [0, 0, 0.0]
+
+
+class Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(_new_row)  # product_id -> [views, cart_adds, score]
+
+    def record(self, product_id, field, count=1):
+        """``field`` (VIEWS / CART_ADDS) 를 ``count`` 만큼 더한다 (DB 를 건드리지 않는다)"""
+        score = settings.PRODUCT_POPULARITY_WEIGHTS[field] * count * decay_weight(time.time())
+        with self._lock:
+            row = self._pending[int(product_id)]
+            row[FIELDS.index(field)] += count
+            row[2] += score
+
+    def flush(self):
+        """모은 수를 upsert 하고 쓴 상품 수를 돌려준다 (실패하면 다음 주기에 다시 쓴다)"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(_new_row)
+        if not pending:
+            return 0
+        now = timezone.now()
+        # 상품 id 순서로 써서 동시에 비우는 프로세스끼리 교착되지 않는다
+        rows = sorted(pending.items())
+        try:
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), BATCH_SIZE):
+                    batch = rows[start:start + BATCH_SIZE]
+                    params = [
+                        value for product_id, (views, cart_adds, score) in batch
+                        for value in (product_id, views, cart_adds, score, now)
+                    ]
+                    cursor.execute(_upsert_sql(len(batch)), params)
+        except Exception:
+            logger.warning('Could not flush product counters, keeping them for the next flush', exc_info=True)
+            self._merge(pending)
+            return 0
+        return len(rows)
+
+    def _merge(self, pending):
+        with self._lock:
+            for product_id, values in pending.items():
+                row = self._pending[product_id]
+                for i, value in enumerate(values):
+                    row[i] += value
+
+    def __len__(self):
+        return len(self._pending)
+
+
+_counters = Counters()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def get_counters():
+    return _counters
+
+
+def reset_counters():
+    """모은 수를 버린다 (테스트용)"""
+    global _counters
+    _counters = Counters()
+
+
+def record(product_id, field, count=1):
+    _counters.record(product_id, field, count)
+
+
+def flush():
+    return _counters.flush()
+
+
+def start_flusher():
+    """
+    워커 시작 시 (asgi.py / wsgi.py) PRODUCT_COUNTERS_FLUSH_SECONDS 마다 비우는
+    스레드를 띄우고, 프로세스가 끝날 때 남은 수를 쓴다
+    """
+    global _flusher
+
+    def run():
+        while True:
+            time.sleep(settings.PRODUCT_COUNTERS_FLUSH_SECONDS)
+            try:
+                flush()
+            finally:
+                connections.close_all()
+
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=run, name='product-counters-flush', daemon=True)
+            _flusher.start()
+            atexit.register(flush)
+
+
+def trending(category=None, limit=None):
+    """감쇠한 인기 점수 상위 판매 중 상품 (점수는 지금 기준으로 환산)"""
+    limit = limit or settings.PRODUCT_TRENDING_LIMIT
+    main_image = ProductImage.objects.filter(product=models.OuterRef('product_id')).order_by('-is_main', 'order')
+    queryset = ProductStats.objects.filter(product__is_active=True, score__gt=0)
+    if category:
+        queryset = queryset.filter(product__category=category)
+    rows = (
+        queryset.order_by('-score', '-product_id')
+        .annotate(image=models.Subquery(main_image.values('image')[:1]))
+        .values('product_id', 'product__name', 'product__price', 'product__category', 'image',
+                'score', 'views', 'cart_adds')[:limit]
+    )
+    scale = decay_weight(time.time())
+    return [dict(row, score=row['score'] / scale) for row in rows]
@@ -0,0 +1,141 @@
+"""
+상품 변경 피드 (모바일 카탈로그 동기화, ``?updated_since=<cursor>``)
+
+커서는 마지막으로 받은 변경의 (시각, 상품 id) 이다.  그 이후에 바뀐 상품을
+(updated_at, id) 인덱스로 키셋 조회하고, 삭제 기록(ProductTombstone)도 같은
+순서로 합쳐서 돌려준다.  이미지 추가/수정/삭제는 상품의 updated_at 을 갱신하므로
+(signals.touch_product) 상품 행으로 함께 전달된다.
+
+- changed: 판매 중인 상품의 간단한 행 (설명과 재고는 상세 조회로)
+- removed: 삭제, 보관, 비활성화된 상품 id
+- next_cursor: 다음 요청에 그대로 넘기면 된다.  has_more 가 false 면 최신 상태
+
+동시에 커밋되는 트랜잭션은 updated_at 순서와 다르게 보일 수 있으므로 최근
+PRODUCT_FEED_LAG_SECONDS 의 변경은 다음 요청에서 전달한다.  삭제 기록 보관
+기간보다 오래된 커서는 reset=true 와 함께 처음부터 다시 보낸다.
+"""
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Product, ProductImage, ProductTombstone
+
+FIELDS = ('id', 'name', 'price', 'category', 'is_active', 'updated_at')
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(moment, product_id):
+    micros = (moment - EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(f'{micros}:{product_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """빈 값이면 None (처음부터), ISO 8601 시각도 받는다"""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is not None:
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment, 0
+    try:
+        decoded = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        micros, product_id = (int(part) for part in decoded.split(':'))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(value)
+    moment = EPOCH + timedelta(microseconds=micros)
+    return moment, product_id
+
+
+def _after(cursor, time_field, id_field):
+    if cursor is None:
+        return Q()
+    moment, product_id = cursor
+    return Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, f'{id_field}__gt': product_id})
+
+
+def image_urls(product_ids, build_url=str):
+    """상품별 이미지 URL 목록 (메인 이미지가 맨 앞)"""
+    storage = ProductImage._meta.get_field('image').storage
+    images = {}
+    rows = ProductImage.objects.filter(product_id__in=product_ids).values_list('product_id', 'image', 'is_main')
+    for product_id, name, is_main in rows:
+        url = build_url(storage.url(name))
+        urls = images.setdefault(product_id, [])
+        if is_main:
+            urls.insert(0, url)
+        else:
+            urls.append(url)
+    return images
+
+
+def compact_row(row, images):
+    """피드와 카탈로그 스냅샷이 쓰는 간단한 상품 행"""
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'price': str(row['price']),
+        'category': row['category'],
+        'images': images.get(row['id'], []),
+        'updated_at': row['updated_at'],
+    }
+
+
+def changes(request, cursor, limit):
+    """cursor 이후의 변경을 최대 limit 건"""
+    now = timezone.now()
+    reset = False
+    keep = timedelta(days=settings.PRODUCT_TOMBSTONE_KEEP_DAYS)
+    if cursor is not None and cursor[0] < now - keep:
+        # 그 사이 삭제 기록이 지워졌을 수 있다
+        cursor, reset = None, True
+    until = now - timedelta(seconds=settings.PRODUCT_FEED_LAG_SECONDS)
+
+    products = list(
+        Product.objects.filter(_after(cursor, 'updated_at', 'id'), updated_at__lte=until)
+        .order_by('updated_at', 'id').values(*FIELDS)[:limit + 1]
+    )
+    tombstones = list(
+        ProductTombstone.objects.filter(_after(cursor, 'removed_at', 'product_id'), removed_at__lte=until)
+        .order_by('removed_at', 'product_id').values_list('removed_at', 'product_id')[:limit + 1]
+    )
+    events = sorted(
+        [(row['updated_at'], row['id'], row) for row in products]
+        + [(removed_at, product_id, None) for removed_at, product_id in tombstones],
+        key=lambda event: event[:2],
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    active = [row for _, _, row in events if row is not None and row['is_active']]
+    images = image_urls([row['id'] for row in active], request.build_absolute_uri) if active else {}
+    changed = [compact_row(row, images) for row in active]
+    # 같은 id 가 여러 번 나오면 마지막 상태가 이긴다 (삭제 후 같은 id 로 복원 등)
+    latest = {product_id: row for _, product_id, row in events}
+    removed = [product_id for product_id, row in latest.items() if row is None or not row['is_active']]
+    changed = [row for row in changed if latest[row['id']] is not None and latest[row['id']]['is_active']]
+
+    if events:
+        next_cursor = encode_cursor(*events[-1][:2])
+    elif cursor is not None:
+        next_cursor = encode_cursor(*cursor)
+    else:
+        next_cursor = ''
+    return {
+        'changed': changed,
+        'removed': removed,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'reset': reset,
+    }
@@ -0,0 +1,69 @@
+"""
+상품 목록 필터 (django-filter, 동기 ViewSet 과 비동기 뷰 공용)
+
+search / category / is_active 는 queries.filter_products 가 그대로 처리하고,
+여기서는 가격 범위, 재고 있음, 카테고리 목록, 생성자, 정렬을 더한다.
+자주 쓰는 조합은 Product.Meta.indexes 의 복합 인덱스를 탄다.
+?ordering=popular 는 미리 계산한 인기 점수(ProductStats.score) 순이다.
+"""
+import django_filters
+from django.db.models import F, OrderBy
+from django_filters.constants import EMPTY_VALUES
+
+from .models import Product
+
+
+def _is_descending(ordering):
+    return ordering.descending if isinstance(ordering, OrderBy) else ordering.startswith('-')
+
+
+class StableOrderingFilter(django_filters.OrderingFilter):
+    """
+    정렬 값이 같은 행도 순서가 고정되도록 id 를 마지막 기준으로 붙인다.
+    ``descending`` 의 정렬 이름은 큰 값이 먼저이고 (``-`` 를 붙이면 반대),
+    값이 없는 행은 어느 쪽이든 맨 뒤다.
+    """
+
+    def __init__(self, *args, descending=(), **kwargs):
+        self.descending = set(descending)
+        super().__init__(*args, **kwargs)
+
+    def get_ordering_value(self, param):
+        name = param.removeprefix('-')
+        if name not in self.descending:
+            return super().get_ordering_value(param)
+        field = F(self.param_map.get(name, name))
+        return field.asc(nulls_last=True) if param.startswith('-') else field.desc(nulls_last=True)
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value in EMPTY_VALUES:
+            return qs
+        tiebreak = '-id' if _is_descending(self.get_ordering_value(value[-1])) else 'id'
+        return qs.order_by(*qs.query.order_by, tiebreak)
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
+
+
+class ProductFilter(django_filters.FilterSet):
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+    # ?categories=도서,가전
+    categories = CharInFilter(field_name='category')
+    created_by = django_filters.NumberFilter(field_name='created_by_id')
+    ordering = StableOrderingFilter(fields=(
+        ('price', 'price'),
+        ('created_at', 'created_at'),
+        ('name', 'name'),
+        ('stats__score', 'popular'),
+    ), descending=('popular',))
+
+    class Meta:
+        model = Product
+        fields = []
+
+    def filter_in_stock(self, queryset, name, value):
+        return queryset.filter(stock__gt=0) if value else queryset.filter(stock=0)
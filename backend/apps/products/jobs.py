@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from apps.jobs.registry import job, periodic
+from . import snapshots
+from .models import CatalogSnapshot, ProductTombstone
+
+
+@periodic(timedelta(days=1), max_attempts=1, concurrency=1)
+def prune_tombstones():
+    """Drop deletion records older than ``PRODUCT_TOMBSTONE_KEEP_DAYS``."""
+    cutoff = timezone.now() - timedelta(days=settings.PRODUCT_TOMBSTONE_KEEP_DAYS)
+    ProductTombstone.objects.filter(removed_at__lt=cutoff).delete()
+
+
+@periodic(timedelta(minutes=5), max_attempts=1, concurrency=1)
+def build_catalog_snapshots():
+    """Rebuild the snapshot bundles of categories whose products changed."""
+    snapshots.build()
+
+
+@periodic(timedelta(hours=1), max_attempts=2, concurrency=1)
+def refresh_related_products():
+    """Fold orders placed since the last run into the co-purchase neighbors."""
+    # NumPy / SciPy are only loaded in the job worker, not in web processes
+    from .recommendations import refresh
+
+    refresh()
+
+
+@periodic(timedelta(days=7), max_attempts=1, concurrency=1)
+def rebuild_related_products():
+    """Recompute every product's neighbors (incremental runs only rescore touched products)."""
+    from .recommendations import refresh
+
+    refresh(full=True)
+
+
+@job(max_attempts=5)
+def delete_snapshot_files(names):
+    """Delete replaced snapshot bundles once clients had time to fetch them."""
+    for name in names:
+        # Identical content may have been published again under the same name
+        base = name.removesuffix('.gz').removesuffix('.br')
+        if not CatalogSnapshot.objects.filter(path=base).exists():
+            default_storage.delete(name)
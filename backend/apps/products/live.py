@@ -0,0 +1,316 @@
+"""
+상품 재고 / 가격 / 판매 여부 실시간 푸시 (Server-Sent Events, ASGI 전용)
+
+상품 페이지가 상세 API 를 폴링하는 대신 ``GET /api/v2/products/live/?ids=1,2``
+스트림을 열어 두면 처음에 현재 값을 받고, 이후에는 바뀐 상품만 받는다.
+
+- 변경은 커밋 후 notify() 로 알린다: Product 저장, 일괄 동기화, 주문, 장바구니
+  재고 예약/해제 (queryset.update 라 post_save 가 없는 곳은 stock_changed 신호).
+- REDIS_URL 이 있으면 Redis pub/sub 채널로 보내고, 구독자가 있는 워커마다 채널을
+  듣는 태스크가 받아 자기 프로세스의 구독자에게 나눠 준다.  없으면 같은 프로세스
+  안에서만 전달된다 (개발용).
+- Broadcaster 는 PRODUCT_LIVE_COALESCE_SECONDS 동안 모인 변경을 상품마다 마지막
+  값 하나로 합쳐 보낸다.  느린 구독자에게도 상품마다 최신 값 하나만 쌓인다.
+- 인증은 Authorization 헤더의 액세스 토큰이다.  브라우저 EventSource 는 헤더를
+  붙일 수 없으므로 ``?ids=1,2&token=<액세스 토큰>`` 도 받는다 (헤더가 있으면 헤더를
+  쓴다).  URL 은 접근 로그에 남으므로 수명이 짧은 (ACCESS_TOKEN_LIFETIME) 액세스
+  토큰만 받고, 리프레시 토큰은 거절한다.  EventSource 가 다시 연결할 때는 URL 을
+  그대로 쓰므로 토큰이 만료되면 클라이언트가 새 토큰으로 스트림을 다시 연다.
+- Django 핸들러를 거치지 않는 ASGI 앱(app)이라 연결마다 스레드나 DB 연결을 잡지
+  않는다.  구독자는 Event, dict, 끊김 감시 태스크 하나뿐이고 쉬는 동안에는
+  keep-alive 만 보내므로 프로세스당 만 단위 연결을 버틴다.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+
+from urllib.parse import parse_qs
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from apps.users.authentication import RevocableJWTAuthentication
+from marketon.redis import get_redis
+from .models import MAX_ID, Product
+
+logger = logging.getLogger(__name__)
+
+PATH = '/api/v2/products/live/'
+CHANNEL = 'products:live'
+FIELDS = ('id', 'stock', 'price', 'is_active')
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    # nginx 가 이벤트를 모아 보내지 않도록
+    (b'x-accel-buffering', b'no'),
+]
+
+_price_places = Product._meta.get_field('price').decimal_places
+_authentication = RevocableJWTAuthentication()
+
+
+def payload(row):
+    """ProductSerializer 와 같은 표현 (가격은 문자열)"""
+    return {
+        'id': row['id'],
+        'stock': row['stock'],
+        'price': f"{row['price']:.{_price_places}f}",
+        'is_active': row['is_active'],
+    }
+
+
+class Subscriber:
+    __slots__ = ('product_ids', 'pending', 'event', 'closed')
+
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        self.pending = {}  # product_id -> 보내지 않은 최신 값
+        self.event = asyncio.Event()
+        self.closed = False
+
+    def push(self, product_id, data):
+        self.pending[product_id] = data
+        self.event.set()
+
+
+class Broadcaster:
+    """
+    프로세스 안의 구독자에게 변경을 나눠 준다.  구독/해지와 전달은 이벤트 루프
+    스레드에서만 일어나고, 다른 스레드(동기 뷰, on_commit)는 publish() 로 넘긴다.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._subscribers = defaultdict(set)  # product_id -> {Subscriber}
+        self._pending = {}
+        self._flush_handle = None
+        self._listener = None
+        self.count = 0
+
+    def subscribe(self, product_ids):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 이전 루프(테스트, 개발 서버 재시작)의 구독자는 이미 끊겼다
+            self.__init__()
+            self._loop = loop
+        subscriber = Subscriber(product_ids)
+        for product_id in product_ids:
+            self._subscribers[product_id].add(subscriber)
+        self.count += 1
+        if self._listener is None and get_redis() is not None:
+            self._listener = loop.create_task(self._listen())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        removed = False
+        for product_id in subscriber.product_ids:
+            subscribers = self._subscribers.get(product_id)
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.remove(subscriber)
+                removed = True
+                if not subscribers:
+                    del self._subscribers[product_id]
+        if removed:
+            self.count -= 1
+
+    def publish(self, updates):
+        """``{product_id: payload}`` 를 전달한다 (어느 스레드에서나)"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._enqueue, updates)
+
+    def _enqueue(self, updates):
+        self._pending.update(updates)
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(settings.PRODUCT_LIVE_COALESCE_SECONDS, self._flush)
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        self._flush_handle = None
+        for product_id, data in pending.items():
+            for subscriber in self._subscribers.get(product_id, ()):
+                subscriber.push(product_id, data)
+
+    async def _listen(self):
+        """다른 프로세스가 Redis 로 보낸 변경을 받는다 (끊기면 다시 연결)"""
+        import redis.asyncio
+
+        while True:
+            client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self._enqueue({row['id']: row for row in orjson.loads(message['data'])})
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning('Live product channel lost, reconnecting', exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+_broadcaster = Broadcaster()
+
+
+def get_broadcaster():
+    return _broadcaster
+
+
+def publish(product_ids):
+    """상품들의 현재 값을 (Redis 를 거쳐) 구독자에게 보낸다"""
+    client = get_redis()
+    if client is None and not _broadcaster.count:
+        # 이 프로세스에는 구독자가 없다
+        return
+    rows = current(product_ids)
+    if not rows:
+        return
+    if client is None:
+        _broadcaster.publish({row['id']: row for row in rows})
+        return
+    try:
+        client.publish(CHANNEL, orjson.dumps(rows))
+    except Exception:
+        # 푸시는 부가 기능: 쓰기 요청을 실패시키지 않는다
+        logger.warning('Could not publish live product updates', exc_info=True)
+
+
+def notify(product_ids):
+    """커밋 후 ``product_ids`` 의 재고 / 가격 / 판매 여부를 알린다"""
+    product_ids = sorted(set(product_ids))
+    if product_ids:
+        transaction.on_commit(lambda: publish(product_ids))
+
+
+def current(product_ids):
+    return [payload(row) for row in Product.objects.filter(pk__in=product_ids).values(*FIELDS)]
+
+
+def _event(data):
+    return b'event: product\ndata: ' + orjson.dumps(data) + b'\n\n'
+
+
+def _read_current(product_ids):
+    close_old_connections()
+    try:
+        return current(product_ids)
+    finally:
+        close_old_connections()
+
+
+def _parse_ids(query_string):
+    """``ids=1,2,3`` -> [1, 2, 3] (잘못된 값이면 ValueError)"""
+    values = parse_qs(query_string.decode('latin-1')).get('ids', [])
+    product_ids = sorted({int(value) for part in values for value in part.split(',') if value.strip()})
+    if not product_ids:
+        raise ValueError('ids is required.')
+    # 상세 조회(ProductViewSet.product_pk)와 같은 범위: 밖의 값은 DB 조회에서 실패한다
+    if not 0 < product_ids[0] <= product_ids[-1] <= MAX_ID:
+        raise ValueError('ids must be product ids.')
+    if len(product_ids) > settings.PRODUCT_LIVE_MAX_IDS:
+        raise ValueError(f'At most {settings.PRODUCT_LIVE_MAX_IDS} ids per stream.')
+    return product_ids
+
+
+def _raw_token(scope):
+    """Authorization 헤더, 없으면 ``token`` 쿼리 파라미터 (EventSource 용)"""
+    header = dict(scope['headers']).get(b'authorization')
+    if header:
+        return _authentication.get_raw_token(header)
+    values = parse_qs(scope['query_string'].decode('latin-1')).get('token')
+    return values[0].encode('latin-1') if values else None
+
+
+def _authenticate(scope):
+    """액세스 토큰 JWT 검증 (실패하면 AuthenticationFailed / InvalidToken)"""
+    raw_token = _raw_token(scope)
+    if raw_token is None:
+        raise NotAuthenticated()
+    return _authentication.get_validated_token(raw_token)
+
+
+async def _reply(send, status, data, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': orjson.dumps(data)})
+
+
+async def _watch_disconnect(receive, subscriber):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    subscriber.closed = True
+    subscriber.event.set()
+
+
+async def app(scope, receive, send):
+    """
+    ``GET /api/v2/products/live/?ids=1,2`` 를 Django 핸들러 없이 처리하는 ASGI 앱
+    (marketon/asgi.py 가 이 경로만 넘긴다).
+
+    Django 핸들러로 스트리밍하면 열린 요청마다 스레드(ThreadSensitiveContext)가
+    하나씩 붙잡혀 연결 수만큼 스레드가 늘어난다.  여기서는 인증과 첫 조회만 공용
+    스레드 풀을 잠깐 쓰고, 이후에는 이벤트 루프에서 Event 만 기다린다.
+    """
+    if scope['method'] not in ('GET', 'HEAD'):
+        return await _reply(send, 405, {'detail': f'Method "{scope["method"]}" not allowed.'}, [(b'allow', b'GET, HEAD')])
+    try:
+        await sync_to_async(_authenticate, thread_sensitive=False)(scope)
+    except (AuthenticationFailed, NotAuthenticated, InvalidToken) as exc:
+        data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return await _reply(send, 401, data, [(b'www-authenticate', b'Bearer realm="api"')])
+    try:
+        product_ids = _parse_ids(scope['query_string'])
+    except ValueError as exc:
+        return await _reply(send, 400, {'ids': [str(exc)]})
+    if _broadcaster.count >= settings.PRODUCT_LIVE_MAX_SUBSCRIBERS:
+        return await _reply(send, 503, {'detail': 'Too many live streams, retry later.'}, [(b'retry-after', b'5')])
+
+    if scope['method'] == 'HEAD':
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        return await send({'type': 'http.response.body', 'body': b''})
+
+    # 먼저 구독해야 현재 값을 읽는 사이의 변경을 놓치지 않는다
+    subscriber = _broadcaster.subscribe(product_ids)
+    watcher = None
+    try:
+        try:
+            rows = await sync_to_async(_read_current, thread_sensitive=False)(product_ids)
+        except DatabaseError:
+            # 헤더를 보내기 전이라 오류 응답을 돌려줄 수 있다
+            logger.warning('Could not read live products', exc_info=True)
+            return await _reply(send, 503, {'detail': 'Could not read products, retry later.'}, [(b'retry-after', b'5')])
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        watcher = asyncio.create_task(_watch_disconnect(receive, subscriber))
+        chunks = [b'retry: %d\n\n' % settings.PRODUCT_LIVE_RETRY_MS]
+        chunks.extend(_event(data) for data in rows)
+        await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+        while not subscriber.closed:
+            try:
+                async with asyncio.timeout(settings.PRODUCT_LIVE_KEEPALIVE_SECONDS):
+                    await subscriber.event.wait()
+            except TimeoutError:
+                # 프록시가 쉬는 연결을 끊지 않도록
+                await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                continue
+            subscriber.event.clear()
+            pending, subscriber.pending = subscriber.pending, {}
+            if pending and not subscriber.closed:
+                body = b''.join(_event(data) for data in pending.values())
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    except OSError:
+        # 보내는 중에 끊긴 연결
+        pass
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        _broadcaster.unsubscribe(subscriber)
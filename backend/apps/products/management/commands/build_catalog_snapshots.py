@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.snapshots import build
+
+
+class Command(BaseCommand):
+    help = 'Write precompressed JSON bundles of active products for categories that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild every category')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        results = build(force=options['force'])
+        for category, status in results:
+            if status != 'unchanged':
+                self.stdout.write(f'{category}: {status}')
+        built = sum(1 for _, status in results if status == 'built')
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {built} of {len(results)} category bundles in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Update "customers also bought" neighbors from orders placed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute from all orders')
+
+    def handle(self, *args, **options):
+        from apps.products.recommendations import refresh
+
+        started = time.perf_counter()
+        result = refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {result.orders} orders, refreshed {result.products} products '
+            f'(watermark {result.watermark}) in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_name_trigram_index(apps, schema_editor):
+    # icontains 검색(관리자, 상품 API)은 UPPER(name) LIKE 로 번역되므로 같은 식에 인덱스
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS products_name_trgm_idx '
+        'ON products_product USING gin (UPPER(name::text) gin_trgm_ops)'
+    )
+
+
+def drop_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS products_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_productimage_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at', 'id'], name='products_created_id_idx'),
+        ),
+        migrations.RunPython(create_name_trigram_index, drop_name_trigram_index),
+    ]
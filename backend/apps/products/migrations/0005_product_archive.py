@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProduct',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200, verbose_name='상품명')),
+                ('description', models.TextField(verbose_name='상품 설명')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='가격')),
+                ('category', models.CharField(max_length=100, verbose_name='카테고리')),
+                ('stock', models.PositiveIntegerField(default=0, verbose_name='재고')),
+                ('is_active', models.BooleanField(default=False, verbose_name='활성화')),
+                ('created_at', models.DateTimeField(verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(verbose_name='수정일')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='보관일')),
+            ],
+            options={
+                'verbose_name': '보관된 상품',
+                'verbose_name_plural': '보관된 상품들',
+                'db_table': 'products_archived_product',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedProductImage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('image', models.ImageField(upload_to='products/%Y/%m/%d/', verbose_name='이미지')),
+                ('alt_text', models.CharField(blank=True, max_length=200, verbose_name='대체 텍스트')),
+                ('order', models.PositiveIntegerField(default=0, verbose_name='순서')),
+                ('is_main', models.BooleanField(default=False, verbose_name='메인 이미지 여부')),
+                ('created_at', models.DateTimeField(verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '보관된 상품 이미지',
+                'verbose_name_plural': '보관된 상품 이미지들',
+                'db_table': 'products_archived_productimage',
+                'ordering': ['order', 'created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='products_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'created_at'], name='products_active_category_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='생성자'),
+        ),
+        migrations.AddField(
+            model_name='archivedproductimage',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='products.archivedproduct', verbose_name='상품'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:41
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField(verbose_name='상품 ID')),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='삭제일')),
+            ],
+            options={
+                'verbose_name': '삭제된 상품 기록',
+                'verbose_name_plural': '삭제된 상품 기록들',
+                'db_table': 'products_tombstone',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'id'], name='products_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['removed_at', 'product_id'], name='products_tombstone_idx'),
+        ),
+    ]
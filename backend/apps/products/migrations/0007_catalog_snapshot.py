@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100, unique=True, verbose_name='카테고리')),
+                ('path', models.CharField(max_length=255, verbose_name='파일 경로')),
+                ('encodings', models.CharField(blank=True, max_length=50, verbose_name='압축 형식')),
+                ('digest', models.CharField(max_length=64, verbose_name='내용 해시')),
+                ('signature', models.CharField(max_length=200, verbose_name='변경 감지 값')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='상품 수')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='크기')),
+                ('cursor_at', models.DateTimeField(verbose_name='기준 시각')),
+                ('built_at', models.DateTimeField(auto_now=True, verbose_name='생성일')),
+            ],
+            options={
+                'verbose_name': '카탈로그 스냅샷',
+                'verbose_name_plural': '카탈로그 스냅샷들',
+                'db_table': 'products_catalog_snapshot',
+                'ordering': ['category'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_catalog_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='순위')),
+                ('score', models.FloatField(verbose_name='점수')),
+                ('orders', models.PositiveIntegerField(verbose_name='함께 구매된 주문 수')),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='상품')),
+                ('related', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product', verbose_name='관련 상품')),
+            ],
+            options={
+                'verbose_name': '함께 구매된 상품',
+                'verbose_name_plural': '함께 구매된 상품들',
+                'db_table': 'products_related_product',
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='products_related_rank_uniq')],
+            },
+        ),
+    ]
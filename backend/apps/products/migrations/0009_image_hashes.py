@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_related_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedproductimage',
+            name='ahash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='aHash'),
+        ),
+        migrations.AddField(
+            model_name='archivedproductimage',
+            name='dhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='dHash'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='ahash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='aHash'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='dhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='dHash'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+from marketon.hangul import search_keys
+
+
+def backfill_search_keys(apps, schema_editor):
+    # bulk_update 는 auto_now 를 건드리지 않으므로 변경 피드에 다시 나오지 않는다
+    for model_name in ('Product', 'ArchivedProduct'):
+        model = apps.get_model('products', model_name)
+        last_id = 0
+        while True:
+            batch = list(model.objects.filter(pk__gt=last_id).order_by('pk').only('pk', 'name')[:2000])
+            if not batch:
+                break
+            for product in batch:
+                product.search_jamo, product.search_chosung = search_keys(product.name)
+            model.objects.bulk_update(batch, ['search_jamo', 'search_chosung'])
+            last_id = batch[-1].pk
+
+
+def create_search_trigram_indexes(apps, schema_editor):
+    # 3글자(자모) 이상 검색어는 search_jamo / search_chosung LIKE '%...%'
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in ('search_jamo', 'search_chosung'):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS products_{column}_trgm_idx '
+            f'ON products_product USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_search_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in ('search_jamo', 'search_chosung'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS products_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='search_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='search_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['search_jamo'], name='products_jamo_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['search_chosung'], name='products_chosung_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(create_search_trigram_indexes, drop_search_trigram_indexes),
+    ]
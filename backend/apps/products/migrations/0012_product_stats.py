@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_search_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStats',
+            fields=[
+                ('product', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='products.product', verbose_name='상품')),
+                ('views', models.PositiveBigIntegerField(default=0, verbose_name='조회 수')),
+                ('cart_adds', models.PositiveBigIntegerField(default=0, verbose_name='장바구니 담기 수')),
+                ('score', models.FloatField(default=0, verbose_name='인기 점수')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '상품 통계',
+                'verbose_name_plural': '상품 통계들',
+                'db_table': 'products_product_stats',
+                'indexes': [models.Index(fields=['-score'], name='products_stats_score_idx')],
+            },
+        ),
+    ]
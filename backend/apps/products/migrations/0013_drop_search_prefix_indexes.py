@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_product_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_jamo_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_chosung_prefix_idx',
+        ),
+    ]
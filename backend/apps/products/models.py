@@ -1,9 +1,18 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from marketon.hangul import search_keys
+from marketon.imagehash import hash_file
+from marketon.loaded_values import LoadedValuesMixin
 
 User = get_user_model()
 
-class Product(models.Model):
+# BigAutoField 의 최댓값 (더 큰 id 는 DB 드라이버가 OverflowError / DataError 를 낸다)
+MAX_ID = 2 ** 63 - 1
+
+
+class Product(LoadedValuesMixin, models.Model):
     """
     상품 모델
     """
@@ -16,16 +25,53 @@ class Product(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="생성자")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+    # 상품명 검색 키 (marketon.hangul, 저장할 때 계산): 자모 분해 / 초성
+    search_jamo = models.CharField(max_length=1000, blank=True, default='', editable=False)
+    search_chosung = models.CharField(max_length=200, blank=True, default='', editable=False)
 
     class Meta:
         db_table = 'products_product'
         verbose_name = '상품'
         verbose_name_plural = '상품들'
         ordering = ['-created_at']
+        indexes = [
+            # 기본 정렬(-created_at, 동점은 -id) 페이지를 인덱스 역순 스캔으로
+            models.Index(fields=['created_at', 'id'], name='products_created_id_idx'),
+            # 대부분의 조회는 is_active=true: 비활성 상품은 부분 인덱스에서 빠진다
+            models.Index(
+                fields=['created_at', 'id'], condition=models.Q(is_active=True),
+                name='products_active_created_idx',
+            ),
+            models.Index(
+                fields=['category', 'created_at'], condition=models.Q(is_active=True),
+                name='products_active_category_idx',
+            ),
+            # 변경 피드(?updated_since=) 키셋 페이지
+            models.Index(fields=['updated_at', 'id'], name='products_updated_id_idx'),
+            # ProductFilter: 카테고리 + 판매 여부 + 가격 범위/가격순
+            models.Index(fields=['category', 'is_active', 'price'], name='products_cat_active_price_idx'),
+            # 카테고리 없이 가격 범위/가격순
+            models.Index(fields=['is_active', 'price'], name='products_active_price_idx'),
+            # 판매자별 목록 (기본 정렬 -created_at)
+            models.Index(fields=['created_by', 'created_at'], name='products_creator_created_idx'),
+            # search_jamo / search_chosung 의 부분 문자열 검색은 트라이그램 GIN 인덱스
+            # (PostgreSQL 전용이라 마이그레이션 0011 에서 직접 만든다)
+        ]
 
     def __str__(self):
         return self.name
 
+    def update_search_keys(self):
+        """save() 를 거치지 않는 bulk_create 전에는 직접 부른다"""
+        self.search_jamo, self.search_chosung = search_keys(self.name)
+
+    def save(self, *args, **kwargs):
+        self.update_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_jamo', 'search_chosung'}
+        super().save(*args, **kwargs)
+
     @property
     def main_image(self):
         """메인 이미지 (첫 번째 이미지)"""
@@ -64,7 +110,11 @@ class ProductImage(models.Model):
         default=False, 
         verbose_name="메인 이미지 여부"
     )
+    # 지각 해시 (중복 이미지 탐지, marketon.imagehash)
+    ahash = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="aHash")
+    dhash = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="dHash")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
 
     class Meta:
         db_table = 'products_productimage'
@@ -77,10 +127,187 @@ class ProductImage(models.Model):
         return f"{self.product.name} - 이미지 {self.order}"
 
     def save(self, *args, **kwargs):
+        # 새로 올린 파일이면 저장소에 쓰기 전에 축소 디코딩으로 해시 계산
+        if self.image and not getattr(self.image, '_committed', True):
+            self.ahash, self.dhash = hash_file(self.image)
         # 메인 이미지가 변경되면 기존 메인 이미지 해제
         if self.is_main:
             ProductImage.objects.filter(
                 product=self.product, 
                 is_main=True
-            ).exclude(id=self.id).update(is_main=False)
+            ).exclude(id=self.id).update(is_main=False, updated_at=timezone.now())
         super().save(*args, **kwargs)
+
+
+class ArchivedProduct(models.Model):
+    """
+    보관된 상품 (오래 비활성인 상품을 옮겨 두는 콜드 테이블)
+
+    id 는 원래 상품 id 그대로라서 상세 조회가 보관 테이블로 넘어와도 같은
+    주소로 찾을 수 있다.  시간 필드는 원래 값을 보존하므로 auto_now 가 없다.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=200, verbose_name="상품명")
+    description = models.TextField(verbose_name="상품 설명")
+    price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="가격")
+    category = models.CharField(max_length=100, verbose_name="카테고리")
+    stock = models.PositiveIntegerField(default=0, verbose_name="재고")
+    is_active = models.BooleanField(default=False, verbose_name="활성화")
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+', verbose_name="생성자"
+    )
+    created_at = models.DateTimeField(verbose_name="생성일")
+    updated_at = models.DateTimeField(verbose_name="수정일")
+    search_jamo = models.CharField(max_length=1000, blank=True, default='', editable=False)
+    search_chosung = models.CharField(max_length=200, blank=True, default='', editable=False)
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="보관일")
+
+    class Meta:
+        db_table = 'products_archived_product'
+        verbose_name = '보관된 상품'
+        verbose_name_plural = '보관된 상품들'
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def main_image(self):
+        return self.images.first()
+
+    @property
+    def image_count(self):
+        return self.images.count()
+
+
+class ArchivedProductImage(models.Model):
+    """
+    보관된 상품의 이미지 (파일은 그대로 두고 행만 옮긴다)
+    """
+    id = models.BigIntegerField(primary_key=True)
+    product = models.ForeignKey(
+        ArchivedProduct, on_delete=models.CASCADE, related_name='images', verbose_name="상품"
+    )
+    image = models.ImageField(upload_to='products/%Y/%m/%d/', verbose_name="이미지")
+    alt_text = models.CharField(max_length=200, blank=True, verbose_name="대체 텍스트")
+    order = models.PositiveIntegerField(default=0, verbose_name="순서")
+    is_main = models.BooleanField(default=False, verbose_name="메인 이미지 여부")
+    ahash = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="aHash")
+    dhash = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="dHash")
+    created_at = models.DateTimeField(verbose_name="생성일")
+    updated_at = models.DateTimeField(verbose_name="수정일")
+
+    class Meta:
+        db_table = 'products_archived_productimage'
+        verbose_name = '보관된 상품 이미지'
+        verbose_name_plural = '보관된 상품 이미지들'
+        ordering = ['order', 'created_at']
+
+    def __str__(self):
+        return f"{self.product_id} - 이미지 {self.order}"
+
+
+class ProductTombstone(models.Model):
+    """
+    삭제된 상품 기록 (변경 피드가 삭제를 알리기 위한 것)
+
+    상품 행이 없어졌으므로 피드는 이 행으로 삭제를 전달한다.  비활성화된 상품은
+    행이 남아 있어 updated_at 으로 피드에 잡힌다.
+    """
+    product_id = models.BigIntegerField(verbose_name="상품 ID")
+    removed_at = models.DateTimeField(default=timezone.now, verbose_name="삭제일")
+
+    class Meta:
+        db_table = 'products_tombstone'
+        verbose_name = '삭제된 상품 기록'
+        verbose_name_plural = '삭제된 상품 기록들'
+        indexes = [
+            models.Index(fields=['removed_at', 'product_id'], name='products_tombstone_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} ({self.removed_at})"
+
+
+class CatalogSnapshot(models.Model):
+    """
+    카테고리별 판매 중 상품의 미리 압축한 JSON 번들 (snapshots.py 가 만든다)
+
+    파일 이름에 내용 해시가 들어가므로 한 번 배포된 URL 의 내용은 바뀌지 않는다.
+    """
+    category = models.CharField(max_length=100, unique=True, verbose_name="카테고리")
+    path = models.CharField(max_length=255, verbose_name="파일 경로")
+    encodings = models.CharField(max_length=50, blank=True, verbose_name="압축 형식")
+    digest = models.CharField(max_length=64, verbose_name="내용 해시")
+    # 건수, 최근 수정 시각, id 합: 바뀌었으면 다시 만든다
+    signature = models.CharField(max_length=200, verbose_name="변경 감지 값")
+    product_count = models.PositiveIntegerField(default=0, verbose_name="상품 수")
+    size = models.PositiveIntegerField(default=0, verbose_name="크기")
+    # 이 시각 이후의 변경은 변경 피드로 받는다
+    cursor_at = models.DateTimeField(verbose_name="기준 시각")
+    built_at = models.DateTimeField(auto_now=True, verbose_name="생성일")
+
+    class Meta:
+        db_table = 'products_catalog_snapshot'
+        verbose_name = '카탈로그 스냅샷'
+        verbose_name_plural = '카탈로그 스냅샷들'
+        ordering = ['category']
+
+    def __str__(self):
+        return f"{self.category} ({self.digest[:12]})"
+
+
+class RelatedProduct(models.Model):
+    """
+    함께 구매된 상품 (recommendations.py 가 주문 내역으로 계산한 상위 K개)
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, db_constraint=False, related_name='+', verbose_name="상품"
+    )
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, db_constraint=False, related_name='+', verbose_name="관련 상품"
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="순위")
+    # 함께 구매된 주문 수 / sqrt(각 상품의 주문 수 곱)
+    score = models.FloatField(verbose_name="점수")
+    orders = models.PositiveIntegerField(verbose_name="함께 구매된 주문 수")
+
+    class Meta:
+        db_table = 'products_related_product'
+        verbose_name = '함께 구매된 상품'
+        verbose_name_plural = '함께 구매된 상품들'
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='products_related_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.rank})"
+
+
+class ProductStats(models.Model):
+    """
+    상품 조회 / 장바구니 담기 누적 수와 인기 점수
+
+    요청마다 쓰지 않고 counters.py 가 프로세스 메모리에 모은 수를 주기적으로
+    한 번에 더한다 (upsert).
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, db_constraint=False,
+        related_name='stats', verbose_name="상품"
+    )
+    views = models.PositiveBigIntegerField(default=0, verbose_name="조회 수")
+    cart_adds = models.PositiveBigIntegerField(default=0, verbose_name="장바구니 담기 수")
+    # 전방 감쇠 점수 (counters.py): 클수록 최근에 많이 본 상품
+    score = models.FloatField(default=0, verbose_name="인기 점수")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+
+    class Meta:
+        db_table = 'products_product_stats'
+        verbose_name = '상품 통계'
+        verbose_name_plural = '상품 통계들'
+        indexes = [
+            models.Index(fields=['-score'], name='products_stats_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} ({self.score:.2f})"
@@ -0,0 +1,59 @@
+"""
+상품 조회 쿼리 (동기 ViewSet 과 비동기 뷰 공용)
+"""
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from marketon import hangul
+from .filters import ProductFilter
+from .models import Product
+
+
+def name_search(search):
+    """
+    상품명 검색 조건
+
+    초성만 입력하면 ("ㅅㅍ") 초성 키에서, 아니면 자모 키에서 찾으므로 입력 중인
+    글자("샴ㅍ")도 맞는다.  공백은 무시한다.  name__icontains 처럼 이름 어디에
+    있어도 찾는다 ("TV" -> "삼성 TV", "차" -> "녹차").  3글자(자모) 이상이면
+    트라이그램 인덱스를 타고, 더 짧은 키는 PostgreSQL 에서도 스캔이다.
+    """
+    jamo, chosung = hangul.search_keys(search)
+    field, key = ('search_chosung', chosung) if hangul.is_chosung(search) else ('search_jamo', jamo)
+    return Q(**{f'{field}__contains': key})
+
+
+def filter_products(queryset, params, ordering=True):
+    """
+    search / category / is_active 와 ProductFilter(가격, 재고, 정렬 등) 쿼리 파라미터 적용
+
+    상세 / 보관 상품 조회는 ``ordering=False`` 로 ?ordering= 을 무시한다.  한 행이라
+    정렬할 것이 없고, 보관 테이블에는 인기 정렬이 쓰는 stats 관계가 없다.
+    """
+    # 검색 필터
+    search = params.get('search', None)
+    if search:
+        queryset = queryset.filter(name_search(search))
+
+    # 카테고리 필터
+    category = params.get('category', None)
+    if category:
+        queryset = queryset.filter(category=category)
+
+    # 활성화 상태 필터
+    is_active = params.get('is_active', None)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active.lower() == 'true')
+
+    if not ordering and 'ordering' in params:
+        params = params.copy()
+        params.pop('ordering')
+    filterset = ProductFilter(params, queryset=queryset)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    return filterset.qs
+
+
+def category_names():
+    """카테고리 목록 (기본 정렬을 지워야 distinct 가 중복 없이 동작)"""
+    return Product.objects.order_by('category').values_list('category', flat=True).distinct()
@@ -0,0 +1,180 @@
+"""
+"함께 구매한 상품" 추천
+
+주문 x 상품 희소 행렬 B 를 만들고 C = BᵀB 로 상품 x 상품 동시 구매 횟수를 한
+번에 계산한다 (대각선은 각 상품이 들어간 주문 수).  상품마다 점수
+
+    C[i, j] / sqrt(C[i, i] * C[j, j])
+
+가 높은 상위 K개를 RelatedProduct 에 저장하므로 API 는 인덱스 조회 한 번이다.
+
+행렬과 처리한 마지막 주문 id(워터마크)는 RECOMMENDATIONS_MATRIX_PATH 에 npz 로
+남긴다.  refresh() 는 워터마크 이후 주문만으로 증분 행렬을 만들어 더하고, 새
+주문에 들어간 상품의 이웃만 다시 계산한다 (다른 상품의 점수는 분모가 조금씩
+달라지므로 가끔 full=True 로 전체를 다시 계산한다).  파일이 없으면 전체 계산.
+취소된 주문은 처리 시점 기준으로 제외한다.
+"""
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem
+from .models import RelatedProduct
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Refresh:
+    orders: int
+    products: int
+    watermark: int
+
+
+def _load(path):
+    """(행렬, 워터마크). 파일이 없으면 (None, 0)"""
+    try:
+        with np.load(path) as stored:
+            matrix = sparse.csr_matrix(
+                (stored['data'], stored['indices'], stored['indptr']), shape=tuple(stored['shape']),
+            )
+            return matrix, int(stored['watermark'])
+    except FileNotFoundError:
+        return None, 0
+
+
+def _save(path, matrix, watermark):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 같은 디렉터리에 쓰고 교체해야 중간에 멈춰도 이전 파일이 온전하다
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez_compressed(
+                file, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                shape=np.array(matrix.shape), watermark=np.array(watermark),
+            )
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def _order_lines(after_id, until_id):
+    """(주문 id, 상품 id) 배열 두 개, 주문 안의 같은 상품은 한 번"""
+    lines = (
+        OrderItem.objects.filter(order_id__gt=after_id, order_id__lte=until_id)
+        .exclude(order__status=Order.STATUS_CANCELLED)
+        .order_by().values_list('order_id', 'product_id').distinct()
+    )
+    pairs = np.fromiter(
+        (value for pair in lines.iterator(chunk_size=10_000) for value in pair), dtype=np.int64,
+    ).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def cooccurrence(order_ids, product_ids, size):
+    """주문 라인으로 상품 x 상품 동시 구매 행렬 (size x size, 대각선은 주문 수)"""
+    _, rows = np.unique(order_ids, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, product_ids)),
+        shape=(int(rows.max()) + 1 if len(rows) else 0, size),
+    )
+    return (incidence.T @ incidence).tocsr()
+
+
+def _resize(matrix, size):
+    if matrix.shape[0] >= size:
+        return matrix
+    matrix = matrix.tocoo()
+    return sparse.csr_matrix((matrix.data, (matrix.row, matrix.col)), shape=(size, size))
+
+
+def top_neighbors(matrix, product_ids, k, min_orders=1):
+    """product_ids 각각의 상위 k개 ``[(related_id, score, orders), ...]``"""
+    orders = matrix.diagonal().astype(np.float64)
+    neighbors = {}
+    for product_id in map(int, product_ids):
+        start, end = matrix.indptr[product_id], matrix.indptr[product_id + 1]
+        columns = matrix.indices[start:end]
+        counts = matrix.data[start:end]
+        keep = (columns != product_id) & (counts >= min_orders)
+        columns, counts = columns[keep], counts[keep]
+        if not len(columns):
+            neighbors[product_id] = []
+            continue
+        scores = counts / np.sqrt(orders[product_id] * orders[columns])
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        # 점수, 동점이면 함께 구매된 횟수, 그다음 id 순
+        best = best[np.lexsort((columns[best], -counts[best], -scores[best]))]
+        neighbors[product_id] = [
+            (int(columns[i]), float(scores[i]), int(counts[i])) for i in best
+        ]
+    return neighbors
+
+
+def _store(neighbors):
+    with transaction.atomic():
+        RelatedProduct.objects.filter(product_id__in=list(neighbors)).delete()
+        RelatedProduct.objects.bulk_create(
+            (
+                RelatedProduct(product_id=product_id, related_id=related_id, rank=rank,
+                               score=score, orders=orders)
+                for product_id, related in neighbors.items()
+                for rank, (related_id, score, orders) in enumerate(related)
+            ),
+            batch_size=1000,
+        )
+
+
+def _until_id():
+    """처리할 마지막 주문 id (늦게 커밋되는 주문을 건너뛰지 않도록 최근 주문은 다음 차례로)"""
+    lag = timedelta(seconds=settings.RECOMMENDATIONS_LAG_SECONDS)
+    latest = Order.objects.filter(created_at__lt=timezone.now() - lag).order_by('-id').values_list('id', flat=True)
+    return latest.first() or 0
+
+
+def refresh(full=False, chunk=2000):
+    """워터마크 이후 주문을 반영한다 (full=True 거나 저장된 행렬이 없으면 전체 계산)"""
+    path = str(settings.RECOMMENDATIONS_MATRIX_PATH)
+    k = settings.RECOMMENDATIONS_TOP_K
+    matrix, watermark = (None, 0) if full else _load(path)
+    until_id = _until_id()
+    if until_id <= watermark and matrix is not None:
+        return Refresh(0, 0, watermark)
+
+    order_ids, product_ids = _order_lines(watermark, until_id)
+    size = int(product_ids.max()) + 1 if len(product_ids) else 0
+    if matrix is not None:
+        size = max(size, matrix.shape[0])
+    delta = cooccurrence(order_ids, product_ids, size)
+    matrix = delta if matrix is None else _resize(matrix, size) + delta
+
+    rebuild = full or watermark == 0
+    touched = np.flatnonzero(np.diff(matrix.indptr)) if rebuild else np.unique(product_ids)
+    for start in range(0, len(touched), chunk):
+        _store(top_neighbors(matrix, touched[start:start + chunk], k, settings.RECOMMENDATIONS_MIN_ORDERS))
+    if rebuild:
+        # 더 이상 함께 구매된 상품이 없는 상품 (취소된 주문 등)
+        stale = list(
+            set(RelatedProduct.objects.order_by().values_list('product_id', flat=True).distinct()) - set(touched.tolist())
+        )
+        for start in range(0, len(stale), chunk):
+            RelatedProduct.objects.filter(product_id__in=stale[start:start + chunk]).delete()
+
+    # 이웃을 저장한 뒤에 워터마크를 옮긴다 (중간에 실패하면 같은 주문부터 다시)
+    _save(path, matrix, until_id)
+    result = Refresh(len(np.unique(order_ids)), len(touched), until_id)
+    logger.info('Related products: %d orders, %d products refreshed, watermark %d',
+                result.orders, result.products, result.watermark)
+    return result
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Product, ProductImage
+from .models import ArchivedProduct, ArchivedProductImage, Product, ProductImage
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -51,6 +51,21 @@ class ProductSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class ArchivedProductImageSerializer(ProductImageSerializer):
+    """보관된 상품 이미지 시리얼라이저"""
+    class Meta(ProductImageSerializer.Meta):
+        model = ArchivedProductImage
+
+
+class ArchivedProductSerializer(ProductSerializer):
+    """보관된 상품 시리얼라이저 (상세 응답 모양은 ProductSerializer 와 같다)"""
+    images = ArchivedProductImageSerializer(many=True, read_only=True)
+    main_image = ArchivedProductImageSerializer(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        model = ArchivedProduct
+
+
 class ProductCreateSerializer(serializers.ModelSerializer):
     """상품 생성 시리얼라이저"""
     images = ProductImageCreateSerializer(many=True, required=False)
@@ -65,7 +80,8 @@ class ProductCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         images_data = validated_data.pop('images', [])
-        validated_data['created_by'] = self.context['request'].user
+        # 토큰 사용자(TokenUser)는 DB 객체가 아니므로 id로 지정
+        validated_data['created_by_id'] = self.context['request'].user.pk
         
         # 상품 생성
         product = Product.objects.create(**validated_data)
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from apps.orders.signals import order_placed
+from . import live
+from .models import Product, ProductImage, ProductTombstone
+from .suggestions import current_index
+
+# Sent inside the transaction once per bulk_update chunk of a bulk sync
+# (bulk_update sends no post_save).
+# kwargs: changes ({product_id: {field: (old, new)}}), updated_at
+products_bulk_updated = Signal()
+
+# Sent after queryset updates of Product.stock outside this app (cart holds,
+# expired holds), which send no post_save.
+# kwargs: product_ids
+stock_changed = Signal()
+
+LIVE_FIELDS = ('stock', 'price', 'is_active')
+
+
+@receiver(post_delete, sender=Product)
+def record_tombstone(sender, instance, **kwargs):
+    # The change feed tells clients about deleted (and archived) products
+    ProductTombstone.objects.create(product_id=instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def touch_product(sender, instance, raw=False, origin=None, **kwargs):
+    # Image changes move the product into the change feed
+    if raw or getattr(origin, 'model', type(origin)) is Product:
+        # Deleted together with the product
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+def update_suggestions(sender, instance, raw=False, **kwargs):
+    # Other processes pick the change up on their next suggest refresh
+    index = current_index()
+    if raw or index is None:
+        return
+    row = (instance.pk, instance.name, instance.category, instance.is_active)
+    transaction.on_commit(lambda: index.apply(active=[row]))
+
+
+@receiver(post_delete, sender=Product)
+def remove_suggestions(sender, instance, **kwargs):
+    index = current_index()
+    if index is not None:
+        product_id = instance.pk
+        transaction.on_commit(lambda: index.apply(removed=[product_id]))
+
+
+@receiver(post_save, sender=Product)
+def push_live_changes(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if any(instance.loaded_value(field) != getattr(instance, field) for field in LIVE_FIELDS):
+        live.notify([instance.pk])
+
+
+@receiver(products_bulk_updated)
+def push_live_bulk_changes(sender, changes, **kwargs):
+    live.notify(product_id for product_id, fields in changes.items() if fields.keys() & set(LIVE_FIELDS))
+
+
+@receiver(order_placed)
+def push_live_order_stock(sender, items, **kwargs):
+    live.notify(item.product_id for item in items)
+
+
+@receiver(stock_changed)
+def push_live_stock(sender, product_ids, **kwargs):
+    live.notify(product_ids)
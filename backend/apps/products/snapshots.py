@@ -0,0 +1,156 @@
+"""
+카탈로그 스냅샷 번들
+
+앱 콜드 스타트마다 목록/카테고리 API 를 부르는 대신, 카테고리별 판매 중 상품을
+JSON 하나로 미리 만들어 gzip / brotli 압축본과 함께 미디어 파일로 배포한다.
+파일 이름은 내용 해시라서 CDN 과 브라우저가 무기한 캐시해도 된다.
+
+- 카테고리마다 (건수, 최근 updated_at, id 합)을 비교해 바뀐 카테고리만 다시 만든다.
+  이미지 변경은 상품 updated_at 을 갱신하므로 함께 감지된다.
+- 번들의 상품 행은 변경 피드와 같은 모양이다.  클라이언트는 매니페스트의
+  cursor 부터 ``?updated_since=`` 로 이후 변경을 받으면 된다.
+- 교체된 번들 파일은 CATALOG_SNAPSHOT_KEEP_SECONDS 뒤에 지운다 (이전
+  매니페스트를 받은 클라이언트가 아직 내려받는 중일 수 있다).
+
+nginx 에서는 ``gzip_static on; brotli_static on;`` 으로 압축본을 그대로 보낸다.
+"""
+import gzip
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from marketon.renderers import ORJSONRenderer
+from .conditional import make_etag
+from .feed import FIELDS, compact_row, encode_cursor, image_urls
+from .models import CatalogSnapshot, Product
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def category_signatures():
+    """카테고리별 변경 감지 값 (집계 쿼리 1회)"""
+    rows = (
+        Product.objects.filter(is_active=True).order_by().values('category')
+        .annotate(count=Count('id'), updated=Max('updated_at'), ids=Sum('id'))
+    )
+    return {
+        row['category']: f"{row['count']}:{row['updated'].isoformat()}:{row['ids']}"
+        for row in rows
+    }
+
+
+def file_names(path, encodings):
+    """번들 파일과 압축본의 저장소 이름"""
+    return [path] + [path + SUFFIXES[encoding] for encoding in encodings.split(',') if encoding]
+
+
+def render_bundle(category, cursor_at):
+    rows = list(Product.objects.filter(is_active=True, category=category).order_by('id').values(*FIELDS))
+    images = image_urls([row['id'] for row in rows])
+    body = ORJSONRenderer().render({
+        'category': category,
+        'cursor': encode_cursor(cursor_at, 0),
+        'products': [compact_row(row, images) for row in rows],
+    })
+    return body, len(rows)
+
+
+def _write(name, content):
+    # 이름이 내용 해시이므로 이미 있으면 같은 파일
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+
+
+def publish(category, signature, cursor_at):
+    body, count = render_bundle(category, cursor_at)
+    digest = hashlib.sha256(body).hexdigest()
+    path = f'{settings.CATALOG_SNAPSHOT_DIR}/catalog-{digest[:20]}.json'
+    encoded = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=11)
+    # 압축본을 먼저 써 두어야 본 파일이 보일 때 함께 받을 수 있다
+    for encoding, content in encoded.items():
+        _write(path + SUFFIXES[encoding], content)
+    _write(path, body)
+    return CatalogSnapshot.objects.update_or_create(category=category, defaults={
+        'path': path,
+        'encodings': ','.join(encoded),
+        'digest': digest,
+        'signature': signature,
+        'product_count': count,
+        'size': len(body),
+        'cursor_at': cursor_at,
+    })[0]
+
+
+def _retire(names):
+    from .jobs import delete_snapshot_files
+
+    if names:
+        keep = timedelta(seconds=settings.CATALOG_SNAPSHOT_KEEP_SECONDS)
+        delete_snapshot_files.schedule(timezone.now() + keep, names)
+
+
+def build(force=False):
+    """바뀐 카테고리의 번들을 다시 만들고 ``(category, 'built' | 'unchanged' | 'removed')`` 를 돌려준다"""
+    # 집계보다 먼저 정해야 번들에 빠진 변경을 피드가 다시 보낸다
+    cursor_at = timezone.now() - timedelta(seconds=settings.PRODUCT_FEED_LAG_SECONDS)
+    signatures = category_signatures()
+    current = {snapshot.category: snapshot for snapshot in CatalogSnapshot.objects.all()}
+    results = []
+    for category, signature in sorted(signatures.items()):
+        previous = current.get(category)
+        if previous is not None and previous.signature == signature and not force:
+            results.append((category, 'unchanged'))
+            continue
+        snapshot = publish(category, signature, cursor_at)
+        if previous is not None and previous.path != snapshot.path:
+            _retire(file_names(previous.path, previous.encodings))
+        results.append((category, 'built'))
+    for category, snapshot in current.items():
+        if category not in signatures:
+            snapshot.delete()
+            _retire(file_names(snapshot.path, snapshot.encodings))
+            results.append((category, 'removed'))
+    return results
+
+
+def manifest(request):
+    """현재 번들 목록과 이후 변경을 받을 피드 커서"""
+    snapshots = list(CatalogSnapshot.objects.all())
+    bundles = []
+    for snapshot in snapshots:
+        url = request.build_absolute_uri(default_storage.url(snapshot.path))
+        bundles.append({
+            'category': snapshot.category,
+            'url': url,
+            'encodings': {
+                encoding: url + SUFFIXES[encoding] for encoding in snapshot.encodings.split(',') if encoding
+            },
+            'digest': snapshot.digest,
+            'products': snapshot.product_count,
+            'size': snapshot.size,
+            'built_at': snapshot.built_at,
+        })
+    cursor_at = min((snapshot.cursor_at for snapshot in snapshots), default=None)
+    return {
+        'cursor': encode_cursor(cursor_at, 0) if cursor_at else '',
+        'bundles': bundles,
+    }
+
+
+def manifest_validators(request):
+    """매니페스트의 (etag, last_modified): 번들이 바뀔 때만 달라진다"""
+    rows = list(CatalogSnapshot.objects.values_list('digest', 'built_at'))
+    digests = sorted(digest for digest, _ in rows)
+    return make_etag(request, *digests), max((built_at for _, built_at in rows), default=None)
@@ -0,0 +1,294 @@
+"""
+검색어 자동완성 (상품명 / 카테고리 접두어 제안)
+
+입력할 때마다 name__icontains 로 테이블을 훑지 않도록 프로세스마다 메모리에
+접두어 인덱스를 둔다.  정규화한 (키, 상품 id) 를 정렬한 리스트라서 이분 탐색
+두 번으로 접두어가 같은 범위를 찾고, 그 안에서 인기도 상위 N개를 고른다.
+범위가 넓은 짧은 접두어는 범위를 다 보지 않고 인기순 목록을 앞에서부터 훑는다.
+결과는 접두어별로 캐시하고, 상품이 바뀌면 그 상품에 걸리는 접두어만 지운다.
+상품명 전체와 각 단어에서 시작하는 부분을 모두 키로 넣으므로 "노트"는
+"노트북 파우치"와 "게이밍 노트북" 모두에 걸린다.  키는 상품 검색과 같은 자모
+분해 / 초성 키(marketon.hangul, 공백 제외)라서 "노ㅌ", "ㄴㅌㅂ" 도 맞는다.
+
+- 워커 시작 시 (asgi.py / wsgi.py 의 warm_index) 판매 중 상품을 쿼리 한 번으로
+  스트리밍해 만든다.  인기도는 최근 PRODUCT_SUGGEST_POPULARITY_DAYS 일 판매 수량.
+- 이 프로세스의 Product 저장/삭제는 신호로 커밋 직후 반영한다.
+- 다른 워커의 변경과 신호가 없는 bulk_update(일괄 동기화)는
+  PRODUCT_SUGGEST_REFRESH_SECONDS 마다 updated_at 인덱스와 삭제 기록으로 가져온다.
+- 인기도는 PRODUCT_SUGGEST_REBUILD_SECONDS 마다 전체를 다시 만들 때 갱신된다.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.dashboard.models import DailyProductSales
+from marketon import hangul
+from .models import Product, ProductTombstone
+
+logger = logging.getLogger(__name__)
+
+# 결과 캐시 크기
+CACHE_SIZE = 2048
+# 접두어 범위가 이보다 넓으면 인기순 목록을 (최대 SCAN_LIMIT * 4 개) 훑는다
+SCAN_LIMIT = 256
+# 어떤 키보다 뒤에 오는 접미 문자 (접두어 범위의 끝)
+LAST_CHAR = '\U0010ffff'
+
+
+def query_key(query):
+    """초성만 입력했으면 초성 키, 아니면 자모 키"""
+    jamo, chosung = hangul.search_keys(query)
+    return chosung if hangul.is_chosung(query) else jamo
+
+
+def name_keys(name):
+    """상품명 전체와 각 단어에서 시작하는 부분의 자모 / 초성 키"""
+    words = hangul.normalize(name).split(' ')
+    return {key for i in range(len(words)) if words[i] for key in hangul.search_keys(' '.join(words[i:]))}
+
+
+def _prefix_range(keys, prefix):
+    return bisect_left(keys, (prefix,)), bisect_left(keys, (prefix + LAST_CHAR,))
+
+
+def _matches(name, prefix):
+    return any(key.startswith(prefix) for key in name_keys(name))
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._products = {}        # id -> (name, category, popularity)
+        self._keys = []            # 정렬된 [(key, product_id)]
+        self._ranking = []         # 인기순 [(-popularity, -product_id)]
+        self._categories = {}      # category -> [상품 수, 인기도 합]
+        self._category_keys = []   # 정렬된 [(key, category)]
+        self._cache = {}           # (prefix, limit) -> 결과
+        self._changed = set()      # 캐시에서 지울 키 (apply 중 바뀐 상품의 키)
+        self.synced_at = None
+        self.built_at = self.refreshed_at = 0.0
+
+    # 쓰기 (self._lock 안에서)
+
+    def _add_category(self, category, popularity):
+        entry = self._categories.get(category)
+        if entry is None:
+            entry = self._categories[category] = [0, 0]
+            for key in set(hangul.search_keys(category)):
+                insort(self._category_keys, (key, category))
+        entry[0] += 1
+        entry[1] += popularity
+        self._changed.update(hangul.search_keys(category))
+
+    def _remove_category(self, category, popularity):
+        entry = self._categories[category]
+        entry[0] -= 1
+        entry[1] -= popularity
+        self._changed.update(hangul.search_keys(category))
+        if not entry[0]:
+            del self._categories[category]
+            for key in set(hangul.search_keys(category)):
+                self._category_keys.remove((key, category))
+
+    def _discard(self, product_id):
+        current = self._products.pop(product_id, None)
+        if current is None:
+            return None
+        name, category, popularity = current
+        i = bisect_left(self._ranking, (-popularity, -product_id))
+        del self._ranking[i]
+        for key in name_keys(name):
+            self._changed.add(key)
+            i = bisect_left(self._keys, (key, product_id))
+            if i < len(self._keys) and self._keys[i] == (key, product_id):
+                del self._keys[i]
+        self._remove_category(category, popularity)
+        return popularity
+
+    def _put(self, product_id, name, category, popularity=None):
+        previous = self._discard(product_id)
+        if popularity is None:
+            popularity = previous or 0
+        self._products[product_id] = (name, category, popularity)
+        insort(self._ranking, (-popularity, -product_id))
+        for key in name_keys(name):
+            self._changed.add(key)
+            insort(self._keys, (key, product_id))
+        self._add_category(category, popularity)
+
+    def apply(self, active=(), removed=()):
+        """``active``: [(id, name, category, is_active)], ``removed``: [id] (인기도는 유지)"""
+        with self._lock:
+            for product_id, name, category, is_active in active:
+                if is_active:
+                    self._put(product_id, name, category)
+                else:
+                    self._discard(product_id)
+            for product_id in removed:
+                self._discard(product_id)
+            changed, self._changed = self._changed, set()
+            stale = [
+                entry for entry in self._cache
+                if any(key.startswith(entry[0]) for key in changed)
+            ]
+            for entry in stale:
+                del self._cache[entry]
+
+    # 전체 / 증분 갱신
+
+    def build(self):
+        """판매 중 상품 전체로 다시 만든다 (쿼리 1회, 스트리밍)"""
+        synced_at = timezone.now() - timedelta(seconds=settings.PRODUCT_FEED_LAG_SECONDS)
+        since = timezone.localdate() - timedelta(days=settings.PRODUCT_SUGGEST_POPULARITY_DAYS)
+        sold = (
+            DailyProductSales.objects.filter(product=OuterRef('pk'), date__gte=since)
+            .order_by().values('product').annotate(total=Sum('units_sold')).values('total')
+        )
+        rows = (
+            Product.objects.filter(is_active=True).order_by()
+            .annotate(popularity=Coalesce(Subquery(sold), 0))
+            .values_list('id', 'name', 'category', 'popularity')
+        )
+        index = SuggestIndex()
+        for product_id, name, category, popularity in rows.iterator(chunk_size=5000):
+            index._products[product_id] = (name, category, popularity)
+            index._ranking.append((-popularity, -product_id))
+            index._keys.extend((key, product_id) for key in name_keys(name))
+            index._add_category(category, popularity)
+        index._keys.sort()
+        index._ranking.sort()
+        index._changed.clear()
+
+        with self._lock:
+            self._products, self._keys, self._ranking = index._products, index._keys, index._ranking
+            self._categories, self._category_keys = index._categories, index._category_keys
+            self._cache.clear()
+            self.synced_at = synced_at
+            self.built_at = self.refreshed_at = time.monotonic()
+        logger.info('Suggest index built: %d products, %d keys', len(self._products), len(self._keys))
+
+    def refresh(self):
+        """다른 프로세스의 변경을 가져온다 (PRODUCT_SUGGEST_REFRESH_SECONDS 에 한 번)"""
+        now = time.monotonic()
+        if now - self.refreshed_at < settings.PRODUCT_SUGGEST_REFRESH_SECONDS:
+            return
+        # 다른 스레드가 갱신 중이면 지금 인덱스로 답한다
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            if now - self.built_at >= settings.PRODUCT_SUGGEST_REBUILD_SECONDS:
+                self.build()
+                return
+            synced_at = timezone.now() - timedelta(seconds=settings.PRODUCT_FEED_LAG_SECONDS)
+            changed = list(
+                Product.objects.filter(updated_at__gte=self.synced_at).order_by()
+                .values_list('id', 'name', 'category', 'is_active')
+            )
+            removed = list(
+                ProductTombstone.objects.filter(removed_at__gte=self.synced_at).values_list('product_id', flat=True)
+            )
+            self.apply(changed, removed)
+            self.synced_at = synced_at
+            self.refreshed_at = now
+        finally:
+            self._refreshing.release()
+
+    # 조회
+
+    def _search(self, prefix, limit):
+        start, end = _prefix_range(self._keys, prefix)
+        best = None
+        if end - start > SCAN_LIMIT:
+            # 많이 걸리는 접두어는 보통 인기순으로 몇 개만 보면 찬다
+            best = []
+            for _, negative_id in islice(self._ranking, SCAN_LIMIT * 4):
+                if _matches(self._products[-negative_id][0], prefix):
+                    best.append(-negative_id)
+                    if len(best) == limit:
+                        break
+            else:
+                best = None
+        if best is None:
+            product_ids = {product_id for _, product_id in self._keys[start:end]}
+            # 인기도, 같으면 최근 상품 먼저 (_ranking 과 같은 순서)
+            best = heapq.nlargest(limit, product_ids, key=lambda pk: (self._products[pk][2], pk))
+        start, end = _prefix_range(self._category_keys, prefix)
+        categories = heapq.nlargest(
+            limit, {category for _, category in self._category_keys[start:end]},
+            key=lambda category: tuple(self._categories[category]),
+        )
+        return {
+            'products': [
+                {'id': pk, 'name': self._products[pk][0], 'category': self._products[pk][1]} for pk in best
+            ],
+            'categories': [
+                {'name': category, 'products': self._categories[category][0]} for category in categories
+            ],
+        }
+
+    def suggest(self, query, limit):
+        """접두어가 ``query`` 인 상품과 카테고리, 각각 인기도 상위 ``limit`` 개"""
+        prefix = query_key(query)
+        if not prefix:
+            return {'products': [], 'categories': []}
+        self.refresh()
+        with self._lock:
+            result = self._cache.get((prefix, limit))
+            if result is None:
+                if len(self._cache) >= CACHE_SIZE:
+                    self._cache.clear()
+                result = self._cache[prefix, limit] = self._search(prefix, limit)
+        return result
+
+    def __len__(self):
+        return len(self._products)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SuggestIndex()
+                index.build()
+                _index = index
+    return _index
+
+
+def current_index():
+    """이미 만든 인덱스 (없으면 None, 신호에서 새로 만들지 않도록)"""
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def warm_index():
+    """워커 시작 시 백그라운드 스레드에서 인덱스를 만든다 (첫 요청은 완성될 때까지 기다린다)"""
+    def run():
+        try:
+            get_index()
+        except Exception:
+            logger.exception('Suggest index warm-up failed')
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name='suggest-index-warmup', daemon=True).start()
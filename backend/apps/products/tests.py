@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import asyncio
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from marketon.admin import EstimatedCountPaginator
+from apps.dashboard.models import DailyProductSales
+from apps.jobs.models import Job
+from apps.users.serializers import token_response
+from . import counters, feed, live, snapshots, suggestions
+from .archive import archive_batch, restore
+from .jobs import delete_snapshot_files
+from .models import (
+    ArchivedProduct, ArchivedProductImage, CatalogSnapshot, Product, ProductImage, ProductStats, ProductTombstone,
+    RelatedProduct,
+)
+from .queries import filter_products
+
+User = get_user_model()
+
+
+class AdminChangelistQueryTests(TestCase):
+    """
+    관리자 목록 페이지의 쿼리 수는 행 수와 무관해야 한다 (행마다 FK 조회 금지)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+        cls.add_products(5)
+
+    @classmethod
+    def add_products(cls, count):
+        start = Product.objects.count()
+        for n in range(start, start + count):
+            seller = User.objects.create(username=f'seller{n}', email=f'seller{n}@example.com')
+            product = Product.objects.create(
+                name=f'상품 {n}', description='설명', price=1000, category=f'카테고리{n % 3}',
+                stock=10, created_by=seller,
+            )
+            ProductImage.objects.bulk_create([
+                ProductImage(product=product, image=f'products/test/{n}_{i}.jpg', order=i, is_main=i == 0)
+                for i in range(2)
+            ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def count_queries(self, url):
+        # 첫 요청은 ContentType 등 프로세스 캐시를 채우므로 제외
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url):
+        few = self.count_queries(url)
+        self.add_products(20)
+        self.assertEqual(self.count_queries(url), few)
+        return few
+
+    def test_product_changelist(self):
+        queries = self.assertConstantQueries(reverse('admin:products_product_changelist'))
+        # 세션, 사용자, 건수, 목록, 필터 선택지 정도
+        self.assertLessEqual(queries, 8)
+
+    def test_product_changelist_search(self):
+        self.assertConstantQueries(reverse('admin:products_product_changelist') + '?q=상품')
+
+    def test_productimage_changelist(self):
+        queries = self.assertConstantQueries(reverse('admin:products_productimage_changelist'))
+        self.assertLessEqual(queries, 8)
+
+    def test_product_change_form(self):
+        # 생성자는 자동완성 위젯이라 전체 사용자 목록을 읽지 않는다
+        product = Product.objects.first()
+        self.assertConstantQueries(reverse('admin:products_product_change', args=[product.pk]))
+
+    def test_created_by_autocomplete(self):
+        url = reverse('admin:autocomplete') + '?app_label=products&model_name=product&field_name=created_by&term=seller'
+        self.assertConstantQueries(url)
+
+    def test_full_result_count_is_skipped(self):
+        response = self.client.get(reverse('admin:products_product_changelist') + '?category=카테고리0')
+        self.assertEqual(response.context['cl'].full_result_count, None)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def test_exact_count_outside_postgresql(self):
+        user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        Product.objects.bulk_create([
+            Product(name=f'상품 {n}', description='', price=1, category='c', created_by=user) for n in range(3)
+        ])
+        paginator = EstimatedCountPaginator(Product.objects.all(), 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+
+    @skipUnless(connection.vendor == 'postgresql', 'EXPLAIN 출력 형식이 PostgreSQL 기준')
+    def test_estimate_on_postgresql(self):
+        user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        Product.objects.bulk_create([
+            Product(name=f'상품 {n}', description='', price=1, category='c', created_by=user) for n in range(50)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE products_product')
+        paginator = EstimatedCountPaginator(Product.objects.all(), 20)
+        # 한도를 낮춰 항상 실행 계획의 추정치를 쓰게 한다
+        paginator.exact_count_limit = 0
+        self.assertEqual(paginator.count, 50)
+        self.assertEqual(paginator.num_pages, 3)
+
+
+class ProductFilterTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'other-password')
+        rows = [
+            # (이름, 가격, 재고, 카테고리, 생성자)
+            ('가', 1000, 5, '도서', cls.seller),
+            ('나', 3000, 0, '도서', cls.seller),
+            ('다', 3000, 2, '가전', cls.other),
+            ('라', 5000, 1, '의류', cls.other),
+        ]
+        cls.products = {
+            name: Product.objects.create(
+                name=name, description='', price=price, stock=stock, category=category, created_by=user,
+            )
+            for name, price, stock, category, user in rows
+        }
+
+    def setUp(self):
+        self.client.force_authenticate(self.seller)
+
+    def names(self, query):
+        response = self.client.get(reverse('products:product-list') + query)
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.json()]
+
+    def test_price_range(self):
+        self.assertEqual(sorted(self.names('?min_price=2000&max_price=4000')), ['나', '다'])
+
+    def test_in_stock(self):
+        self.assertEqual(sorted(self.names('?in_stock=true')), ['가', '다', '라'])
+        self.assertEqual(self.names('?in_stock=false'), ['나'])
+
+    def test_categories(self):
+        self.assertEqual(sorted(self.names('?categories=도서,가전')), ['가', '나', '다'])
+
+    def test_created_by(self):
+        self.assertEqual(sorted(self.names(f'?created_by={self.other.pk}')), ['다', '라'])
+
+    def test_ordering_breaks_ties_by_id(self):
+        self.assertEqual(self.names('?ordering=price'), ['가', '나', '다', '라'])
+        self.assertEqual(self.names('?ordering=-price'), ['라', '다', '나', '가'])
+        self.assertEqual(self.names('?ordering=name'), ['가', '나', '다', '라'])
+
+    def test_invalid_values(self):
+        for query in ('?min_price=abc', '?ordering=stock', '?created_by=x'):
+            response = self.client.get(reverse('products:product-list') + query)
+            self.assertEqual(response.status_code, 400, query)
+
+
+class ProductSearchTests(TestCase):
+    """?search= 는 이름 어디에 있어도 찾고, 초성과 입력 중인 글자도 맞는다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        for name in ('삼성 TV', '샴푸', '천연 샴푸', '녹차', '노트북 파우치'):
+            Product.objects.create(name=name, description='', price=1000, stock=1, category='c', created_by=cls.user)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def names(self, search):
+        response = self.client.get(reverse('products:product-list'), {'search': search})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['name'] for row in response.json())
+
+    def test_short_latin(self):
+        self.assertEqual(self.names('TV'), ['삼성 TV'])
+        self.assertEqual(self.names('tv'), ['삼성 TV'])
+
+    def test_single_syllable(self):
+        self.assertEqual(self.names('차'), ['녹차'])
+
+    def test_chosung(self):
+        self.assertEqual(self.names('ㅅㅍ'), ['샴푸', '천연 샴푸'])
+        self.assertEqual(self.names('ㄴㅌㅂ'), ['노트북 파우치'])
+
+    def test_partial_syllable_and_spaces(self):
+        self.assertEqual(self.names('샴ㅍ'), ['샴푸', '천연 샴푸'])
+        self.assertEqual(self.names('노트북파우치'), ['노트북 파우치'])
+
+
+class ProductConditionalGetTests(TestCase):
+    """재고가 queryset.update() 로 바뀌어도 ETag 가 바뀌어야 한다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        cls.product = Product.objects.create(
+            name='상품', description='', price=1000, stock=5, category='도서', created_by=cls.user,
+        )
+
+    def setUp(self):
+        counters.reset_counters()
+        self.addCleanup(counters.reset_counters)
+        self.client.force_authenticate(self.user)
+
+    def test_order_changes_detail_and_list_etag(self):
+        detail = reverse('products:product-detail', args=[self.product.pk])
+        list_url = reverse('products:product-list')
+        detail_etag = self.client.get(detail)['ETag']
+        list_etag = self.client.get(list_url)['ETag']
+        response = self.client.post(
+            reverse('orders:order_create'), {'items': [{'product_id': self.product.pk, 'quantity': 2}]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['stock'], 3)
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_cart_hold_changes_detail_etag(self):
+        detail = reverse('products:product-detail', args=[self.product.pk])
+        etag = self.client.get(detail)['ETag']
+        response = self.client.post(
+            reverse('carts:cart_add'), {'product_id': self.product.pk, 'quantity': 1}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(detail, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_pk_is_not_found(self):
+        for pk in ('abc', '0', str(2 ** 64)):
+            response = self.client.get(f'/api/products/{pk}/')
+            self.assertEqual(response.status_code, 404, pk)
+
+
+class RelatedProductTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.product, cls.other, cls.inactive = Product.objects.bulk_create([
+            Product(name=name, description='', price=1000, stock=5, category='도서',
+                    is_active=is_active, created_by=cls.user)
+            for name, is_active in (('가', True), ('나', True), ('다', False))
+        ])
+        RelatedProduct.objects.bulk_create([
+            RelatedProduct(product=cls.product, related=cls.other, rank=1, score=0.5, orders=3),
+            RelatedProduct(product=cls.product, related=cls.inactive, rank=2, score=0.25, orders=1),
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_related(self):
+        response = self.client.get(reverse('products:product-related', args=[self.product.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()], [self.other.pk])
+        response = self.client.get(reverse('products:product-related', args=[self.other.pk]))
+        self.assertEqual(response.json(), [])
+
+    def test_unknown_product_is_not_found(self):
+        for pk in ('abc', str(self.inactive.pk + 100)):
+            response = self.client.get(f'/api/products/{pk}/related/')
+            self.assertEqual(response.status_code, 404, pk)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN 출력 형식이 PostgreSQL 기준')
+class ProductFilterIndexTests(TestCase):
+    """
+    자주 쓰는 필터 조합이 복합 인덱스를 타는지 실행 계획으로 확인한다.
+    테스트 DB 는 작아서 순차 스캔이 더 싸게 나오므로 enable_seqscan 을 끈다.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        Product.objects.bulk_create([
+            Product(
+                name=f'상품 {n}', description='', price=n * 100, stock=n % 4,
+                category=f'카테고리{n % 10}', is_active=n % 7 != 0, created_by=user,
+            )
+            for n in range(2000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE products_product')
+
+    def assertUsesIndex(self, queryset, index):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index, plan)
+
+    def filtered(self, **params):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        return filter_products(Product.objects.all(), query)
+
+    def test_category_price_range(self):
+        queryset = self.filtered(category='카테고리3', is_active='true', min_price='1000', max_price='5000')
+        self.assertUsesIndex(queryset, 'products_cat_active_price_idx')
+
+    def test_price_ordering(self):
+        queryset = self.filtered(is_active='true', ordering='price')
+        self.assertUsesIndex(queryset, 'products_active_price_idx')
+
+    def test_seller_listing(self):
+        queryset = self.filtered(created_by=str(Product.objects.values_list('created_by', flat=True)[0]))
+        self.assertUsesIndex(queryset, 'products_creator_created_idx')
+
+
+class ProductPopularityTests(TestCase):
+    """조회 수는 메모리에 모였다가 flush 때 upsert 되고, 인기순 정렬과 인기 상품에 쓰인다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.products = {
+            name: Product.objects.create(
+                name=name, description='', price=1000, stock=5, category=category, created_by=cls.seller,
+            )
+            for name, category in (('가', '도서'), ('나', '도서'), ('다', '가전'))
+        }
+
+    def setUp(self):
+        counters.reset_counters()
+        self.addCleanup(counters.reset_counters)
+        self.client.force_authenticate(self.seller)
+
+    def view(self, name, times=1):
+        for _ in range(times):
+            response = self.client.get(reverse('products:product-detail', args=[self.products[name].pk]))
+            self.assertEqual(response.status_code, 200)
+
+    def names(self, query):
+        response = self.client.get(reverse('products:product-list') + query)
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.json()]
+
+    def test_views_are_written_on_flush(self):
+        self.view('가', 3)
+        self.assertFalse(ProductStats.objects.exists())
+        self.assertEqual(counters.flush(), 1)
+        self.view('가')
+        counters.record(self.products['가'].pk, counters.CART_ADDS, 2)
+        counters.flush()
+        stats = ProductStats.objects.get(product=self.products['가'])
+        self.assertEqual((stats.views, stats.cart_adds), (4, 2))
+        self.assertGreater(stats.score, 0)
+
+    def test_popular_ordering(self):
+        self.view('나', 2)
+        self.view('다', 1)
+        counters.flush()
+        # 통계가 없는 상품은 어느 방향이든 맨 뒤
+        self.assertEqual(self.names('?ordering=popular'), ['나', '다', '가'])
+        self.assertEqual(self.names('?ordering=-popular'), ['다', '나', '가'])
+
+    def test_popular_list_etag_follows_stats(self):
+        url = reverse('products:product-list') + '?ordering=popular'
+        etag = self.client.get(url)['ETag']
+        self.view('다')
+        counters.flush()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_trending(self):
+        self.view('가')
+        counters.record(self.products['다'].pk, counters.CART_ADDS)
+        counters.flush()
+        response = self.client.get(reverse('products:product-trending'))
+        self.assertEqual([row['name'] for row in response.json()], ['다', '가'])
+        response = self.client.get(reverse('products:product-trending') + '?category=도서')
+        self.assertEqual([row['name'] for row in response.json()], ['가'])
+
+    def test_detail_ignores_popular_ordering(self):
+        # 보관 테이블에는 stats 관계가 없다: 상세 조회는 ?ordering= 을 쓰지 않는다
+        archived = self.products['나']
+        Product.objects.filter(pk=archived.pk).update(is_active=False)
+        archive_batch(timezone.now() + timedelta(days=1), batch_size=10)
+        # 비동기 뷰는 DRF 인증을 거치지 않는다
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_response(self.seller)['access']}")
+        for pk in (self.products['가'].pk, archived.pk):
+            for url in (reverse('products:product-detail', args=[pk]),
+                        reverse('products_async:product_detail', args=[pk])):
+                with self.subTest(url=url):
+                    response = self.client.get(url + '?ordering=popular')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()['id'], pk)
+
+
+class ProductAsyncParityTests(TestCase):
+    """/api/v2/products/ 는 동기 API 와 같은 JSON 을 돌려준다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.products = [
+            Product.objects.create(
+                name=name, description='설명', price=price, stock=stock, category=category, created_by=cls.seller,
+            )
+            for name, price, stock, category in [
+                ('가방', 15000, 3, '잡화'), ('가위', 2500, 0, '문구'), ('노트', 1200.5, 7, '문구'),
+            ]
+        ]
+        pictured = cls.products[0]
+        ProductImage.objects.bulk_create([
+            ProductImage(product=pictured, image=f'products/test/bag_{i}.jpg', alt_text=f'사진 {i}',
+                         order=i, is_main=i == 0)
+            for i in range(2)
+        ])
+
+    def setUp(self):
+        # 비동기 뷰는 DRF 인증을 거치지 않는다
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_response(self.seller)['access']}")
+
+    def assert_same(self, sync_url, async_url, query=None):
+        expected = self.client.get(sync_url, query)
+        response = self.client.get(async_url, query)
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    def test_list_and_filters(self):
+        queries = [
+            None,
+            {'min_price': '2000', 'ordering': 'price'},
+            {'in_stock': 'true', 'ordering': '-price'},
+            {'category': '문구'},
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                rows = self.assert_same(
+                    reverse('products:product-list'), reverse('products_async:product_list'), query,
+                )
+                self.assertTrue(rows)
+
+    def test_detail(self):
+        for product in self.products:
+            with self.subTest(product=product.name):
+                self.assert_same(
+                    reverse('products:product-detail', args=[product.pk]),
+                    reverse('products_async:product_detail', args=[product.pk]),
+                )
+        row = self.client.get(reverse('products_async:product_detail', args=[self.products[0].pk])).json()
+        self.assertEqual(row['image_count'], 2)
+        self.assertEqual(row['main_image'], row['images'][0])
+
+    def test_search_and_categories(self):
+        rows = self.assert_same(
+            reverse('products:product-search'), reverse('products_async:product_search'), {'search': '가'},
+        )
+        self.assertEqual({row['name'] for row in rows}, {'가방', '가위'})
+        self.assert_same(reverse('products:product-categories'), reverse('products_async:product_categories'))
+
+
+class ProductBulkSyncTests(TestCase):
+    """일괄 동기화는 행마다 결과를 돌려주고, 바뀐 행만 (updated_at 과 함께) 쓴다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+        cls.products = [
+            Product.objects.create(
+                name=f'상품 {n}', description='', price=1000, stock=5, category='도서', created_by=cls.admin,
+            )
+            for n in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def sync(self, rows):
+        return self.client.post(reverse('products:product-bulk-sync'), rows, format='json')
+
+    def results(self, rows):
+        response = self.sync(rows)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data, [(row['id'], row['status']) for row in data['results']]
+
+    def test_row_outcomes(self):
+        a, b, c = self.products
+        before = Product.objects.get(pk=b.pk).updated_at
+        data, results = self.results([
+            {'id': a.pk, 'stock': 7, 'price': '1000'},
+            {'id': b.pk, 'price': '1000.00', 'is_active': True},
+            {'id': 999_999, 'stock': 1},
+            {'id': c.pk, 'stock': -1},
+            {'id': 'abc', 'stock': 1},
+            {'id': 999_998},
+        ])
+        self.assertEqual(results, [
+            (a.pk, 'updated'), (b.pk, 'unchanged'), (999_999, 'not_found'),
+            (c.pk, 'invalid'), (None, 'invalid'), (999_998, 'invalid'),
+        ])
+        self.assertEqual(
+            [data[key] for key in ('updated', 'unchanged', 'not_found', 'invalid')], [1, 1, 1, 3],
+        )
+        self.assertEqual(data['results'][0]['fields'], ['stock'])
+        self.assertIn('stock', data['results'][3]['errors'])
+        self.assertIn('id', data['results'][4]['errors'])
+        self.assertIn('non_field_errors', data['results'][5]['errors'])
+
+        self.assertEqual(Product.objects.get(pk=a.pk).stock, 7)
+        # 값이 같은 행은 쓰지 않는다 (ETag 유지)
+        self.assertEqual(Product.objects.get(pk=b.pk).updated_at, before)
+        self.assertEqual(Product.objects.get(pk=c.pk).stock, 5)
+
+    def test_duplicate_ids(self):
+        a, b, _ = self.products
+        _, results = self.results([
+            {'id': a.pk, 'stock': 7},
+            {'id': a.pk, 'stock': 8},
+            # 첫 행이 잘못되어도 중복 행으로 대신하지 않는다
+            {'id': b.pk, 'stock': 'many'},
+            {'id': str(b.pk), 'stock': 9},
+        ])
+        self.assertEqual(results, [(a.pk, 'updated'), (a.pk, 'invalid'), (b.pk, 'invalid'), (b.pk, 'invalid')])
+        self.assertEqual(
+            list(Product.objects.filter(pk__in=[a.pk, b.pk]).order_by('pk').values_list('stock', flat=True)),
+            [7, 5],
+        )
+
+    def test_request_checks(self):
+        self.assertEqual(self.sync({'id': self.products[0].pk, 'stock': 1}).status_code, 400)
+        self.client.force_authenticate(User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password'))
+        self.assertEqual(self.sync([{'id': self.products[0].pk, 'stock': 1}]).status_code, 403)
+
+
+@override_settings(PRODUCT_FEED_LAG_SECONDS=0)
+class ProductFeedTests(TestCase):
+    """?updated_since= 는 커서 이후의 변경과 삭제를 (시각, id) 순서로 나눠 보낸다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.start = timezone.now() - timedelta(hours=1)
+        cls.products = []
+        for n in range(5):
+            product = Product.objects.create(
+                name=f'상품 {n}', description='', price=1000, stock=5, category='도서', created_by=cls.seller,
+            )
+            cls.products.append(product)
+            cls.at(product, n)
+
+    @staticmethod
+    def at(product, minutes):
+        """updated_at 을 start + minutes 분으로 고정한다"""
+        moment = ProductFeedTests.start + timedelta(minutes=minutes)
+        Product.objects.filter(pk=product.pk).update(updated_at=moment)
+        return moment
+
+    def setUp(self):
+        self.client.force_authenticate(self.seller)
+
+    def get(self, cursor='', limit=None, status_code=200):
+        query = {'updated_since': cursor}
+        if limit is not None:
+            query['limit'] = limit
+        response = self.client.get(reverse('products:product-list'), query)
+        self.assertEqual(response.status_code, status_code)
+        return response.json()
+
+    def ids(self, products):
+        return [product.pk for product in products]
+
+    def test_cursor_encoding(self):
+        moment = timezone.now()
+        cursor = feed.encode_cursor(moment, 42)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(feed.decode_cursor(cursor), (moment, 42))
+        self.assertIsNone(feed.decode_cursor(''))
+        self.assertEqual(feed.decode_cursor('2026-01-01T00:00:00+00:00')[1], 0)
+        for value in ('!!!', 'bm90LWEtY3Vyc29y'):
+            with self.subTest(value=value), self.assertRaises(feed.InvalidCursor):
+                feed.decode_cursor(value)
+        self.get('!!!', status_code=400)
+        self.get('', limit='many', status_code=400)
+
+    def test_paging_with_next_cursor(self):
+        # 같은 시각의 두 상품이 페이지 경계에 걸친다
+        self.at(self.products[2], 1)
+        pages, cursor = [], ''
+        while True:
+            data = self.get(cursor, limit=2)
+            pages.append(([row['id'] for row in data['changed']], data['has_more']))
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+        a, b, c, d, e = self.ids(self.products)
+        self.assertEqual(pages, [([a, b], True), ([c, d], True), ([e], False)])
+        # 최신 상태에서는 같은 커서를 돌려준다
+        data = self.get(cursor)
+        self.assertEqual((data['changed'], data['removed'], data['next_cursor']), ([], [], cursor))
+
+    def test_lag_window_holds_back_recent_changes(self):
+        cursor = self.get()['next_cursor']
+        product = self.products[0]
+        product.price = 2000
+        product.save()
+        with override_settings(PRODUCT_FEED_LAG_SECONDS=60):
+            data = self.get(cursor)
+            self.assertEqual((data['changed'], data['next_cursor']), ([], cursor))
+            Product.objects.filter(pk=product.pk).update(updated_at=timezone.now() - timedelta(minutes=2))
+            self.assertEqual([row['price'] for row in self.get(cursor)['changed']], ['2000.00'])
+
+    def test_delete_deactivate_and_image_events(self):
+        cursor = self.get()['next_cursor']
+        deleted, deactivated, pictured = self.products[:3]
+        deleted_id = deleted.pk
+        deleted.delete()
+        deactivated.is_active = False
+        deactivated.save()
+        ProductImage.objects.create(product=pictured, image='products/test/new.jpg', is_main=True)
+
+        data = self.get(cursor)
+        self.assertEqual([row['id'] for row in data['changed']], [pictured.pk])
+        self.assertTrue(data['changed'][0]['images'][0].endswith('products/test/new.jpg'))
+        self.assertEqual(sorted(data['removed']), sorted([deleted_id, deactivated.pk]))
+
+    def test_tombstones_merge_with_product_rows(self):
+        restored, removed = self.products[:2]
+        # 삭제 뒤에 같은 id 로 돌아온 상품은 changed, 그 반대는 removed
+        ProductTombstone.objects.create(product_id=restored.pk, removed_at=self.start - timedelta(minutes=1))
+        ProductTombstone.objects.create(product_id=removed.pk, removed_at=self.start + timedelta(minutes=30))
+        data = self.get()
+        self.assertEqual([row['id'] for row in data['changed']], [restored.pk, *self.ids(self.products[2:])])
+        self.assertEqual(data['removed'], [removed.pk])
+
+    def test_expired_cursor_resets(self):
+        old = timezone.now() - timedelta(days=settings.PRODUCT_TOMBSTONE_KEEP_DAYS + 1)
+        data = self.get(feed.encode_cursor(old, 0))
+        self.assertTrue(data['reset'])
+        self.assertEqual([row['id'] for row in data['changed']], self.ids(self.products))
+        self.assertFalse(self.get(data['next_cursor'])['reset'])
+
+
+class ProductArchiveTests(TestCase):
+    """오래 비활성인 상품은 배치 단위로 보관 테이블로 옮겨지고 상세 조회와 되돌리기가 된다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.old = timezone.now() - timedelta(days=400)
+        cls.products = [
+            Product.objects.create(
+                name=f'상품 {n}', description='', price=1000, stock=5, category='도서',
+                created_by=cls.seller, is_active=n == 4,
+            )
+            for n in range(6)
+        ]
+        ProductImage.objects.create(product=cls.products[0], image='products/test/old.jpg', is_main=True)
+        # 0-3 은 오래 비활성, 4 는 판매 중, 5 는 최근에 비활성
+        Product.objects.filter(pk__in=[product.pk for product in cls.products[:5]]).update(updated_at=cls.old)
+        cls.archived_ids = [product.pk for product in cls.products[:4]]
+
+    def setUp(self):
+        # 보관은 이미지 파일을 지우지 않는다
+        patch = mock.patch('apps.upload.signals.delete_stored_files')
+        self.delete_stored_files = patch.start()
+        self.addCleanup(patch.stop)
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_products', '--older-than-days', '365', '--batch-size', '3', *args, stdout=out)
+        return out.getvalue()
+
+    def test_interrupted_run_resumes(self):
+        cutoff = timezone.now() - timedelta(days=365)
+        batch = archive_batch(cutoff, batch_size=2)
+        self.assertEqual((batch.products, batch.images, batch.last_id), (2, 1, self.archived_ids[1]))
+        self.assertIn('Archived 2 products and 0 images', self.archive())
+        self.assertIn('Archived 0 products', self.archive())
+
+        self.assertEqual(sorted(ArchivedProduct.objects.values_list('pk', flat=True)), self.archived_ids)
+        self.assertFalse(Product.objects.filter(pk__in=self.archived_ids).exists())
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(ArchivedProductImage.objects.get().product_id, self.archived_ids[0])
+        self.delete_stored_files.delay.assert_not_called()
+
+    def test_max_batches_and_dry_run(self):
+        self.assertIn('4 products inactive', self.archive('--dry-run'))
+        output = self.archive('--max-batches', '1')
+        self.assertIn('batch 1: 3 products, 1 images', output)
+        self.assertEqual(ArchivedProduct.objects.count(), 3)
+        self.assertIn('batch 1: 1 products', self.archive())
+
+    def test_archived_detail(self):
+        self.archive()
+        pk = self.archived_ids[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_response(self.seller)['access']}")
+        v1 = self.client.get(reverse('products:product-detail', args=[pk]))
+        v2 = self.client.get(reverse('products_async:product_detail', args=[pk]))
+        self.assertEqual((v1.status_code, v2.status_code), (200, 200))
+        self.assertEqual(v2.json(), v1.json())
+        self.assertEqual((v1.json()['id'], v1.json()['image_count']), (pk, 1))
+        self.assertFalse(v1.json()['is_active'])
+
+        # 목록에는 나오지 않는다
+        listed = {row['id'] for row in self.client.get(reverse('products:product-list')).json()}
+        self.assertNotIn(pk, listed)
+
+    def test_restore(self):
+        self.archive()
+        pk = self.archived_ids[0]
+        self.assertEqual(restore([pk, 999_999]), 1)
+
+        product = Product.objects.get(pk=pk)
+        self.assertEqual((product.name, product.updated_at, product.is_active), ('상품 0', self.old, False))
+        self.assertEqual(list(product.images.values_list('image', flat=True)), ['products/test/old.jpg'])
+        self.assertFalse(ArchivedProduct.objects.filter(pk=pk).exists())
+        self.assertFalse(ArchivedProductImage.objects.exists())
+        self.assertEqual(restore([pk]), 0)
+
+        self.assertIn('Restored 3 products', self.archive('--restore', *map(str, self.archived_ids)))
+        self.assertFalse(ArchivedProduct.objects.exists())
+
+
+class CatalogSnapshotTests(TestCase):
+    """카테고리 번들은 바뀐 카테고리만 다시 만들고, 교체된 파일은 나중에 지운다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.products = {
+            name: Product.objects.create(
+                name=name, description='', price=1000, stock=5, category=category, created_by=cls.seller,
+            )
+            for name, category in [('가', '도서'), ('나', '도서'), ('다', '음반')]
+        }
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client.force_authenticate(self.seller)
+
+    def files(self, category):
+        snapshot = CatalogSnapshot.objects.get(category=category)
+        return snapshots.file_names(snapshot.path, snapshot.encodings)
+
+    def retired(self):
+        return [
+            name
+            for row in Job.objects.filter(name=delete_snapshot_files.job.name).order_by('pk')
+            for name in row.args[0]
+        ]
+
+    def test_only_changed_categories_are_built(self):
+        self.assertEqual(snapshots.build(), [('도서', 'built'), ('음반', 'built')])
+        for name in self.files('도서'):
+            self.assertTrue(default_storage.exists(name), name)
+        with default_storage.open(self.files('도서')[0]) as bundle:
+            data = orjson.loads(bundle.read())
+        self.assertEqual([row['name'] for row in data['products']], ['가', '나'])
+        self.assertEqual(snapshots.build(), [('도서', 'unchanged'), ('음반', 'unchanged')])
+
+        product = self.products['다']
+        product.price = 2000
+        product.save()
+        self.assertEqual(snapshots.build(), [('도서', 'unchanged'), ('음반', 'built')])
+        self.assertEqual(snapshots.build(force=True), [('도서', 'built'), ('음반', 'built')])
+
+        product.is_active = False
+        product.save()
+        self.assertEqual(snapshots.build(), [('도서', 'unchanged'), ('음반', 'removed')])
+        self.assertFalse(CatalogSnapshot.objects.filter(category='음반').exists())
+
+    def test_manifest_etag(self):
+        url = reverse('products:product-snapshots')
+        empty = self.client.get(url)
+        self.assertEqual(empty.json(), {'cursor': '', 'bundles': []})
+
+        snapshots.build()
+        response = self.client.get(url)
+        self.assertNotEqual(response['ETag'], empty['ETag'])
+        data = response.json()
+        self.assertTrue(data['cursor'])
+        bundle, = [row for row in data['bundles'] if row['category'] == '도서']
+        self.assertEqual(bundle['products'], 2)
+        self.assertTrue(bundle['url'].endswith(self.files('도서')[0]))
+        self.assertEqual(bundle['encodings']['gzip'], bundle['url'] + '.gz')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # 바뀌지 않은 번들은 ETag 를 바꾸지 않는다
+        snapshots.build()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.products['가'].save()
+        snapshots.build()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_replaced_files_are_retired(self):
+        snapshots.build()
+        old = self.files('도서')
+        self.products['가'].delete()
+        snapshots.build()
+        new = self.files('도서')
+        self.assertEqual(self.retired(), old)
+        job = Job.objects.get(name=delete_snapshot_files.job.name)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(minutes=55))
+
+        # 같은 내용이 다시 배포된 이름은 남긴다
+        delete_snapshot_files(old + new)
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        self.assertTrue(all(default_storage.exists(name) for name in new))
+
+        Product.objects.filter(category='도서').update(is_active=False)
+        snapshots.build()
+        self.assertEqual(self.retired(), old + new)
+
+
+@override_settings(PRODUCT_SUGGEST_REFRESH_SECONDS=3600)
+class ProductSuggestTests(TestCase):
+    """자동완성은 상품명 단어 / 초성 접두어로 인기순 상품과 카테고리를 제안한다"""
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        cls.products = {
+            name: Product.objects.create(
+                name=name, description='', price=1000, stock=5, category=category,
+                created_by=cls.seller, is_active=is_active,
+            )
+            for name, category, is_active in [
+                ('노트북 파우치', '가방', True), ('게이밍 노트북', '컴퓨터', True), ('노트', '문구', True),
+                ('노란 우산', '잡화', True), ('노트북 거치대', '컴퓨터', False),
+            ]
+        }
+        today = timezone.localdate()
+        DailyProductSales.objects.bulk_create([
+            DailyProductSales(product=cls.products['게이밍 노트북'], date=today, units_sold=10),
+            DailyProductSales(product=cls.products['노트'], date=today, units_sold=3),
+            # 인기도 기간이 지난 판매는 세지 않는다
+            DailyProductSales(product=cls.products['노트북 파우치'], date=today - timedelta(days=60), units_sold=50),
+        ])
+
+    def setUp(self):
+        suggestions.reset_index()
+        self.addCleanup(suggestions.reset_index)
+        self.index = suggestions.get_index()
+
+    def names(self, query, limit=10):
+        return [row['name'] for row in self.index.suggest(query, limit)['products']]
+
+    def test_prefix_in_popularity_order(self):
+        self.assertEqual(self.names('노트'), ['게이밍 노트북', '노트', '노트북 파우치'])
+        self.assertEqual(self.names('노ㅌ'), ['게이밍 노트북', '노트', '노트북 파우치'])
+        self.assertEqual(self.names('노트북'), ['게이밍 노트북', '노트북 파우치'])
+        self.assertEqual(self.names('노', limit=2), ['게이밍 노트북', '노트'])
+        self.assertEqual(self.names('파우'), ['노트북 파우치'])
+        self.assertEqual(self.names(' '), [])
+        # 넓은 접두어는 인기순 목록을 훑는다: 결과는 같다
+        expected = self.index.suggest('노', 3)
+        with mock.patch.object(suggestions, 'SCAN_LIMIT', 1):
+            self.assertEqual(self.index._search(suggestions.query_key('노'), 3), expected)
+
+    def test_chosung_and_categories(self):
+        self.assertEqual(self.names('ㄴㅌㅂ'), ['게이밍 노트북', '노트북 파우치'])
+        self.assertEqual(self.names('ㄴㅌ'), ['게이밍 노트북', '노트', '노트북 파우치'])
+        self.assertEqual(self.index.suggest('컴', 10)['categories'], [{'name': '컴퓨터', 'products': 1}])
+        self.assertEqual(self.index.suggest('ㅈㅎ', 10)['categories'], [{'name': '잡화', 'products': 1}])
+
+    def test_save_delete_and_deactivate_update_the_index(self):
+        self.assertEqual(self.names('노트'), ['게이밍 노트북', '노트', '노트북 파우치'])
+        with self.captureOnCommitCallbacks(execute=True):
+            created = Product.objects.create(
+                name='노트 패드', description='', price=1000, stock=5, category='문구', created_by=self.seller,
+            )
+        # 인기도가 같으면 최근 상품 먼저
+        self.assertEqual(self.names('노트'), ['게이밍 노트북', '노트', '노트 패드', '노트북 파우치'])
+        self.assertEqual(self.index.suggest('문구', 10)['categories'], [{'name': '문구', 'products': 2}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created.name = '메모지'
+            created.save()
+        self.assertNotIn('노트 패드', self.names('노트'))
+        self.assertEqual(self.names('메모'), ['메모지'])
+
+        pouch = self.products['노트북 파우치']
+        with self.captureOnCommitCallbacks(execute=True):
+            pouch.is_active = False
+            pouch.save()
+        self.assertEqual(self.names('노트북'), ['게이밍 노트북'])
+        self.assertEqual(self.index.suggest('가방', 10)['categories'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products['노트'].delete()
+        self.assertEqual(self.names('노트'), ['게이밍 노트북'])
+        stand = self.products['노트북 거치대']
+        with self.captureOnCommitCallbacks(execute=True):
+            stand.is_active = True
+            stand.save()
+        self.assertEqual(self.names('노트북'), ['게이밍 노트북', '노트북 거치대'])
+
+    def test_endpoint(self):
+        self.client.force_authenticate(self.seller)
+        url = reverse('products:product-suggest')
+        response = self.client.get(url, {'q': 'ㄴㅌㅂ', 'limit': 1})
+        self.assertEqual(response.json()['products'], [
+            {'id': self.products['게이밍 노트북'].pk, 'name': '게이밍 노트북', 'category': '컴퓨터'},
+        ])
+        self.assertEqual(self.client.get(url, {'q': '노트', 'limit': 'x'}).status_code, 400)
+
+
+class LiveStream:
+    """live.app 를 직접 부르는 ASGI 클라이언트 (보낸 메시지를 모은다)"""
+
+    def __init__(self, query, headers=()):
+        self.scope = {
+            'type': 'http', 'method': 'GET', 'path': live.PATH,
+            'query_string': query.encode(), 'headers': list(headers),
+        }
+        self.inbox = asyncio.Queue()
+        self.messages = []
+        self.sent = asyncio.Event()
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    async def send(self, message):
+        self.messages.append(message)
+        self.sent.set()
+
+    async def run(self):
+        await live.app(self.scope, self.receive, self.send)
+
+    @property
+    def status(self):
+        return self.messages[0]['status']
+
+    def json(self):
+        return orjson.loads(self.messages[1]['body'])
+
+    def events(self):
+        body = b''.join(message.get('body', b'') for message in self.messages[1:])
+        return [
+            orjson.loads(line[len(b'data: '):])
+            for line in body.split(b'\n') if line.startswith(b'data: ')
+        ]
+
+    async def wait_for_events(self, count, timeout=5):
+        async with asyncio.timeout(timeout):
+            while len(self.events()) < count:
+                self.sent.clear()
+                await self.sent.wait()
+
+
+@override_settings(REDIS_URL='', PRODUCT_LIVE_COALESCE_SECONDS=0.5, PRODUCT_LIVE_MAX_IDS=3)
+class LiveProductStreamTests(TransactionTestCase):
+    """EventSource 는 헤더를 못 보내므로 ?token= 으로도 인증하고, 변경은 상품마다 하나로 합쳐 보낸다"""
+
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        self.product = Product.objects.create(
+            name='상품', description='', price=1000, stock=5, category='도서', created_by=self.seller,
+        )
+        self.tokens = token_response(self.seller)
+
+    def query(self, ids=None, token=None):
+        ids = str(self.product.pk) if ids is None else ids
+        return f"ids={ids}&token={token or self.tokens['access']}"
+
+    async def request(self, query, headers=()):
+        stream = LiveStream(query, headers)
+        await stream.run()
+        return stream
+
+    def set_stock(self, *values):
+        for value in values:
+            self.product.stock = value
+            self.product.save()
+
+    async def test_requires_a_valid_access_token(self):
+        stream = await self.request(f'ids={self.product.pk}')
+        self.assertEqual(stream.status, 401)
+        self.assertIn((b'www-authenticate', b'Bearer realm="api"'), stream.messages[0]['headers'])
+        for token in ('invalid', self.tokens['refresh']):
+            stream = await self.request(self.query(token=token))
+            self.assertEqual(stream.status, 401)
+
+    async def test_header_token_is_accepted(self):
+        header = (b'authorization', f"Bearer {self.tokens['access']}".encode())
+        stream = await self.request('ids=abc', [header])
+        # 인증을 통과해야 ids 검사까지 간다
+        self.assertEqual(stream.status, 400)
+
+    async def test_invalid_ids(self):
+        for ids in ('', 'abc', '1,2,3,4', '0', '-1', '99999999999999999999', str(2 ** 63)):
+            with self.subTest(ids=ids):
+                stream = await self.request(self.query(ids=ids))
+                self.assertEqual(stream.status, 400)
+                self.assertIn('ids', stream.json())
+
+    def test_parse_ids(self):
+        self.assertEqual(live._parse_ids(b'ids=3,1&ids=3,%202,'), [1, 2, 3])
+        self.assertEqual(live._parse_ids(b'ids=%d' % (2 ** 63 - 1)), [2 ** 63 - 1])
+        for query in (b'', b'ids=', b'ids=1,x', b'ids=1,2,3,4', b'ids=0', b'ids=-1,2', b'ids=%d' % 2 ** 63):
+            with self.subTest(query=query), self.assertRaises(ValueError):
+                live._parse_ids(query)
+
+    async def test_read_error_is_an_error_response(self):
+        with mock.patch.object(live, 'current', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.products.live', 'WARNING'):
+            stream = await self.request(self.query())
+        # 스트림 헤더(200)를 보내기 전에 실패한다
+        self.assertEqual([message['type'] for message in stream.messages],
+                         ['http.response.start', 'http.response.body'])
+        self.assertEqual(stream.status, 503)
+        self.assertEqual(live.get_broadcaster().count, 0)
+
+    async def test_snapshot_then_coalesced_changes(self):
+        stream = LiveStream(self.query())
+        task = asyncio.create_task(stream.run())
+        try:
+            await stream.wait_for_events(1)
+            self.assertEqual(stream.status, 200)
+            self.assertEqual(stream.events(), [
+                {'id': self.product.pk, 'stock': 5, 'price': '1000.00', 'is_active': True},
+            ])
+            # 합치는 구간 안의 변경은 마지막 값 하나로 온다
+            await sync_to_async(self.set_stock)(4, 3, 2)
+            await stream.wait_for_events(2)
+            await asyncio.sleep(0.6)
+            self.assertEqual([event['stock'] for event in stream.events()], [5, 2])
+        finally:
+            await stream.inbox.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(task, 5)
+        self.assertEqual(live.get_broadcaster().count, 0)
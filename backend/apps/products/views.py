@@ -1,24 +1,39 @@
+from collections import Counter
+from functools import partial
+
 from rest_framework import viewsets, status, parsers
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.conf import settings
 from django.db import transaction, models
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
-from .models import Product, ProductImage
+from marketon.db_router import ReplicaReadMixin
+from marketon.renderers import MessagePackParser, ORJSONParser
+from .bulk import sync_products
+from . import counters, feed, snapshots, suggestions
+from .conditional import conditional_response, detail_validators, list_validators
+from .models import MAX_ID, ArchivedProduct, Product, ProductImage, RelatedProduct
+from .queries import category_names, filter_products
 from .serializers import (
-    ProductSerializer, ProductCreateSerializer, ProductUpdateSerializer,
+    ArchivedProductSerializer, ProductSerializer, ProductCreateSerializer, ProductUpdateSerializer,
     ProductImageSerializer, ProductImageUpdateSerializer, ProductImageReorderSerializer
 )
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     상품 ViewSet
     """
     queryset = Product.objects.all()
+    replica_actions = (
+        'list', 'retrieve', 'search', 'suggest', 'trending', 'categories', 'snapshot_manifest', 'related',
+    )
     permission_classes = [IsAuthenticated]
-    parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+    parser_classes = [parsers.MultiPartParser, parsers.FormParser, ORJSONParser, MessagePackParser]
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -28,24 +43,53 @@ class ProductViewSet(viewsets.ModelViewSet):
         return ProductSerializer
 
     def get_queryset(self):
-        queryset = Product.objects.all()
-        
-        # 검색 필터
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(name__icontains=search)
-        
-        # 카테고리 필터
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # 활성화 상태 필터
-        is_active = self.request.query_params.get('is_active', None)
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == 'true')
-        
-        return queryset.prefetch_related('images')
+        queryset = filter_products(Product.objects.all(), self.request.query_params, ordering=not self.detail)
+        return queryset.select_related('created_by').prefetch_related('images')
+
+    def list(self, request, *args, **kwargs):
+        """목록 조회 (변경이 없으면 304, ?updated_since= 가 있으면 변경 피드)"""
+        if 'updated_since' in request.query_params:
+            return self.changes(request)
+        validators = list_validators(request, self.filter_queryset(self.get_queryset()))
+        return conditional_response(request, validators, partial(super().list, request, *args, **kwargs))
+
+    def changes(self, request):
+        """마지막 동기화(커서) 이후 바뀐 상품과 삭제된 상품 id"""
+        try:
+            cursor = feed.decode_cursor(request.query_params['updated_since'])
+            limit = int(request.query_params.get('limit', settings.PRODUCT_FEED_PAGE_SIZE))
+        except (feed.InvalidCursor, ValueError):
+            return Response({'error': '잘못된 커서 또는 limit 입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), settings.PRODUCT_FEED_MAX_PAGE_SIZE)
+        return Response(feed.changes(request, cursor, limit))
+
+    def product_pk(self):
+        """URL 의 상품 id (숫자가 아니거나 id 범위 밖이면 404, get_object() 와 같게)"""
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise Http404
+        if not 0 < pk <= MAX_ID:
+            raise Http404
+        return pk
+
+    def retrieve(self, request, *args, **kwargs):
+        """상세 조회 (변경이 없으면 304, 없으면 보관된 상품에서 찾는다)"""
+        pk = self.product_pk()
+        validators = detail_validators(request, self.filter_queryset(self.get_queryset()), pk)
+        if validators is None:
+            archived = filter_products(ArchivedProduct.objects.all(), request.query_params, ordering=False)
+            validators = detail_validators(request, archived, pk)
+            if validators is not None:
+                return conditional_response(request, validators, partial(self.retrieve_archived, archived, pk))
+        else:
+            # 조회 수는 메모리에 모았다가 주기적으로 한 번에 쓴다 (304 도 조회)
+            counters.record(pk, counters.VIEWS)
+        return conditional_response(request, validators, partial(super().retrieve, request, *args, **kwargs))
+
+    def retrieve_archived(self, queryset, pk):
+        product = get_object_or_404(queryset.select_related('created_by').prefetch_related('images'), pk=pk)
+        return Response(ArchivedProductSerializer(product, context=self.get_serializer_context()).data)
 
     @action(detail=True, methods=['post'], url_path='reorder-images')
     def reorder_images(self, request, pk=None):
@@ -73,14 +117,14 @@ class ProductViewSet(viewsets.ModelViewSet):
                                 product=product,
                                 order__gt=image.order,
                                 order__lte=new_order
-                            ).update(order=models.F('order') - 1)
+                            ).update(order=models.F('order') - 1, updated_at=timezone.now())
                         else:
                             # 앞으로 이동: 중간 이미지들의 순서를 뒤로
                             ProductImage.objects.filter(
                                 product=product,
                                 order__gte=new_order,
                                 order__lt=image.order
-                            ).update(order=models.F('order') + 1)
+                            ).update(order=models.F('order') + 1, updated_at=timezone.now())
                         
                         image.order = new_order
                         image.save()
@@ -148,7 +192,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         try:
             with transaction.atomic():
                 # 기존 메인 이미지 해제
-                product.images.filter(is_main=True).update(is_main=False)
+                product.images.filter(is_main=True).update(is_main=False, updated_at=timezone.now())
                 
                 # 새 메인 이미지 설정
                 image.is_main = True
@@ -162,11 +206,96 @@ class ProductViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'], url_path='related')
+    def related(self, request, pk=None):
+        """함께 구매된 상품 (미리 계산된 상위 K개, 판매 중인 상품만)"""
+        pk = self.product_pk()
+        if not Product.objects.filter(pk=pk).exists():
+            raise Http404
+        main_image = ProductImage.objects.filter(product=models.OuterRef('related_id')).order_by('-is_main', 'order')
+        rows = (
+            RelatedProduct.objects.filter(product_id=pk, related__is_active=True)
+            .annotate(image=models.Subquery(main_image.values('image')[:1]))
+            .values('related_id', 'related__name', 'related__price', 'related__category', 'image', 'score', 'orders')
+        )
+        storage = ProductImage._meta.get_field('image').storage
+        return Response([
+            {
+                'id': row['related_id'],
+                'name': row['related__name'],
+                'price': str(row['related__price']),
+                'category': row['related__category'],
+                'main_image': request.build_absolute_uri(storage.url(row['image'])) if row['image'] else None,
+                'score': round(row['score'], 4),
+                'orders': row['orders'],
+            }
+            for row in rows
+        ])
+
+    @action(detail=False, methods=['post'], url_path='bulk-sync', permission_classes=[IsAdminUser])
+    def bulk_sync(self, request):
+        """재고/가격/판매 여부 일괄 동기화 ([{id, stock, price, is_active}, ...], 관리자 전용)"""
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({'error': '상품 목록(배열)이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.PRODUCT_BULK_SYNC_MAX_ROWS:
+            return Response(
+                {'error': f'한 번에 최대 {settings.PRODUCT_BULK_SYNC_MAX_ROWS}개까지 동기화할 수 있습니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = sync_products(rows)
+        counts = Counter(result['status'] for result in results)
+        return Response({
+            'updated': counts['updated'],
+            'unchanged': counts['unchanged'],
+            'not_found': counts['not_found'],
+            'invalid': counts['invalid'],
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'], url_path='snapshots', url_name='snapshots')
+    def snapshot_manifest(self, request):
+        """카테고리별 카탈로그 스냅샷 번들 주소와 이후 변경을 받을 피드 커서"""
+        validators = snapshots.manifest_validators(request)
+        return conditional_response(request, validators, lambda: Response(snapshots.manifest(request)))
+
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request):
+        """검색어 자동완성 (?q=, 메모리 접두어 인덱스에서 인기순 상품/카테고리)"""
+        try:
+            limit = int(request.query_params.get('limit', settings.PRODUCT_SUGGEST_LIMIT))
+        except ValueError:
+            return Response({'error': '잘못된 limit 입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), settings.PRODUCT_SUGGEST_MAX_LIMIT)
+        return Response(suggestions.get_index().suggest(request.query_params.get('q', ''), limit))
+
+    @action(detail=False, methods=['get'], url_path='trending')
+    def trending(self, request):
+        """인기 상품 (?category=, 최근 조회/장바구니 담기에 가중치를 둔 감쇠 점수 순)"""
+        try:
+            limit = int(request.query_params.get('limit', settings.PRODUCT_TRENDING_LIMIT))
+        except ValueError:
+            return Response({'error': '잘못된 limit 입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), settings.PRODUCT_TRENDING_MAX_LIMIT)
+        storage = ProductImage._meta.get_field('image').storage
+        return Response([
+            {
+                'id': row['product_id'],
+                'name': row['product__name'],
+                'price': str(row['product__price']),
+                'category': row['product__category'],
+                'main_image': request.build_absolute_uri(storage.url(row['image'])) if row['image'] else None,
+                'score': round(row['score'], 4),
+                'views': row['views'],
+                'cart_adds': row['cart_adds'],
+            }
+            for row in counters.trending(request.query_params.get('category'), limit)
+        ])
+
     @action(detail=False, methods=['get'], url_path='categories')
     def categories(self, request):
         """사용 가능한 카테고리 목록"""
-        categories = Product.objects.values_list('category', flat=True).distinct()
-        return Response(list(categories))
+        return Response(list(category_names()))
 
     @action(detail=False, methods=['get'], url_path='search')
     def search(self, request):
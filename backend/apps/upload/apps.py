@@ -5,3 +5,6 @@ class UploadConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.upload'
     verbose_name = 'File Uploads'
+
+    def ready(self):
+        from . import signals  # noqa: F401
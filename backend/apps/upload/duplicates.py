@@ -0,0 +1,118 @@
+"""
+Near-duplicate image lookups over ProductImage and UploadedImage.
+
+Every process keeps a BK-tree of the stored dHashes.  Before a lookup it pulls
+rows added since its last look (one indexed ``pk > last`` query per model),
+and it is rebuilt from scratch every ``IMAGE_HASH_INDEX_TTL`` seconds so
+deleted rows and backfilled hashes are picked up.  Matches are re-read from
+the database, so a row deleted in the meantime is never returned.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from apps.products.models import ProductImage
+from marketon.imagehash import BKTree, hamming, to_unsigned
+from .models import UploadedImage
+
+SOURCES = {
+    'product_image': ProductImage,
+    'uploaded_image': UploadedImage,
+}
+
+
+class DuplicateIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.tree = BKTree()
+        self.last_ids = dict.fromkeys(SOURCES, 0)
+        self.built_at = time.monotonic()
+
+    def refresh(self):
+        with self._lock:
+            if time.monotonic() - self.built_at > settings.IMAGE_HASH_INDEX_TTL:
+                self._reset()
+            for kind, model in SOURCES.items():
+                rows = (
+                    model.objects.filter(pk__gt=self.last_ids[kind], dhash__isnull=False)
+                    .order_by('pk').values_list('pk', 'dhash')
+                )
+                for pk, dhash in rows.iterator(chunk_size=5000):
+                    self.tree.add(dhash, (kind, pk))
+                    self.last_ids[kind] = pk
+
+    def add(self, kind, pk, dhash):
+        """Index a new row right away (no-op if a refresh already picked it up)."""
+        with self._lock:
+            if pk > self.last_ids[kind]:
+                self.tree.add(dhash, (kind, pk))
+                self.last_ids[kind] = pk
+
+    def search(self, dhash, distance, exclude=None):
+        """``[(distance, kind, pk), ...]`` nearest first."""
+        self.refresh()
+        with self._lock:
+            matches = self.tree.search(dhash, distance)
+        return [(d, kind, pk) for d, (kind, pk) in matches if (kind, pk) != exclude]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DuplicateIndex()
+    return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def find_duplicates(request, dhash, ahash=None, distance=None, exclude=None, limit=20):
+    """Stored images within ``distance`` bits of ``dhash``, as response dicts."""
+    if distance is None:
+        distance = settings.IMAGE_DUPLICATE_DISTANCE
+    matches = get_index().search(dhash, distance, exclude)[:limit]
+    rows = {}
+    for kind, model in SOURCES.items():
+        pks = [pk for _, match_kind, pk in matches if match_kind == kind]
+        if not pks:
+            continue
+        fields = ['pk', 'image', 'ahash'] + (['product_id'] if kind == 'product_image' else [])
+        for row in model.objects.filter(pk__in=pks).values(*fields):
+            rows[kind, row['pk']] = row
+
+    storage = ProductImage._meta.get_field('image').storage
+    results = []
+    for bits, kind, pk in matches:
+        row = rows.get((kind, pk))
+        if row is None:
+            # Deleted since it was indexed
+            continue
+        result = {
+            'type': kind,
+            'id': pk,
+            'url': request.build_absolute_uri(storage.url(row['image'])),
+            'distance': bits,
+        }
+        if ahash is not None and row['ahash'] is not None:
+            result['ahash_distance'] = hamming(ahash, row['ahash'])
+        if kind == 'product_image':
+            result['product_id'] = row['product_id']
+        results.append(result)
+    return results
+
+
+def format_hash(value):
+    return f'{to_unsigned(value):016x}'
@@ -0,0 +1,25 @@
+from django.core.files.storage import default_storage
+
+from apps.jobs.registry import job
+from apps.products.models import ArchivedProductImage, ProductImage
+from .models import UploadedFile, UploadedImage
+
+REFERENCES = (
+    (ProductImage, 'image'),
+    (ArchivedProductImage, 'image'),
+    (UploadedFile, 'file'),
+    (UploadedImage, 'image'),
+)
+
+
+def is_referenced(name):
+    return any(model.objects.filter(**{field: name}).exists() for model, field in REFERENCES)
+
+
+@job(max_attempts=5)
+def delete_stored_files(names):
+    """Delete media files whose rows are gone, off the request path (storage may be remote)."""
+    for name in names:
+        # Another row may have been saved with the same name since
+        if not is_referenced(name):
+            default_storage.delete(name)
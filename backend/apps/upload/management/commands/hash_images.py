@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketon.imagehash import hash_file
+from apps.upload.duplicates import SOURCES
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for stored images that have none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        started = time.perf_counter()
+        for kind, model in SOURCES.items():
+            hashed = unreadable = 0
+            last_pk = 0
+            while True:
+                batch = list(
+                    model.objects.filter(pk__gt=last_pk, dhash__isnull=True)
+                    .order_by('pk').only('pk', 'image')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                changed = []
+                for row in batch:
+                    try:
+                        with row.image.open('rb') as file:
+                            row.ahash, row.dhash = hash_file(file)
+                    except (OSError, ValueError):
+                        row.ahash = row.dhash = None
+                    if row.dhash is None:
+                        unreadable += 1
+                    else:
+                        changed.append(row)
+                model.objects.bulk_update(changed, ['ahash', 'dhash'])
+                hashed += len(changed)
+            self.stdout.write(f'{kind}: {hashed} hashed, {unreadable} missing or unreadable')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.perf_counter() - started:.2f}s; '
+            'running processes pick up the new hashes within IMAGE_HASH_INDEX_TTL'
+        ))
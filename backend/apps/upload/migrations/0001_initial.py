@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='uploads/files/%Y/%m/%d/')),
+                ('original_name', models.CharField(max_length=255)),
+                ('file_size', models.PositiveIntegerField()),
+                ('file_type', models.CharField(max_length=100)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Uploaded File',
+                'verbose_name_plural': 'Uploaded Files',
+                'db_table': 'upload_uploadedfile',
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='uploads/images/%Y/%m/%d/')),
+                ('original_name', models.CharField(max_length=255)),
+                ('image_size', models.PositiveIntegerField()),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Uploaded Image',
+                'verbose_name_plural': 'Uploaded Images',
+                'db_table': 'upload_uploadedimage',
+            },
+        ),
+    ]
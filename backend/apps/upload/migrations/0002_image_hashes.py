@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('upload', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='ahash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='dhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from marketon.imagehash import hash_file
+
 User = get_user_model()
 
 
@@ -33,6 +35,9 @@ class UploadedImage(models.Model):
     image_size = models.PositiveIntegerField()
     width = models.PositiveIntegerField()
     height = models.PositiveIntegerField()
+    # Perceptual hashes for near-duplicate detection (marketon.imagehash)
+    ahash = models.BigIntegerField(null=True, blank=True, editable=False)
+    dhash = models.BigIntegerField(null=True, blank=True, editable=False)
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
@@ -43,3 +48,9 @@ class UploadedImage(models.Model):
     
     def __str__(self):
         return f"{self.original_name} ({self.width}x{self.height})"
+
+    def save(self, *args, **kwargs):
+        # Hash a fresh upload from a downscaled decode before it goes to storage
+        if self.image and not getattr(self.image, '_committed', True):
+            self.ahash, self.dhash = hash_file(self.image)
+        super().save(*args, **kwargs)
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.products.models import ProductImage
+from .jobs import delete_stored_files
+from .models import UploadedFile, UploadedImage
+
+_keep_files = ContextVar('keep_stored_files', default=False)
+
+
+@contextmanager
+def keep_stored_files():
+    """Delete rows without deleting their files, e.g. rows moved to another table."""
+    token = _keep_files.set(True)
+    try:
+        yield
+    finally:
+        _keep_files.reset(token)
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=UploadedImage)
+def delete_image_file(sender, instance, **kwargs):
+    if instance.image and not _keep_files.get():
+        delete_stored_files.delay([instance.image.name])
+
+
+@receiver(post_delete, sender=UploadedFile)
+def delete_uploaded_file(sender, instance, **kwargs):
+    if instance.file and not _keep_files.get():
+        delete_stored_files.delay([instance.file.name])
@@ -1,3 +1,109 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.products.models import Product, ProductImage
+from marketon.imagehash import to_unsigned
+from .duplicates import reset_index
+from .models import UploadedImage
+
+User = get_user_model()
+
+
+def gradient(size=64, reverse=False, fmt='PNG'):
+    """A horizontal gradient; resized or re-encoded copies have the same dHash"""
+    image = Image.new('RGB', (size, size))
+    for x in range(size):
+        shade = 255 - x * 255 // size if reverse else x * 255 // size
+        for y in range(size):
+            image.putpixel((x, y), (shade, shade // 2, 255 - shade))
+    buffer = BytesIO()
+    image.save(buffer, fmt)
+    return SimpleUploadedFile(f'gradient.{fmt.lower()}', buffer.getvalue(), content_type=f'image/{fmt.lower()}')
+
+
+class ImageDuplicateTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        reset_index()
+        self.addCleanup(reset_index)
+
+    def upload(self, image):
+        response = self.client.post(reverse('upload:image_upload'), {'image': image}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def duplicates(self, **params):
+        return self.client.get(reverse('upload:image_duplicates'), params)
+
+    def test_upload_hints_at_duplicates(self):
+        first = self.upload(gradient())
+        self.assertEqual(first['duplicates'], [])
+        stored = UploadedImage.objects.get(pk=first['image']['id'])
+        self.assertIsNotNone(stored.dhash)
+
+        # Resized and re-encoded: same picture
+        copy = self.upload(gradient(size=200, fmt='JPEG'))
+        match, = copy['duplicates']
+        self.assertEqual((match['type'], match['id']), ('uploaded_image', stored.pk))
+        self.assertLessEqual(match['distance'], 6)
+        self.assertIn('ahash_distance', match)
+
+        self.assertEqual(self.upload(gradient(reverse=True))['duplicates'], [])
+
+    def test_lookup_by_image_and_hash(self):
+        user = User.objects.create_user('seller', 'seller@example.com', 'seller-password')
+        product = Product.objects.create(
+            name='Product', description='', price=1000, stock=5, category='books', created_by=user,
+        )
+        product_image = ProductImage.objects.create(product=product, image=gradient(), is_main=True)
+        uploaded = self.upload(gradient(size=128))['image']['id']
+        self.assertEqual(self.upload(gradient(reverse=True))['duplicates'], [])
+
+        data = self.duplicates(product_image=product_image.pk).json()
+        self.assertEqual(data['hash'], f'{to_unsigned(product_image.dhash):016x}')
+        self.assertEqual([(row['type'], row['id']) for row in data['matches']], [('uploaded_image', uploaded)])
+
+        data = self.duplicates(hash=data['hash'], distance=0).json()
+        self.assertEqual(
+            {(row['type'], row['id']) for row in data['matches']},
+            {('product_image', product_image.pk), ('uploaded_image', uploaded)},
+        )
+        product_row, = [row for row in data['matches'] if row['type'] == 'product_image']
+        self.assertEqual(product_row['product_id'], product.pk)
+
+        # Deleted rows are not returned even though the index still has them
+        ProductImage.objects.filter(pk=product_image.pk).delete()
+        data = self.duplicates(image=uploaded).json()
+        self.assertEqual(data['matches'], [])
+
+    def test_bad_params(self):
+        pending = UploadedImage.objects.create(
+            image='uploads/images/pending.png', original_name='pending.png', image_size=1, width=1, height=1,
+        )
+        cases = [
+            ({}, 400),
+            ({'image': 'abc'}, 400),
+            ({'hash': 'not-hex'}, 400),
+            ({'hash': '1' * 17}, 400),
+            ({'hash': '-1'}, 400),
+            ({'hash': '0' * 16, 'distance': 'x'}, 400),
+            ({'hash': '0' * 16, 'distance': '-1'}, 400),
+            ({'hash': '0' * 16, 'distance': '17'}, 400),
+            ({'image': '999999'}, 404),
+            ({'image': str(pending.pk)}, 409),
+            ({'hash': 'f' * 16, 'distance': '16'}, 200),
+        ]
+        for params, status_code in cases:
+            with self.subTest(params=params):
+                self.assertEqual(self.duplicates(**params).status_code, status_code)
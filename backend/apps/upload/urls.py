@@ -8,5 +8,6 @@ urlpatterns = [
     path('image/', views.ImageUploadView.as_view(), name='image_upload'),
     path('files/', views.FileListView.as_view(), name='file_list'),
     path('images/', views.ImageListView.as_view(), name='image_list'),
+    path('images/duplicates/', views.ImageDuplicatesView.as_view(), name='image_duplicates'),
     path('info/', views.media_info, name='media_info'),
 ]
@@ -2,11 +2,14 @@ import os
 from PIL import Image
 from django.conf import settings
 from rest_framework import status
-from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from marketon.imagehash import to_signed
+from marketon.throttling import LoadSheddingMixin, SlidingWindowThrottle
+from apps.products.models import ProductImage
+from .duplicates import find_duplicates, format_hash, get_index
 from .models import UploadedFile, UploadedImage
 from .serializers import (
     UploadedFileSerializer, 
@@ -16,12 +19,14 @@ from .serializers import (
 )
 
 
-class FileUploadView(APIView):
+class FileUploadView(LoadSheddingMixin, APIView):
     """
     File upload endpoint for testing media directory
     """
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'upload'
     
     def post(self, request):
         serializer = FileUploadSerializer(data=request.data)
@@ -34,7 +39,7 @@ class FileUploadView(APIView):
                 original_name=uploaded_file.name,
                 file_size=uploaded_file.size,
                 file_type=uploaded_file.content_type,
-                uploaded_by=request.user if request.user.is_authenticated else None
+                uploaded_by_id=request.user.pk if request.user.is_authenticated else None
             )
             
             # Return response
@@ -48,12 +53,14 @@ class FileUploadView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ImageUploadView(APIView):
+class ImageUploadView(LoadSheddingMixin, APIView):
     """
     Image upload endpoint for testing media directory
     """
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'upload'
     
     def post(self, request):
         serializer = ImageUploadSerializer(data=request.data)
@@ -74,25 +81,37 @@ class ImageUploadView(APIView):
                 image_size=uploaded_image.size,
                 width=width,
                 height=height,
-                uploaded_by=request.user if request.user.is_authenticated else None
+                uploaded_by_id=request.user.pk if request.user.is_authenticated else None
             )
             
+            # Dedupe hint: stored images that look the same
+            duplicates = []
+            if uploaded_image_obj.dhash is not None:
+                duplicates = find_duplicates(
+                    request, uploaded_image_obj.dhash, uploaded_image_obj.ahash,
+                    exclude=('uploaded_image', uploaded_image_obj.pk), limit=10,
+                )
+                get_index().add('uploaded_image', uploaded_image_obj.pk, uploaded_image_obj.dhash)
+
             # Return response
             image_serializer = UploadedImageSerializer(uploaded_image_obj)
             return Response({
                 'message': 'Image uploaded successfully',
                 'image': image_serializer.data,
-                'media_url': request.build_absolute_uri(uploaded_image_obj.image.url)
+                'media_url': request.build_absolute_uri(uploaded_image_obj.image.url),
+                'duplicates': duplicates,
             }, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class FileListView(APIView):
+class FileListView(LoadSheddingMixin, APIView):
     """
     List all uploaded files
     """
     permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'media_list'
     
     def get(self, request):
         files = UploadedFile.objects.all().order_by('-uploaded_at')
@@ -103,11 +122,13 @@ class FileListView(APIView):
         })
 
 
-class ImageListView(APIView):
+class ImageListView(LoadSheddingMixin, APIView):
     """
     List all uploaded images
     """
     permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'media_list'
     
     def get(self, request):
         images = UploadedImage.objects.all().order_by('-uploaded_at')
@@ -118,11 +139,66 @@ class ImageListView(APIView):
         })
 
 
-@api_view(['GET'])
-def media_info(request):
+class ImageDuplicatesView(LoadSheddingMixin, APIView):
+    """
+    Near-duplicates of a stored image (?image=<id> or ?product_image=<id>)
+    or of a dHash (?hash=<16 hex digits>), within ?distance= bits
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'media_list'
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            distance = int(params.get('distance', settings.IMAGE_DUPLICATE_DISTANCE))
+            if 'image' in params:
+                source = UploadedImage.objects.filter(pk=int(params['image'])).values('ahash', 'dhash').first()
+                exclude = ('uploaded_image', int(params['image']))
+            elif 'product_image' in params:
+                source = ProductImage.objects.filter(pk=int(params['product_image'])).values('ahash', 'dhash').first()
+                exclude = ('product_image', int(params['product_image']))
+            elif 'hash' in params:
+                value = int(params['hash'], 16)
+                if not 0 <= value < 1 << 64:
+                    raise ValueError(params['hash'])
+                source = {'ahash': None, 'dhash': to_signed(value)}
+                exclude = None
+            else:
+                return Response({'error': 'image, product_image or hash is required'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'Invalid parameter'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= distance <= settings.IMAGE_DUPLICATE_MAX_DISTANCE:
+            return Response({'error': 'Invalid parameter'}, status=status.HTTP_400_BAD_REQUEST)
+        if source is None:
+            return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        if source['dhash'] is None:
+            return Response({'error': 'Image has not been hashed yet'}, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'hash': format_hash(source['dhash']),
+            'distance': distance,
+            'matches': find_duplicates(request, source['dhash'], source['ahash'], distance, exclude),
+        })
+
+
+class MediaInfoView(LoadSheddingMixin, APIView):
     """
     Get media directory information for testing
     """
+    permission_classes = [AllowAny]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'media_info'
+
+    def get(self, request):
+        return Response(collect_media_info())
+
+
+media_info = MediaInfoView.as_view()
+
+
+def collect_media_info():
     media_root = settings.MEDIA_ROOT
     static_root = settings.STATIC_ROOT if hasattr(settings, 'STATIC_ROOT') else None
     
@@ -140,7 +216,7 @@ def media_info(request):
     if static_exists:
         static_files = len([f for f in os.listdir(static_root) if os.path.isfile(os.path.join(static_root, f))])
     
-    return Response({
+    return {
         'media_root': str(media_root),
         'media_exists': media_exists,
         'media_files_count': media_files,
@@ -149,4 +225,4 @@ def media_info(request):
         'static_files_count': static_files,
         'media_url': settings.MEDIA_URL,
         'static_url': settings.STATIC_URL,
-    })
+    }
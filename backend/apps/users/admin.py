@@ -1,3 +1,16 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from marketon.admin import EstimatedCountPaginator
+from .models import User
 
-# Register your models here.
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    list_display = ['username', 'email', 'is_staff', 'is_active', 'date_joined']
+    # Also used by the autocomplete widgets of other admins (e.g. product created_by)
+    search_fields = ['username', 'email']
+    fieldsets = BaseUserAdmin.fieldsets + (
+        ('Profile', {'fields': ('phone_number', 'birth_date', 'profile_image')}),
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,17 @@
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .revocation import is_token_revoked
+
+
+class RevocableJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Stateless JWT authentication that rejects revoked tokens.
+    The common not-revoked case is answered by the in-process Bloom filter.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_token_revoked(token):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+        return token
@@ -0,0 +1,91 @@
+import time
+
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from apps.users.authentication import RevocableJWTAuthentication
+from apps.users.serializers import MarketonRefreshToken
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request authentication overhead of stateless JWT and session auth'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, iterations):
+        user = User.objects.create_user(
+            username='bench_auth_user', email='bench_auth@example.com', password='unused-password'
+        )
+        factory = APIRequestFactory()
+
+        access = str(MarketonRefreshToken.for_user(user).access_token)
+        jwt_auth = JWTStatelessUserAuthentication()
+        revocable_auth = RevocableJWTAuthentication()
+
+        def jwt_request(auth=jwt_auth):
+            request = Request(factory.get('/api/products/', HTTP_AUTHORIZATION=f'Bearer {access}'))
+            authed_user, _ = auth.authenticate(request)
+            return authed_user.is_staff
+
+        def revocable_jwt_request():
+            return jwt_request(revocable_auth)
+
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        session_middleware = SessionMiddleware(lambda request: HttpResponse())
+        auth_middleware = AuthenticationMiddleware(lambda request: HttpResponse())
+        session_auth = SessionAuthentication()
+
+        def session_request():
+            django_request = factory.get('/api/products/')
+            django_request.COOKIES[settings.SESSION_COOKIE_NAME] = session.session_key
+            session_middleware.process_request(django_request)
+            auth_middleware.process_request(django_request)
+            authed_user, _ = session_auth.authenticate(Request(django_request))
+            return authed_user.is_staff
+
+        benches = (
+            ('jwt (stateless)', jwt_request),
+            ('jwt + revocation', revocable_jwt_request),
+            ('session', session_request),
+        )
+        for label, fn in benches:
+            fn()  # warm up
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    fn()
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{label:<16} {elapsed / iterations * 1e6:8.1f}us/request '
+                f'{len(queries) / iterations:.1f} queries/request'
+            )
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    # Admin search / autocomplete run UPPER(column) LIKE '%term%'
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in ('username', 'email'):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS users_user_{column}_trgm_idx '
+            f'ON users_user USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in ('username', 'email'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS users_user_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from marketon.loaded_values import LoadedValuesMixin
 
-class User(AbstractUser):
+
+class User(LoadedValuesMixin, AbstractUser):
     """
     Custom User model extending AbstractUser
     """
@@ -16,6 +18,10 @@ class User(AbstractUser):
     
     # Custom manager or methods can be added here
     
+    # Copied into issued JWTs (MarketonRefreshToken); changing one revokes the
+    # user's tokens (apps.users.signals)
+    TOKEN_CLAIM_FIELDS = ('is_active', 'is_staff', 'is_superuser')
+
     class Meta:
         db_table = 'users_user'
         verbose_name = 'User'
@@ -23,3 +29,7 @@ class User(AbstractUser):
     
     def __str__(self):
         return self.username
+
+    def token_claims_changed(self):
+        """Whether a token claim field differs from the value loaded from the database."""
+        return self.loaded_values_changed(*self.TOKEN_CLAIM_FIELDS)
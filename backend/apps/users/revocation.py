@@ -0,0 +1,250 @@
+"""
+JWT revocation: per-token (``jti``) entries and per-user "tokens issued
+before" watermarks.
+
+Revocations live in Redis with a TTL equal to the longest token lifetime and
+are also appended to a Redis stream.  Each process keeps a Bloom filter of
+revoked jtis / user ids, fed from that stream at most once per
+``JWT_REVOCATION_SYNC_SECONDS``.  A token whose jti and user are both absent
+from the filter is known not to be revoked without a network call; only
+filter hits (real revocations or false positives) are confirmed in Redis.
+Other processes see a revocation after at most one sync interval.
+
+Issue times and user watermarks are compared in seconds to the
+microsecond: ``iat`` only has one-second resolution, so tokens also carry
+``ISSUED_AT_CLAIM`` and a change does not miss tokens issued earlier in the
+same second or revoke the ones issued right after it.
+
+Without ``REDIS_URL`` a per-process in-memory store is used instead.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+from marketon.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'jwt:revoked'
+STREAM_KEY = f'{KEY_PREFIX}:log'
+
+# Issue time in microseconds since the epoch
+ISSUED_AT_CLAIM = 'iat_us'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def max_token_lifetime():
+    return int(max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME).total_seconds())
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over one blake2b digest
+    """
+
+    def __init__(self, capacity=100_000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+def epoch_microseconds(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def now_timestamp():
+    """Current time in seconds, truncated to the microsecond like ``ISSUED_AT_CLAIM``"""
+    return time.time_ns() // 1000 / 1_000_000
+
+
+def issued_at(token):
+    """Issue time in seconds; whole seconds for tokens without ``ISSUED_AT_CLAIM``"""
+    precise = token.get(ISSUED_AT_CLAIM)
+    return precise / 1_000_000 if precise is not None else token.get('iat')
+
+
+def _jti_member(jti):
+    return f'j:{jti}'
+
+
+def _user_member(user_id):
+    return f'u:{user_id}'
+
+
+class LocalRevocationStore:
+    """
+    In-process store used when Redis isn't configured
+    """
+
+    def __init__(self):
+        self._jtis = {}
+        self._watermarks = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        for table in (self._jtis, self._watermarks):
+            for key in [key for key, (_, expires) in table.items() if expires <= now]:
+                del table[key]
+
+    def revoke_token(self, jti, expires_at):
+        now = time.time()
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._purge(now)
+            self._jtis[jti] = (True, expires_at)
+
+    def revoke_user(self, user_id, issued_before=None):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._watermarks[str(user_id)] = (issued_before or now_timestamp(), now + max_token_lifetime())
+
+    def is_revoked(self, jti, user_id, issued_at):
+        now = time.time()
+        with self._lock:
+            entry = self._jtis.get(jti)
+            if entry and entry[1] > now:
+                return True
+            watermark = self._watermarks.get(str(user_id))
+            return bool(watermark and watermark[1] > now and issued_at is not None
+                        and issued_at < watermark[0])
+
+
+class RedisRevocationStore:
+    """
+    Redis-backed store with a per-process Bloom filter in front
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.sync_interval = getattr(settings, 'JWT_REVOCATION_SYNC_SECONDS', 1.0)
+        self.capacity = getattr(settings, 'JWT_REVOCATION_BLOOM_CAPACITY', 100_000)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._bloom = BloomFilter(self.capacity)
+        self._last_id = '0-0'
+        self._last_sync = 0.0
+        # Rebuilding drops entries that have expired from Redis
+        self._rebuild_at = time.monotonic() + max_token_lifetime()
+
+    def _log(self, pipe, member):
+        min_id = int((time.time() - max_token_lifetime()) * 1000)
+        pipe.xadd(STREAM_KEY, {'m': member}, minid=min_id, approximate=True)
+
+    def revoke_token(self, jti, expires_at):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        pipe = self.client.pipeline()
+        pipe.set(f'{KEY_PREFIX}:jti:{jti}', 1, ex=ttl)
+        self._log(pipe, _jti_member(jti))
+        pipe.execute()
+        self._bloom.add(_jti_member(jti))
+
+    def revoke_user(self, user_id, issued_before=None):
+        pipe = self.client.pipeline()
+        pipe.set(f'{KEY_PREFIX}:user:{user_id}', repr(issued_before or now_timestamp()),
+                 ex=max_token_lifetime())
+        self._log(pipe, _user_member(user_id))
+        pipe.execute()
+        self._bloom.add(_user_member(user_id))
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if not force and now - self._last_sync < self.sync_interval:
+                return
+            if now >= self._rebuild_at:
+                self._reset()
+            try:
+                while True:
+                    entries = self.client.xrange(STREAM_KEY, min=f'({self._last_id}', count=1000)
+                    for entry_id, fields in entries:
+                        self._bloom.add(fields[b'm'].decode())
+                        self._last_id = entry_id.decode()
+                    if len(entries) < 1000:
+                        break
+            except Exception:
+                logger.warning('JWT revocation sync failed; using the previous filter', exc_info=True)
+            self._last_sync = now
+
+    def is_revoked(self, jti, user_id, issued_at):
+        self.sync()
+        jti_hit = jti is not None and _jti_member(jti) in self._bloom
+        user_hit = user_id is not None and _user_member(user_id) in self._bloom
+        if not (jti_hit or user_hit):
+            return False
+        try:
+            pipe = self.client.pipeline()
+            pipe.exists(f'{KEY_PREFIX}:jti:{jti}')
+            pipe.get(f'{KEY_PREFIX}:user:{user_id}')
+            revoked_jti, watermark = pipe.execute()
+        except Exception:
+            # A filter hit we can't confirm is treated as revoked
+            logger.warning('JWT revocation lookup failed', exc_info=True)
+            return True
+        if revoked_jti:
+            return True
+        return bool(watermark is not None and issued_at is not None and issued_at < float(watermark))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                client = get_redis()
+                _store = RedisRevocationStore(client) if client is not None else LocalRevocationStore()
+    return _store
+
+
+def reset_store():
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def revoke_token(token):
+    """Revoke a single validated token until it expires."""
+    get_store().revoke_token(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+def revoke_user_tokens(user_id, issued_before=None):
+    """Revoke every token issued to the user before ``issued_before`` seconds (default: now)."""
+    get_store().revoke_user(user_id, issued_before)
+
+
+def is_token_revoked(token):
+    return get_store().is_revoked(
+        token.get(api_settings.JTI_CLAIM),
+        token.get(api_settings.USER_ID_CLAIM),
+        issued_at(token),
+    )
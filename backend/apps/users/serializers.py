@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer as BaseTokenRefreshSerializer
+)
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import ISSUED_AT_CLAIM, epoch_microseconds, is_token_revoked
+
+User = get_user_model()
+
+
+class MarketonRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims API views authorize with, so requests
+    authenticated with the derived access token never load the user row.
+    Access tokens copy these claims from the refresh token.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['email'] = user.email
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        return token
+
+    def set_iat(self, claim='iat', at_time=None):
+        # Also called when a refresh rotates the token; access tokens copy both claims
+        super().set_iat(claim, at_time)
+        if claim == 'iat':
+            self.payload[ISSUED_AT_CLAIM] = epoch_microseconds(at_time or self.current_time)
+
+
+def token_response(user, refresh=None):
+    refresh = refresh or MarketonRefreshToken.for_user(user)
+    access = str(refresh.access_token)
+    # 'token' / 'refresh_token' are the names the web client already uses
+    return {
+        'access': access,
+        'refresh': str(refresh),
+        'token': access,
+        'refresh_token': str(refresh),
+        'user': UserSerializer(user).data,
+    }
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'email', 'first_name', 'last_name',
+            'phone_number', 'birth_date', 'profile_image', 'date_joined'
+        ]
+        read_only_fields = ['id', 'username', 'date_joined']
+
+
+class LoginSerializer(TokenObtainPairSerializer):
+    token_class = MarketonRefreshToken
+
+    def validate(self, attrs):
+        super().validate(attrs)
+        return token_response(self.user)
+
+
+class RegisterSerializer(serializers.ModelSerializer):
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+    password_confirm = serializers.CharField(write_only=True, style={'input_type': 'password'})
+
+    class Meta:
+        model = User
+        fields = ['username', 'email', 'password', 'password_confirm', 'phone_number']
+
+    def validate(self, attrs):
+        if attrs['password'] != attrs.pop('password_confirm'):
+            raise serializers.ValidationError({'password_confirm': 'Passwords do not match.'})
+        validate_password(attrs['password'], user=User(username=attrs['username'], email=attrs['email']))
+        return attrs
+
+    def create(self, validated_data):
+        return User.objects.create_user(**validated_data)
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Accepts ``refresh`` or the web client's ``refresh_token`` field
+    """
+    refresh = serializers.CharField(required=False)
+    refresh_token = serializers.CharField(required=False, write_only=True)
+    token_class = MarketonRefreshToken
+
+    def validate(self, attrs):
+        attrs['refresh'] = attrs.get('refresh') or attrs.pop('refresh_token', None)
+        if not attrs['refresh']:
+            raise serializers.ValidationError({'refresh': 'This field is required.'})
+        if is_token_revoked(self.token_class(attrs['refresh'])):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+        data = super().validate(attrs)
+        data['token'] = data['access']
+        if 'refresh' in data:
+            data['refresh_token'] = data['refresh']
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+    refresh_token = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        raw = attrs.get('refresh') or attrs.get('refresh_token')
+        attrs['refresh'] = None
+        if raw:
+            try:
+                attrs['refresh'] = MarketonRefreshToken(raw)
+            except TokenError:
+                raise serializers.ValidationError({'refresh': 'Token is invalid or expired'})
+        return attrs
+
+
+class PasswordChangeSerializer(serializers.Serializer):
+    old_password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+    new_password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+
+    def validate(self, attrs):
+        user = self.context['user']
+        if not user.check_password(attrs['old_password']):
+            raise serializers.ValidationError({'old_password': 'Wrong password.'})
+        validate_password(attrs['new_password'], user=user)
+        return attrs
@@ -0,0 +1,21 @@
+"""
+Revoke a user's tokens when the claims copied into them change.
+
+Access and refresh tokens carry ``is_staff`` / ``is_superuser`` and are
+honoured without loading the user row, and a refresh never reloads it either.
+Deactivating, demoting or promoting a user therefore revokes every token
+issued so far; the user signs in again to get tokens with the new claims.
+Queryset ``update()`` calls bypass this and must revoke explicitly.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User
+from .revocation import revoke_user_tokens
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_claim_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw or not instance.token_claims_changed():
+        return
+    revoke_user_tokens(instance.pk)
@@ -1,3 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock, skipUnless
+
+from django.conf import settings
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from marketon.redis import get_redis
+from .models import User
+from .revocation import BloomFilter, RedisRevocationStore, reset_store
+from .serializers import MarketonRefreshToken, token_response
+
+
+def issued_at(user, moment):
+    with mock.patch('rest_framework_simplejwt.tokens.aware_utcnow', return_value=moment):
+        return token_response(user)
+
+
+def issued_earlier(user, seconds=10):
+    """A token pair issued ``seconds`` ago"""
+    with mock.patch('rest_framework_simplejwt.tokens.aware_utcnow',
+                    return_value=aware_utcnow() - timedelta(seconds=seconds)):
+        return token_response(user)
+
+
+class BloomFilterTests(TestCase):
+    def test_members_and_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for n in range(1000):
+            bloom.add(f'j:{n}')
+        self.assertTrue(all(f'j:{n}' in bloom for n in range(1000)))
+        false_positives = sum(f'u:{n}' in bloom for n in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTests(TestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        reset_store()
+        self.addCleanup(reset_store)
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'Old-secret-pass-1')
+
+    def refresh(self, tokens):
+        return self.client.post(reverse('users:token_refresh'), {'refresh': tokens['refresh']}, format='json')
+
+    def profile(self, tokens):
+        return self.client.get(reverse('users:profile'), HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def test_logout_revokes_access_and_refresh_token(self):
+        tokens = token_response(self.user)
+        other = token_response(self.user)
+        response = self.client.post(
+            reverse('users:logout'), {'refresh': tokens['refresh']}, format='json',
+            HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(tokens).status_code, 401)
+        self.assertEqual(self.profile(tokens).status_code, 401)
+        # Other sessions of the same user stay signed in
+        self.assertEqual(self.profile(other).status_code, 200)
+        self.assertEqual(self.refresh(other).status_code, 200)
+
+    def test_logout_rejects_another_users_refresh_token(self):
+        other_user = User.objects.create_user('other', 'other@example.com', 'Other-secret-pass-1')
+        for claim in ('user_id', 'uid'):
+            # Modules hold the settings object, so override_settings(SIMPLE_JWT=...) wouldn't reach them
+            with self.subTest(claim=claim), mock.patch.object(jwt_settings, 'USER_ID_CLAIM', claim):
+                tokens, other = token_response(self.user), token_response(other_user)
+                response = self.client.post(
+                    reverse('users:logout'), {'refresh': other['refresh']}, format='json',
+                    HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(self.refresh(other).status_code, 200)
+
+                response = self.client.post(
+                    reverse('users:logout'), {'refresh': tokens['refresh']}, format='json',
+                    HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_password_change_revokes_earlier_tokens(self):
+        old = issued_earlier(self.user)
+        response = self.client.post(
+            reverse('users:password_change'),
+            {'old_password': 'Old-secret-pass-1', 'new_password': 'New-secret-pass-2'}, format='json',
+            HTTP_AUTHORIZATION=f"Bearer {old['access']}",
+        )
+        self.assertEqual(response.status_code, 200)
+        new = response.json()
+        self.assertEqual(self.refresh(old).status_code, 401)
+        self.assertEqual(self.profile(old).status_code, 401)
+        self.assertEqual(self.profile(new).status_code, 200)
+        self.assertEqual(self.refresh(new).status_code, 200)
+
+
+@skipUnless(getattr(settings, 'REDIS_URL', ''), 'needs a Redis server (REDIS_URL)')
+class RedisRevocationStoreTests(TestCase):
+    """Revocations reach other processes through the Redis stream"""
+
+    def test_revocation_is_seen_by_another_process(self):
+        user = User.objects.create_user('buyer', 'buyer@example.com', 'Old-secret-pass-1')
+        token = MarketonRefreshToken.for_user(user)
+        writer, reader = RedisRevocationStore(get_redis()), RedisRevocationStore(get_redis())
+        args = (token['jti'], user.pk, token['iat'])
+        reader.sync(force=True)
+        self.assertFalse(reader.is_revoked(*args))
+        writer.revoke_token(token['jti'], token['exp'])
+        reader.sync(force=True)
+        self.assertTrue(reader.is_revoked(*args))
+
+
+class TokenClaimChangeTests(TestCase):
+    """Tokens carry is_staff / is_superuser, so changing them revokes the old tokens"""
+    client_class = APIClient
+
+    def setUp(self):
+        reset_store()
+        self.addCleanup(reset_store)
+        self.user = User.objects.create_user('staff', 'staff@example.com', 'staff-password', is_staff=True)
+        self.tokens = token_response(self.user)
+
+    def refresh(self):
+        return self.client.post(reverse('users:token_refresh'), {'refresh': self.tokens['refresh']}, format='json')
+
+    def profile(self):
+        return self.client.get(reverse('users:profile'), HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def test_demotion_revokes_tokens(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.is_staff = False
+        user.save()
+        self.assertEqual(self.refresh().status_code, 401)
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_deactivation_revokes_tokens(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        self.assertEqual(self.refresh().status_code, 401)
+
+    def test_change_time_is_precise_within_the_second(self):
+        second = datetime.now(timezone.utc).replace(microsecond=0)
+        before = issued_at(self.user, second + timedelta(microseconds=250_000))
+        user = User.objects.get(pk=self.user.pk)
+        user.is_staff = False
+        with mock.patch('apps.users.revocation.now_timestamp', return_value=second.timestamp() + 0.5):
+            user.save()
+        after = issued_at(user, second + timedelta(microseconds=750_000))
+        self.tokens = before
+        self.assertEqual(self.profile().status_code, 401)
+        self.tokens = after
+        self.assertEqual(self.profile().status_code, 200)
+        # The rotated / derived tokens keep the refresh token's issue time
+        response = self.refresh()
+        self.assertEqual(response.status_code, 200)
+        self.tokens = response.json()
+        self.assertEqual(self.profile().status_code, 200)
 
-# Create your tests here.
+    def test_other_changes_keep_tokens(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Kim'
+        user.save()
+        self.assertEqual(self.refresh().status_code, 200)
+        self.assertEqual(self.profile().status_code, 200)
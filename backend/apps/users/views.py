@@ -1,57 +1,104 @@
-from django.shortcuts import render
+from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt import views as jwt_views
+from rest_framework_simplejwt.settings import api_settings
 
+from marketon.throttling import LoadSheddingMixin, SlidingWindowThrottle
 
-# Create your views here.
+from .revocation import revoke_token, revoke_user_tokens
+from .serializers import (
+    LoginSerializer, LogoutSerializer, PasswordChangeSerializer, RegisterSerializer,
+    TokenRefreshSerializer, UserSerializer, token_response
+)
 
+User = get_user_model()
 
-class LoginView(APIView):
-    permission_classes = [AllowAny]
-    
-    def post(self, request):
-        # Mock login response
-        return Response({
-            'message': 'Login endpoint - Mock implementation',
-            'token': 'mock_jwt_token_12345'
-        }, status=status.HTTP_200_OK)
+
+class LoginView(LoadSheddingMixin, jwt_views.TokenObtainPairView):
+    """
+    Username / password login returning an access and refresh token pair.
+    Password hashing is CPU-heavy, so login is rate limited per IP and capped
+    in concurrency.
+    """
+    serializer_class = LoginSerializer
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'login'
+    throttle_key = 'ip'
 
 
-class RegisterView(APIView):
+class RegisterView(LoadSheddingMixin, APIView):
     permission_classes = [AllowAny]
-    
+    authentication_classes = []
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'register'
+    throttle_key = 'ip'
+
     def post(self, request):
-        # Mock registration response
-        return Response({
-            'message': 'Registration endpoint - Mock implementation',
-            'user_id': 1
-        }, status=status.HTTP_201_CREATED)
+        serializer = RegisterSerializer(data=request.data)
+        if serializer.is_valid():
+            user = serializer.save()
+            return Response(token_response(user), status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class ProfileView(APIView):
+    """
+    The profile is the one endpoint that needs the full user row
+    """
     permission_classes = [IsAuthenticated]
-    
+
     def get(self, request):
-        # Mock profile response
-        return Response({
-            'message': 'Profile endpoint - Mock implementation',
-            'user': {
-                'id': 1,
-                'username': 'mock_user',
-                'email': 'user@example.com'
-            }
-        }, status=status.HTTP_200_OK)
-
-
-class TokenRefreshView(APIView):
-    permission_classes = [AllowAny]
-    
+        user = User.objects.get(pk=request.user.pk)
+        return Response({'user': UserSerializer(user).data}, status=status.HTTP_200_OK)
+
+    def patch(self, request):
+        user = User.objects.get(pk=request.user.pk)
+        serializer = UserSerializer(user, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({'user': serializer.data}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class LogoutView(APIView):
+    """
+    Revoke the current access token and, if given, the refresh token
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data['refresh']
+        if refresh is not None and str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({'refresh': 'Token belongs to another user'}, status=status.HTTP_400_BAD_REQUEST)
+
+        revoke_token(request.auth)
+        if refresh is not None:
+            revoke_token(refresh)
+        return Response({'message': 'Logged out'}, status=status.HTTP_200_OK)
+
+
+class PasswordChangeView(LoadSheddingMixin, APIView):
+    """
+    Change the password and revoke every token issued before the change
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'login'
+
     def post(self, request):
-        # Mock token refresh response
-        return Response({
-            'message': 'Token refresh endpoint - Mock implementation',
-            'new_token': 'mock_refreshed_token_67890'
-        }, status=status.HTTP_200_OK)
+        user = User.objects.get(pk=request.user.pk)
+        serializer = PasswordChangeSerializer(data=request.data, context={'user': user})
+        serializer.is_valid(raise_exception=True)
+        user.set_password(serializer.validated_data['new_password'])
+        user.save(update_fields=['password'])
+        revoke_user_tokens(user.pk)
+        return Response(token_response(user), status=status.HTTP_200_OK)
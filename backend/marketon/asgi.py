@@ -13,4 +13,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'marketon.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Build the product suggestion index in the background once apps are loaded,
+# and start writing buffered product view / cart counters
+from apps.products import live  # noqa: E402
+from apps.products.counters import start_flusher  # noqa: E402
+from apps.products.suggestions import warm_index  # noqa: E402
+
+warm_index()
+start_flusher()
+
+
+async def application(scope, receive, send):
+    # Live product streams stay open indefinitely; serve them outside Django's
+    # handler so an idle stream does not hold a thread
+    if scope['type'] == 'http' and scope['path'] == live.PATH:
+        return await live.app(scope, receive, send)
+    return await django_application(scope, receive, send)
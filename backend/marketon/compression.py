@@ -0,0 +1,88 @@
+"""
+Response compression for API payloads.
+
+Compresses JSON / MessagePack / text responses of at least
+``COMPRESSION_MIN_SIZE`` bytes with brotli when the client accepts it and the
+``brotli`` package is installed, otherwise gzip.  Small bodies are sent as
+they are: below about a kilobyte the encoding overhead outweighs the savings.
+"""
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/msgpack',
+    'application/javascript',
+    'text/',
+)
+
+_accepts_br = re.compile(r'\bbr\b(?!;\s*q=0(\.0*)?\b)')
+_accepts_gzip = re.compile(r'\bgzip\b(?!;\s*q=0(\.0*)?\b)')
+
+
+def choose_encoding(accept_encoding):
+    if brotli is not None and _accepts_br.search(accept_encoding):
+        return 'br'
+    if _accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        # The body differs by Accept-Encoding even when it isn't compressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(response.content, compresslevel=self.gzip_level, mtime=0)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed body is a different byte sequence than the ETag names
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,136 @@
+"""
+Primary / read-replica routing with read-your-writes stickiness.
+
+Reads go to a replica only when a view opts in through ``ReplicaReadMixin``
+for one of its safe actions; everything else, and anything inside a
+transaction on the primary, stays on ``default``.  After a request writes to
+the primary, ``ReplicaPinningMiddleware`` pins that user (or client IP) to
+the primary for ``REPLICA_PIN_SECONDS`` so they read their own writes while
+the replicas catch up.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+# Per-request mutable state, so writes seen from worker threads (ASGI) count too
+_request_state = ContextVar('db_request_state', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if (replicas and _read_from_replica.get()
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def pin_key(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'db:pin:user:{user.pk}'
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    address = forwarded.split(',')[0].strip() if forwarded else request.META.get('REMOTE_ADDR')
+    return f'db:pin:ip:{address}'
+
+
+def is_pinned(request):
+    return bool(cache.get(pin_key(request)))
+
+
+async def ais_pinned(request):
+    return bool(await cache.aget(pin_key(request)))
+
+
+@contextmanager
+def replica_reads():
+    """Route reads in the block (and in threads started from it) to a replica."""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pin the client to the primary after a request that wrote to it
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = {'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state['wrote'] and replica_aliases():
+            # DRF stores the authenticated user on the Django request too
+            cache.set(pin_key(request), 1, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        state = {'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state['wrote'] and replica_aliases():
+            await cache.aset(pin_key(request), 1, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Serve ``replica_actions`` (viewset actions, or lower-case HTTP methods on
+    plain APIViews) from a replica unless the client is pinned to the primary.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, 'action', None) or request.method.lower()
+        if (replica_aliases() and request.method in SAFE_METHODS
+                and action in self.replica_actions and not is_pinned(request)):
+            self._replica_token = _read_from_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_from_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
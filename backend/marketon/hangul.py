@@ -0,0 +1,79 @@
+"""
+Hangul search keys.
+
+Users type Korean names as initial consonants only ("ㅅㅍ" for 샴푸) or stop in
+the middle of a syllable ("샴ㅍ", "괘" on the way to 괜찮은).  Neither matches
+the stored text, so searchable names also get two derived keys:
+
+``jamo``
+    Every syllable split into compatibility jamo, with double finals and
+    compound vowels split into the keys that type them (닭 -> ㄷㅏㄹㄱ,
+    괜 -> ㄱㅗㅐㄴ).  A partially typed query is then a substring of the key.
+``chosung``
+    The initial consonant of every syllable (샴푸 세트 -> ㅅㅍㅅㅌ).
+
+Both are NFKC normalized and casefolded; ``search_keys`` also drops whitespace
+so "샴푸세트" and "샴푸 세트" match each other.  Other characters are kept as is.
+"""
+import unicodedata
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+            'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_COUNT = 11172
+
+# Compound jamo typed as two keys on a standard (2-set) keyboard
+_SPLIT = str.maketrans({
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+})
+
+
+# NFKC turns compatibility jamo (what keyboards type) into conjoining jamo;
+# map the ones that stay uncomposed back
+_COMPATIBILITY = str.maketrans({
+    unicodedata.normalize('NFKC', chr(code)): chr(code)
+    for code in range(0x3131, 0x3164)
+})
+
+
+def normalize(text):
+    """NFKC (also composes NFD input, e.g. from macOS) and casefold, single spaces."""
+    text = unicodedata.normalize('NFKC', text or '').translate(_COMPATIBILITY)
+    return ' '.join(text.casefold().split())
+
+
+def jamo(text):
+    parts = []
+    for char in normalize(text):
+        code = ord(char) - SYLLABLE_BASE
+        if 0 <= code < SYLLABLE_COUNT:
+            parts.append(CHOSUNG[code // 588])
+            parts.append(JUNGSUNG[code % 588 // 28])
+            parts.append(JONGSUNG[code % 28])
+        else:
+            parts.append(char)
+    return ''.join(parts).translate(_SPLIT)
+
+
+def chosung(text):
+    parts = []
+    for char in normalize(text):
+        code = ord(char) - SYLLABLE_BASE
+        parts.append(CHOSUNG[code // 588] if 0 <= code < SYLLABLE_COUNT else char)
+    return ''.join(parts)
+
+
+def is_chosung(text):
+    """Whether ``text`` is initial consonants only ("ㅅㅍ", "ㅅㅍ ㅅㅌ")."""
+    letters = normalize(text).replace(' ', '')
+    return bool(letters) and all(char in CHOSUNG for char in letters)
+
+
+def search_keys(text):
+    """``(jamo, chosung)`` of ``text`` without whitespace."""
+    return jamo(text).replace(' ', ''), chosung(text).replace(' ', '')
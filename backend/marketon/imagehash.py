@@ -0,0 +1,138 @@
+"""
+Perceptual image hashes and a BK-tree for near-duplicate lookups.
+
+``average_hash`` (aHash) and ``difference_hash`` (dHash) are 64-bit
+fingerprints of an 8x8 / 9x8 grayscale thumbnail, so re-encoded, resized or
+lightly edited copies of a photo differ in only a few bits.  The image is
+decoded at reduced size (JPEG draft mode), which makes hashing an upload
+far cheaper than a full decode.
+
+Hashes are stored as signed 64-bit integers (``BigIntegerField``); use
+``to_signed`` / ``to_unsigned`` at the boundary.
+"""
+from PIL import Image
+
+HASH_SIZE = 8
+
+
+def grayscale(image, size=64):
+    """Grayscale copy no larger than needed for hashing."""
+    # JPEG: let the decoder scale by 1/2..1/8 instead of decoding full size
+    image.draft('L', (size, size))
+    image = image.convert('L')
+    if max(image.size) > size:
+        image.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return image
+
+
+def _bits(values):
+    result = 0
+    for value in values:
+        result = (result << 1) | bool(value)
+    return result
+
+
+def average_hash(gray):
+    pixels = list(gray.resize((HASH_SIZE, HASH_SIZE), Image.Resampling.BILINEAR).getdata())
+    mean = sum(pixels) / len(pixels)
+    return _bits(pixel > mean for pixel in pixels)
+
+
+def difference_hash(gray):
+    width = HASH_SIZE + 1
+    pixels = list(gray.resize((width, HASH_SIZE), Image.Resampling.BILINEAR).getdata())
+    return _bits(
+        pixels[row * width + col] < pixels[row * width + col + 1]
+        for row in range(HASH_SIZE) for col in range(HASH_SIZE)
+    )
+
+
+def hash_file(file):
+    """``(ahash, dhash)`` as signed integers, or ``(None, None)`` if it isn't a readable image."""
+    try:
+        position = file.tell()
+    except (AttributeError, OSError, ValueError):
+        position = None
+    try:
+        with Image.open(file) as image:
+            gray = grayscale(image)
+        return to_signed(average_hash(gray)), to_signed(difference_hash(gray))
+    except Exception:
+        return None, None
+    finally:
+        if position is not None:
+            file.seek(position)
+
+
+def to_signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a, b):
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance.
+
+    A query for everything within ``k`` of a hash only descends into children
+    whose edge distance is within ``k`` of the query's distance to the node
+    (triangle inequality), so small ``k`` visits a small part of the tree.
+    Items with the same hash share a node.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        value = to_unsigned(value)
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def discard(self, value, item):
+        """Remove ``item`` (nodes stay, so the tree keeps its shape)."""
+        value = to_unsigned(value)
+        node = self.root
+        while node is not None:
+            distance = (node[0] ^ value).bit_count()
+            if distance == 0:
+                if item in node[1]:
+                    node[1].remove(item)
+                    self.size -= 1
+                return
+            node = node[2].get(distance)
+
+    def search(self, value, k):
+        """``[(distance, item), ...]`` within ``k``, nearest first."""
+        value = to_unsigned(value)
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = (node_value ^ value).bit_count()
+            if distance <= k:
+                found.extend((distance, item) for item in items)
+            for edge, child in children.items():
+                if distance - k <= edge <= distance + k:
+                    stack.append(child)
+        found.sort(key=lambda match: match[0])
+        return found
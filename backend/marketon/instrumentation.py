@@ -0,0 +1,302 @@
+"""
+Per-request performance instrumentation.
+
+``RequestMetricsMiddleware`` measures, for every request, the number of SQL
+queries and the time spent in them (through an execute wrapper on every connection),
+the time spent building serializer ``.data``, the render time and the
+response size.  The figures are sent back in a ``Server-Timing`` header and
+folded into per-view histograms (e.g. ``ProductViewSet.list``) that
+``metrics_view`` exposes in the Prometheus text format.
+
+Histograms are kept per process; with several workers each one is scraped
+separately and the results are summed on the Prometheus side.  Serializer
+time includes any queries issued lazily while serializing, so it overlaps
+with the DB time.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class RequestMetrics:
+    """
+    Figures collected for one request; also the DB execute wrapper
+    """
+    __slots__ = ('view', 'queries', 'db_time', 'serialize_time', 'render_time', '_render_start')
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self._render_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # The last slot counts observations above the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    Per-process histograms keyed by metric name and (view, method)
+    """
+    metrics = {
+        'marketon_request_duration_seconds': ('Request latency', DURATION_BUCKETS),
+        'marketon_request_db_queries': ('SQL queries per request', QUERY_BUCKETS),
+        'marketon_request_db_seconds': ('Time spent in SQL per request', DURATION_BUCKETS),
+        'marketon_request_serialize_seconds': ('Time spent in serializers per request', DURATION_BUCKETS),
+        'marketon_request_render_seconds': ('Time spent rendering the response', DURATION_BUCKETS),
+        'marketon_response_size_bytes': ('Response body size', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in self.metrics}
+        self._responses = {}
+
+    def record(self, labels, status, values):
+        with self._lock:
+            for name, value in values.items():
+                series = self._histograms[name]
+                histogram = series.get(labels)
+                if histogram is None:
+                    histogram = series[labels] = Histogram(self.metrics[name][1])
+                histogram.observe(value)
+            key = labels + (str(status),)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render(self):
+        lines = [
+            '# HELP marketon_responses_total Responses by view, method and status',
+            '# TYPE marketon_responses_total counter',
+        ]
+        with self._lock:
+            for (view, method, status), count in sorted(self._responses.items()):
+                lines.append(f'marketon_responses_total{{{_labels(view, method)},status="{status}"}} {count}')
+            for name, (help_text, buckets) in self.metrics.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (view, method), histogram in sorted(self._histograms[name].items()):
+                    labels = _labels(view, method)
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    cumulative += histogram.counts[-1]
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(view, method):
+    return f'view="{escape_label(view)}",method="{method}"'
+
+
+registry = Registry()
+
+# Extra ``/metrics`` sections: callables returning lines, e.g. gauges read
+# from a queue or a store at scrape time
+collectors = []
+
+
+def register_collector(func):
+    if func not in collectors:
+        collectors.append(func)
+    return func
+
+
+def view_label(view_func):
+    """``ProductViewSet.list`` for DRF views, the function name otherwise."""
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    return cls.__name__
+
+
+def _patch_serializers():
+    """Time top-level ``serializer.data`` (nested fields run inside it)."""
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.data
+    if getattr(data.fget, '_instrumented', False):
+        return
+
+    def timed_data(self):
+        metrics = _current.get()
+        if metrics is None or hasattr(self, '_data'):
+            return data.fget(self)
+        start = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+
+    timed_data._instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+def _execute(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _install(connection, **kwargs):
+    """
+    Add the wrapper to the connection itself rather than for the duration of
+    the request: async ORM queries run on a worker thread's own connections,
+    which the middleware can't reach, while the contextvar follows them there.
+    """
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+def _install_current_thread():
+    for alias in connections:
+        _install(connections[alias])
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure each request and report it in ``Server-Timing`` and ``/metrics``.
+    Place it first in ``MIDDLEWARE`` so the total covers the whole stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _patch_serializers()
+        connection_created.connect(_install, dispatch_uid='marketon.instrumentation')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _install_current_thread()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, time.perf_counter() - start)
+
+    def _finish(self, request, response, metrics, total):
+        size = len(response.content) if not response.streaming else 0
+        view = metrics.view or 'unmatched'
+        registry.record((view, request.method), response.status_code, {
+            'marketon_request_duration_seconds': total,
+            'marketon_request_db_queries': metrics.queries,
+            'marketon_request_db_seconds': metrics.db_time,
+            'marketon_request_serialize_seconds': metrics.serialize_time,
+            'marketon_request_render_seconds': metrics.render_time,
+            'marketon_response_size_bytes': size,
+        })
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serialize;dur={metrics.serialize_time * 1000:.1f}',
+                f'render;dur={metrics.render_time * 1000:.1f}',
+                f'total;dur={total * 1000:.1f};desc="{size} bytes"',
+            ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return None
+        label = view_label(view_func)
+        actions = getattr(view_func, 'actions', None)
+        if actions:
+            # Viewsets: the method name the request is routed to
+            label = f'{label}.{actions.get(request.method.lower(), request.method.lower())}'
+        elif hasattr(view_func, 'cls') or hasattr(view_func, 'view_class'):
+            label = f'{label}.{request.method.lower()}'
+        metrics.view = label
+        return None
+
+    def process_template_response(self, request, response):
+        # Called right before render(); DRF responses are template responses
+        metrics = _current.get()
+        if metrics is not None:
+            metrics._render_start = time.perf_counter()
+            response.add_post_render_callback(self._rendered(metrics))
+        return response
+
+    @staticmethod
+    def _rendered(metrics):
+        def callback(response):
+            metrics.render_time += time.perf_counter() - metrics._render_start
+        return callback
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of this process's histograms
+    """
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', None)
+    if allowed and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    body = registry.render()
+    for collector in collectors:
+        try:
+            lines = collector()
+        except Exception:
+            # A failing source must not hide the request metrics
+            logger.exception('Metrics collector %r failed', collector)
+            continue
+        if lines:
+            body += '\n'.join(lines) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
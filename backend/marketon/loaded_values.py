@@ -0,0 +1,41 @@
+"""
+Remember the field values a model instance was read from the database with.
+
+post_save receivers compare against them to act on what a save changed
+(stock deltas for the rollups, cancelled orders, revoked token claims)
+without another query.  The snapshot is taken again after ``save()``, once
+the receivers have seen the old values, and after ``refresh_from_db()``.
+Deferred fields are not loaded, so they have no loaded value.
+"""
+
+
+class LoadedValuesMixin:
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def _snapshot_loaded_values(self):
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def loaded_value(self, field_name, default=None):
+        """Value of the field when the instance was read from the database."""
+        return getattr(self, '_loaded_values', {}).get(field_name, default)
+
+    def loaded_values_changed(self, *field_names):
+        """Whether any of the fields differs from its loaded value (unloaded fields don't count)."""
+        loaded = getattr(self, '_loaded_values', {})
+        return any(field in loaded and getattr(self, field) != loaded[field] for field in field_names)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_loaded_values()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_loaded_values()
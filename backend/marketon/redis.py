@@ -0,0 +1,32 @@
+"""
+Shared Redis client for state that has to be consistent across worker
+processes (token revocation, throttling, ...).
+
+With ``REDIS_URL`` unset ``get_redis()`` returns ``None`` and callers fall
+back to per-process in-memory state, which is fine for development and tests.
+"""
+import threading
+
+from django.conf import settings
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_redis():
+    global _client
+    url = getattr(settings, 'REDIS_URL', '')
+    if not url:
+        return None
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import redis
+
+                _client = redis.Redis.from_url(
+                    url,
+                    socket_timeout=getattr(settings, 'REDIS_SOCKET_TIMEOUT', 0.5),
+                    socket_connect_timeout=getattr(settings, 'REDIS_SOCKET_TIMEOUT', 0.5),
+                    health_check_interval=30,
+                )
+    return _client
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+import dj_database_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +45,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'corsheaders',
+    'django_filters',
     
     # Custom apps
     'apps.users',
@@ -49,21 +54,39 @@ INSTALLED_APPS = [
     'apps.carts',
     'apps.addresses',
     'apps.upload',
+    'apps.dashboard',
+    'apps.jobs',
+    'apps.benchmarks',
 ]
 
 MIDDLEWARE = [
-    'corsheaders.middleware.CorsMiddleware',  # Must be at the top
+    # Outermost so the request total covers every other middleware
+    'marketon.instrumentation.RequestMetricsMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'marketon.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'marketon.db_router.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'marketon.urls'
 
+# Per-request timings (marketon.instrumentation)
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'True').lower() == 'true'
+
+# Response compression (marketon.compression); brotli is used when installed
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Addresses allowed to scrape /metrics; empty allows everyone
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -85,13 +108,46 @@ WSGI_APPLICATION = 'marketon.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_URL selects the primary (SQLite file by default). Connections are
+# kept open for DATABASE_CONN_MAX_AGE seconds, or pooled by psycopg when
+# DATABASE_POOL is set on PostgreSQL.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': dj_database_url.config(
+        default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
+        conn_max_age=int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        conn_health_checks=True,
+    ),
 }
 
+# Comma separated read replica URLs, exposed as replica_1, replica_2, ...
+# Two SQLite files work as a local stand-in for a primary and a replica.
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dj_database_url.parse(
+        url.strip(),
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=True,
+    )
+    # Tests read replicas through the primary's test database
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+if os.environ.get('DATABASE_POOL', '').lower() in ('1', 'true', 'yes'):
+    for db in DATABASES.values():
+        if db['ENGINE'] == 'django.db.backends.postgresql':
+            db.setdefault('OPTIONS', {})['pool'] = {
+                'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            }
+            # Pooled connections replace persistent ones
+            db['CONN_MAX_AGE'] = 0
+
+DATABASE_ROUTERS = ['marketon.db_router.PrimaryReplicaRouter']
+
+# Seconds a client reads from the primary after writing to it
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -139,6 +195,152 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Django REST framework
+REST_FRAMEWORK = {
+    # Stateless JWT: the user is built from token claims, no session or user query
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'apps.users.authentication.RevocableJWTAuthentication',
+    ],
+    # orjson for JSON; MessagePack when the client sends Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'marketon.renderers.ORJSONRenderer',
+        'marketon.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'marketon.renderers.ORJSONParser',
+        'marketon.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Rates for marketon.throttling.SlidingWindowThrottle, keyed by throttle_scope
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'register': '5/min',
+        'upload': '30/min',
+        'media_list': '120/min',
+        'media_info': '60/min',
+    },
+}
+
+# In-flight request cap per process for LoadSheddingMixin views, keyed by throttle_scope
+CONCURRENCY_LIMITS = {
+    'login': 4,
+    'register': 2,
+    'upload': 4,
+    'media_list': 8,
+    'media_info': 2,
+}
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+    'UPDATE_LAST_LOGIN': False,
+}
+
+# Redis shared by worker processes (token revocation, ...).
+# Empty means per-process in-memory fallbacks.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Revoked tokens reach other processes' Bloom filters within this interval
+JWT_REVOCATION_SYNC_SECONDS = 1.0
+JWT_REVOCATION_BLOOM_CAPACITY = 100_000
+
+# Postal code index (apps.addresses)
+# POSTAL_DATASET_PATH can point at a full road name address export; the
+# compiled index is memory-mapped by every worker process.
+POSTAL_DATASET_PATH = None
+POSTAL_INDEX_PATH = BASE_DIR / 'var' / 'postal_index.bin'
+
+# Near-duplicate image detection (apps.upload.duplicates): default and
+# largest Hamming distance between dHashes, and how often each process
+# rebuilds its in-memory index
+IMAGE_DUPLICATE_DISTANCE = 6
+IMAGE_DUPLICATE_MAX_DISTANCE = 16
+IMAGE_HASH_INDEX_TTL = 10 * 60
+
+# Carts (apps.carts)
+CART_TTL_SECONDS = 7 * 24 * 60 * 60
+STOCK_RESERVATION_TTL_SECONDS = 15 * 60
+
+# Products inactive for this long are moved to the archive tables
+# (`manage.py archive_products`); they stay retrievable by id
+PRODUCT_ARCHIVE_AFTER_DAYS = 365
+# Bulk stock/price sync (POST /api/products/bulk-sync/): rows per request,
+# and rows per bulk_update statement
+PRODUCT_BULK_SYNC_MAX_ROWS = 10_000
+PRODUCT_BULK_SYNC_CHUNK = 500
+# Change feed (GET /api/products/?updated_since=<cursor>)
+PRODUCT_FEED_PAGE_SIZE = 500
+PRODUCT_FEED_MAX_PAGE_SIZE = 2000
+# Changes newer than this are held back a request, so rows committed late
+# with an earlier updated_at are not skipped
+PRODUCT_FEED_LAG_SECONDS = 2
+# Deletion records are kept this long; older cursors restart from scratch
+PRODUCT_TOMBSTONE_KEEP_DAYS = 90
+# Search-as-you-type (GET /api/products/suggest/?q=, apps.products.suggestions):
+# suggestions per response, sales window used for ranking, how often a worker
+# pulls other workers' changes, and how often it rebuilds (re-ranks) the index
+PRODUCT_SUGGEST_LIMIT = 10
+PRODUCT_SUGGEST_MAX_LIMIT = 50
+PRODUCT_SUGGEST_POPULARITY_DAYS = 30
+PRODUCT_SUGGEST_REFRESH_SECONDS = 5
+PRODUCT_SUGGEST_REBUILD_SECONDS = 10 * 60
+# Live stock/price push (GET /api/v2/products/live/?ids=, apps.products.live):
+# changes to one product within the window are sent once, idle streams get a
+# comment line this often, and each stream / process has an upper bound
+PRODUCT_LIVE_COALESCE_SECONDS = 0.25
+PRODUCT_LIVE_KEEPALIVE_SECONDS = 20
+PRODUCT_LIVE_RETRY_MS = 3000
+PRODUCT_LIVE_MAX_IDS = 100
+PRODUCT_LIVE_MAX_SUBSCRIBERS = 10_000
+# Product popularity (apps.products.counters): views and cart adds are counted
+# in process memory and added to ProductStats this often; each event adds its
+# weight to a score that halves every PRODUCT_POPULARITY_HALF_LIFE_DAYS
+# (?ordering=popular, GET /api/products/trending/)
+PRODUCT_COUNTERS_FLUSH_SECONDS = 10
+PRODUCT_POPULARITY_HALF_LIFE_DAYS = 7
+PRODUCT_POPULARITY_WEIGHTS = {'views': 1, 'cart_adds': 5}
+PRODUCT_TRENDING_LIMIT = 20
+PRODUCT_TRENDING_MAX_LIMIT = 100
+# Catalog snapshot bundles (apps.products.snapshots), written under MEDIA_ROOT;
+# replaced bundles stay downloadable this long
+CATALOG_SNAPSHOT_DIR = 'snapshots'
+CATALOG_SNAPSHOT_KEEP_SECONDS = 60 * 60
+# "Customers also bought" (apps.products.recommendations). The co-purchase
+# matrix is refreshed incrementally from new orders; when the file is missing
+# (e.g. a different job host) it is rebuilt from all orders.
+RECOMMENDATIONS_MATRIX_PATH = BASE_DIR / 'var' / 'copurchase.npz'
+RECOMMENDATIONS_TOP_K = 20
+RECOMMENDATIONS_MIN_ORDERS = 1
+# Orders newer than this wait for the next refresh, so late commits aren't skipped
+RECOMMENDATIONS_LAG_SECONDS = 60
+
+# Background jobs (apps.jobs, run with `manage.py run_jobs`)
+# 'database' (Job table) or 'redis' (needs REDIS_URL)
+JOBS_BACKEND = os.environ.get('JOBS_BACKEND', 'database')
+JOBS_CONCURRENCY = int(os.environ.get('JOBS_CONCURRENCY', 4))
+JOBS_POLL_SECONDS = 1.0
+# A worker that stops renewing its jobs' lease for this long is presumed dead
+JOBS_LEASE_SECONDS = 10 * 60
+# Finished jobs are pruned after this long
+JOBS_KEEP_SECONDS = 7 * 24 * 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,362 @@
+import random
+from datetime import datetime, timezone as dt_timezone
+from io import BytesIO
+from unittest import mock
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.fields import DateTimeField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.orders.models import Order
+from apps.products.models import Product
+from . import instrumentation, throttling
+from .db_router import PrimaryReplicaRouter, replica_reads
+from .imagehash import BKTree, hamming, hash_file, to_signed, to_unsigned
+from .instrumentation import Registry
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .throttling import LoadSheddingMixin, LocalWindowStore, SlidingWindowThrottle, get_limiter
+
+User = get_user_model()
+
+REPLICA = 'replica_1'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Reads go to replica_1, a second connection to the test database (the
+    TEST MIRROR that settings give every replica).  TransactionTestCase
+    because that connection only sees committed rows.
+    """
+    client_class = APIClient
+
+    @classmethod
+    def setUpClass(cls):
+        # Not a class attribute: the test runner only sets up databases that exist
+        if REPLICA not in connections.settings:
+            # No DATABASE_REPLICA_URLS: mirror the test database the same way
+            connections.settings[REPLICA] = connections.settings[DEFAULT_DB_ALIAS]
+            cls.addClassCleanup(connections.settings.pop, REPLICA)
+            cls.addClassCleanup(connections[REPLICA].close)
+        cls.databases = {DEFAULT_DB_ALIAS, REPLICA}
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        self.product = Product.objects.create(
+            name='Product', description='', price=1000, stock=5, category='books', created_by=self.user,
+        )
+        self.client.force_authenticate(self.user)
+
+    def aliases(self, method, url, **kwargs):
+        """Aliases that ran a query for the request"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 300, response.content)
+        return {alias for alias, queries in ((DEFAULT_DB_ALIAS, primary), (REPLICA, replica)) if queries}
+
+    def test_safe_reads_use_the_replica(self):
+        urls = [
+            reverse('products:product-list'),
+            reverse('products:product-detail', args=[self.product.pk]),
+            reverse('products:product-search') + '?search=Prod',
+            reverse('products:product-categories'),
+            reverse('orders:order_list'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.aliases('get', url), {REPLICA})
+
+    def test_client_is_pinned_to_the_primary_after_a_write(self):
+        list_url = reverse('products:product-list')
+        self.assertEqual(self.aliases('get', list_url), {REPLICA})
+        self.assertIn(DEFAULT_DB_ALIAS, self.aliases(
+            'post', reverse('orders:order_create'),
+            data={'items': [{'product_id': self.product.pk, 'quantity': 1}]}, format='json',
+        ))
+        self.assertEqual(self.aliases('get', list_url), {DEFAULT_DB_ALIAS})
+
+        # Other clients keep reading from the replica
+        self.client.force_authenticate(User.objects.create_user('other', 'other@example.com', 'other-password'))
+        self.assertEqual(self.aliases('get', list_url), {REPLICA})
+
+    def test_writes_and_transactions_use_the_primary(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Product), REPLICA)
+            self.assertEqual(router.db_for_write(Product), DEFAULT_DB_ALIAS)
+            with transaction.atomic():
+                # Read-modify-write must see the primary's rows
+                self.assertEqual(router.db_for_read(Product), DEFAULT_DB_ALIAS)
+                with CaptureQueriesContext(connections[REPLICA]) as replica:
+                    Order.objects.count()
+                self.assertEqual(len(replica), 0)
+
+
+class ThrottledView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [SlidingWindowThrottle]
+    throttle_scope = 'test'
+
+    def get(self, request):
+        return Response({'ok': True})
+
+
+class SheddingView(LoadSheddingMixin, ThrottledView):
+    throttle_classes = []
+    max_concurrent_requests = 1
+    shed_retry_after = 3
+
+
+@override_settings(REDIS_URL='')
+class ThrottlingTests(SimpleTestCase):
+    def setUp(self):
+        store = LocalWindowStore()
+        patches = [
+            mock.patch.object(throttling, '_local_store', store),
+            mock.patch.dict(api_settings.DEFAULT_THROTTLE_RATES, {'test': '10/min'}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.now = 600.0
+        self.timer = mock.patch.object(SlidingWindowThrottle, 'timer', lambda throttle: self.now)
+        self.timer.start()
+        self.addCleanup(self.timer.stop)
+
+    def get(self, view=ThrottledView):
+        return view.as_view()(APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1'))
+
+    def test_estimate_weights_the_previous_window(self):
+        for _ in range(8):
+            self.assertEqual(self.get().status_code, 200)
+        # A quarter into the next window: 8 * 0.75 + 1 = 7 of 10
+        self.now = 675.0
+        throttle = SlidingWindowThrottle()
+        request = APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        self.assertTrue(throttle.allow_request(ThrottledView().initialize_request(request), ThrottledView()))
+        self.assertEqual(throttle.estimated, 7)
+        self.assertEqual([self.get().status_code for _ in range(4)], [200, 200, 200, 429])
+
+    def test_limit_answers_429_with_retry_after(self):
+        self.assertEqual([self.get().status_code for _ in range(11)], [200] * 10 + [429])
+        self.now = 615.0
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '45')
+        # Another client has its own counter
+        response = ThrottledView.as_view()(APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.2'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_purge_keeps_live_counters_of_other_durations(self):
+        store = LocalWindowStore()
+        store.max_keys = 5
+        hour_window = int(self.now // 3600)
+        store.hit('hourly', hour_window, 3600)
+        store.hit('hourly', hour_window, 3600)
+        for n in range(10):
+            store.hit(f'churn{n}', int(self.now // 60) + n, 60)
+        self.assertEqual(store.hit('hourly', hour_window, 3600), (0, 3))
+        self.assertLessEqual(len(store._counts), 8)
+
+    def test_load_shedding_caps_in_flight_requests(self):
+        limiter = get_limiter(f'{SheddingView.__module__}.{SheddingView.__qualname__}', 1)
+        self.assertEqual(self.get(SheddingView).status_code, 200)
+        # Finished requests give their slot back
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertTrue(limiter.acquire())
+        try:
+            response = self.get(SheddingView)
+        finally:
+            limiter.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        self.assertEqual(self.get(SheddingView).status_code, 200)
+
+
+class RendererTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        cls.product = Product.objects.create(
+            name='상품 "A"', description='설명', price=1000, stock=5, category='books', created_by=cls.user,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_json_matches_drf(self):
+        for url in (reverse('products:product-list'), reverse('products:product-detail', args=[self.product.pk])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_raw_datetimes_render_like_serializer_fields(self):
+        moment = datetime(2026, 1, 1, 9, 30, 15, 705366, tzinfo=dt_timezone.utc)
+        expected = DateTimeField().to_representation(moment)
+        self.assertTrue(expected.endswith('.705366Z'))
+        self.assertEqual(ORJSONRenderer().render({'at': moment}), b'{"at":"%s"}' % expected.encode())
+        self.assertEqual(msgpack.unpackb(MessagePackRenderer().render({'at': moment})), {'at': expected})
+
+        # The change feed renders model datetimes directly
+        detail = self.client.get(reverse('products:product-detail', args=[self.product.pk])).json()
+        with override_settings(PRODUCT_FEED_LAG_SECONDS=0):
+            row, = self.client.get(reverse('products:product-list'), {'updated_since': ''}).json()['changed']
+        self.assertEqual(row['updated_at'], detail['updated_at'])
+
+    def test_msgpack_is_negotiated(self):
+        url = reverse('products:product-detail', args=[self.product.pk])
+        expected = self.client.get(url).json()
+        for kwargs in ({'HTTP_ACCEPT': 'application/msgpack'}, {'data': {'format': 'msgpack'}}):
+            with self.subTest(kwargs=kwargs):
+                response = self.client.get(url, **kwargs)
+                self.assertEqual(response['Content-Type'], 'application/msgpack')
+                self.assertEqual(msgpack.unpackb(response.content), expected)
+
+    def test_msgpack_request_body(self):
+        url = reverse('orders:order_create')
+        body = msgpack.packb({'items': [{'product_id': self.product.pk, 'quantity': 2}]})
+        response = self.client.post(url, body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['order']['items'][0]['quantity'], 2)
+
+        response = self.client.post(url, b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('MessagePack parse error', response.json()['detail'])
+
+
+class RequestMetricsTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'buyer-password')
+        Product.objects.create(name='Product', description='', price=1000, stock=5, category='books',
+                               created_by=cls.user)
+
+    def setUp(self):
+        # A fresh per-process registry for each test
+        patch = mock.patch.object(instrumentation, 'registry', Registry())
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.client.force_authenticate(self.user)
+
+    def server_timing(self, response):
+        return dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = self.client.get(reverse('products:product-list'))
+        timing = self.server_timing(response)
+        self.assertEqual(list(timing), ['db', 'serialize', 'render', 'total'])
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+        self.assertIn(f'desc="{len(response.content)} bytes"', timing['total'])
+
+        with override_settings(SERVER_TIMING_HEADER=False):
+            self.assertFalse(self.client.get(reverse('products:product-list')).has_header('Server-Timing'))
+
+    def test_metrics_are_labelled_by_view_action(self):
+        self.client.get(reverse('products:product-list'))
+        self.client.get(reverse('products:product-list'))
+        self.client.get(reverse('products:product-detail', args=[999_999]))
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        list_labels = 'view="ProductViewSet.list",method="GET"'
+        self.assertIn(f'marketon_responses_total{{{list_labels},status="200"}} 2', body)
+        self.assertIn(
+            'marketon_responses_total{view="ProductViewSet.retrieve",method="GET",status="404"} 1', body,
+        )
+        self.assertIn(f'marketon_request_duration_seconds_count{{{list_labels}}} 2', body)
+        self.assertIn(f'marketon_request_db_queries_bucket{{{list_labels},le="+Inf"}} 2', body)
+        self.assertIn('# TYPE marketon_response_size_bytes histogram', body)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        for size in (100, 2000, 10_000_000):
+            registry.record(('View.get', 'GET'), 200, {'marketon_response_size_bytes': size})
+        lines = registry.render().splitlines()
+        labels = 'view="View.get",method="GET"'
+        self.assertIn(f'marketon_response_size_bytes_bucket{{{labels},le="256"}} 1', lines)
+        self.assertIn(f'marketon_response_size_bytes_bucket{{{labels},le="4096"}} 2', lines)
+        self.assertIn(f'marketon_response_size_bytes_bucket{{{labels},le="4194304"}} 2', lines)
+        self.assertIn(f'marketon_response_size_bytes_bucket{{{labels},le="+Inf"}} 3', lines)
+        self.assertIn(f'marketon_response_size_bytes_sum{{{labels}}} 10002100.0', lines)
+
+    def test_metrics_access_and_collectors(self):
+        def broken():
+            raise RuntimeError('source down')
+
+        with mock.patch.object(instrumentation, 'collectors', [broken, lambda: ['marketon_extra 1']]):
+            with self.assertLogs('marketon.instrumentation', 'ERROR'):
+                response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertTrue(response.content.decode().endswith('marketon_extra 1\n'))
+
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+
+class BKTreeTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(45)
+        base = [rng.getrandbits(64) for _ in range(40)]
+        # Clusters of near copies (a few flipped bits) plus exact duplicates
+        self.values = [
+            to_signed(value ^ sum(1 << rng.randrange(64) for _ in range(rng.randrange(6))))
+            for value in base for _ in range(5)
+        ]
+        self.values += self.values[:10]
+        self.tree = BKTree()
+        for item, value in enumerate(self.values):
+            self.tree.add(value, item)
+
+    def brute_force(self, query, k):
+        return sorted(
+            (hamming(query, value), item) for item, value in enumerate(self.values) if hamming(query, value) <= k
+        )
+
+    def test_search_finds_everything_within_k(self):
+        self.assertEqual(self.tree.size, len(self.values))
+        for query in self.values[::7] + [0, -1]:
+            for k in (0, 1, 4, 10):
+                with self.subTest(query=query, k=k):
+                    found = self.tree.search(query, k)
+                    self.assertEqual(sorted(found), self.brute_force(query, k))
+                    self.assertEqual([d for d, _ in found], sorted(d for d, _ in found))
+
+    def test_discard(self):
+        value = self.values[0]
+        self.tree.discard(value, 0)
+        self.tree.discard(value, 0)
+        self.assertEqual(self.tree.size, len(self.values) - 1)
+        items = [item for _, item in self.tree.search(value, 0)]
+        # The duplicate added later shares the node and stays
+        self.assertNotIn(0, items)
+        self.assertIn(len(self.values) - 10, items)
+
+    def test_hash_file(self):
+        self.assertEqual(to_unsigned(to_signed(2 ** 64 - 1)), 2 ** 64 - 1)
+        self.assertEqual(to_signed(2 ** 64 - 1), -1)
+        file = BytesIO(b'not an image')
+        file.seek(3)
+        self.assertEqual(hash_file(file), (None, None))
+        self.assertEqual(file.tell(), 3)
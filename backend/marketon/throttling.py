@@ -0,0 +1,221 @@
+"""
+Request throttling and load shedding for expensive endpoints.
+
+``SlidingWindowThrottle`` is a sliding-window-counter rate limit: the count
+of the current fixed window plus the previous window's count weighted by how
+much of it still overlaps the sliding window.  Counters live in Redis so the
+limit holds across worker processes, with a per-process fallback when Redis
+is not configured or unreachable.
+
+``LoadSheddingMixin`` caps in-flight requests per view and process and
+answers 503 with ``Retry-After`` once the cap is reached, so a burst of slow
+requests (uploads, password hashing) can't occupy every worker thread.
+"""
+import logging
+import math
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from marketon.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class LocalWindowStore:
+    """
+    Per-process window counters, keyed by (key, duration, window)
+    """
+    max_keys = 10_000
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, window, duration):
+        with self._lock:
+            if len(self._counts) > self.max_keys:
+                self._purge(window * duration)
+            current = self._counts.get((key, duration, window), 0) + 1
+            self._counts[(key, duration, window)] = current
+            return self._counts.get((key, duration, window - 1), 0), current
+
+    def _purge(self, now):
+        # Window numbers only compare within one duration.  ``now`` is the
+        # start of the caller's window, never later than the real time, so
+        # live counters of longer or shorter scopes are kept.
+        self._counts = {k: v for k, v in self._counts.items() if k[2] >= now // k[1] - 1}
+
+
+class RedisWindowStore:
+    """
+    Window counters shared through Redis (INCR + EXPIRE in one round trip)
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def hit(self, key, window, duration):
+        current_key = f'throttle:{key}:{window}'
+        pipe = self.client.pipeline()
+        pipe.get(f'throttle:{key}:{window - 1}')
+        pipe.incr(current_key)
+        pipe.expire(current_key, duration * 2)
+        previous, current, _ = pipe.execute()
+        return int(previous or 0), current
+
+
+_local_store = LocalWindowStore()
+
+
+def get_window_store():
+    client = get_redis()
+    return RedisWindowStore(client) if client is not None else _local_store
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Rate limit per view scope, keyed by user id or client IP.
+
+    The scope comes from ``scope`` on a subclass or ``throttle_scope`` on the
+    view, and its rate from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``.
+    Views set ``throttle_key = 'ip'`` to always key by address (e.g. login).
+    """
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request
+        pass
+
+    def get_rate(self):
+        # Looked up per request rather than bound at import, so settings
+        # overrides (tests, bench_endpoints) take effect
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        if self.scope not in rates:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+        return rates[self.scope]
+
+    def get_cache_key(self, request, view):
+        if getattr(view, 'throttle_key', 'user') == 'user' and request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        self.scope = getattr(self, 'scope', None) or getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        now = self.timer()
+        window = int(now // self.duration)
+        elapsed = now - window * self.duration
+
+        try:
+            previous, current = get_window_store().hit(key, window, self.duration)
+        except Exception:
+            logger.warning('Throttle store unavailable; counting in-process', exc_info=True)
+            previous, current = _local_store.hit(key, window, self.duration)
+
+        self.estimated = previous * (1 - elapsed / self.duration) + current
+        if self.estimated <= self.num_requests:
+            return True
+
+        # Time until the previous window's weight has decayed enough, at most
+        # until the current window ends
+        remaining = self.duration - elapsed
+        if previous and current <= self.num_requests:
+            remaining = min(remaining, (self.estimated - self.num_requests) * self.duration / previous)
+        self._wait = max(1, math.ceil(remaining))
+        return False
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class ServiceOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy, please retry shortly.'
+    default_code = 'overloaded'
+
+    def __init__(self, wait, detail=None):
+        super().__init__(detail)
+        # DRF's exception handler turns ``wait`` into a Retry-After header
+        self.wait = wait
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name, limit):
+    limiter = _limiters.get(name)
+    if limiter is None or limiter.limit != limit:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None or limiter.limit != limit:
+                limiter = _limiters[name] = ConcurrencyLimiter(limit)
+    return limiter
+
+
+class LoadSheddingMixin:
+    """
+    Reject requests with 503 once ``max_concurrent_requests`` are in flight
+    for the view in this process. The cap defaults to
+    ``CONCURRENCY_LIMITS[throttle_scope]``.
+    """
+    max_concurrent_requests = None
+    shed_retry_after = 1
+
+    def get_max_concurrent_requests(self):
+        if self.max_concurrent_requests is not None:
+            return self.max_concurrent_requests
+        scope = getattr(self, 'throttle_scope', None)
+        return getattr(settings, 'CONCURRENCY_LIMITS', {}).get(scope)
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication, permissions and throttles run first so rejected
+        # requests never take a slot
+        super().initial(request, *args, **kwargs)
+        limit = self.get_max_concurrent_requests()
+        if not limit:
+            return
+        limiter = get_limiter(f'{type(self).__module__}.{type(self).__qualname__}', limit)
+        if not limiter.acquire():
+            raise ServiceOverloaded(wait=self.shed_retry_after)
+        self._concurrency_slot = limiter
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        slot = getattr(self, '_concurrency_slot', None)
+        if slot is not None:
+            slot.release()
+            self._concurrency_slot = None
+        return super().finalize_response(request, response, *args, **kwargs)
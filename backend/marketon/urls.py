@@ -19,14 +19,21 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from marketon.instrumentation import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.users.urls')),
     path('api/products/', include('apps.products.urls')),
+    # Async read path for ASGI deployments
+    path('api/v2/products/', include('apps.products.async_urls')),
     path('api/orders/', include('apps.orders.urls')),
     path('api/carts/', include('apps.carts.urls')),
     path('api/addresses/', include('apps.addresses.urls')),
     path('api/upload/', include('apps.upload.urls')),
+    path('api/dashboard/', include('apps.dashboard.urls')),
+    path('api/jobs/', include('apps.jobs.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
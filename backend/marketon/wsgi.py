@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'marketon.settings')
 
 application = get_wsgi_application()
+
+# Build the product suggestion index in the background once apps are loaded,
+# and start writing buffered product view / cart counters
+from apps.products.counters import start_flusher  # noqa: E402
+from apps.products.suggestions import warm_index  # noqa: E402
+
+warm_index()
+start_flusher()